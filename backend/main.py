@@ -1,5 +1,46 @@
-from fastapi import FastAPI
+import json
+import os
+import time
+import uuid
+
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+
+from my_agent.admission import AdmissionController, AdmissionRejected
+from my_agent.agent import root_agent
+from my_agent.answer_cache import AnswerCache, is_self_contained
+from my_agent.fast_path import try_answer
+from my_agent.metrics import LLM_TIME_TO_FIRST_TOKEN, LLM_TURN_LATENCY
+from my_agent.session_store import CompactingSessionService
+from my_agent.tools import search_listings_batch
+
+APP_NAME = "my_agent"
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+
+# One Runner and session service for the whole process. Building them per
+# request would re-initialize the agent tree and lose conversation history.
+# Sessions persist to SQLite (and survive restarts) when SESSION_DB_PATH is set.
+if os.getenv("SESSION_DB_PATH"):
+    session_service = CompactingSessionService()
+else:
+    session_service = InMemorySessionService()
+runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=session_service)
+
+# Caps agent turns in flight so bursts queue briefly or fail fast
+admission = AdmissionController()
+
+# Reuses final answers for near-identical questions across users
+answer_cache = AnswerCache()
 
 app = FastAPI(title="Propalyst CRM API")
 
@@ -10,8 +51,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Session-Id"],
 )
 
+@app.on_event("startup")
+async def start_sessions():
+    """Write buffered session events in the background while the server runs."""
+    if isinstance(session_service, CompactingSessionService):
+        await session_service.start()
+
+@app.on_event("shutdown")
+async def flush_sessions():
+    """Write any buffered session events before the process exits."""
+    if isinstance(session_service, CompactingSessionService):
+        await session_service.stop()
+
 @app.get("/")
 async def root():
     return {"message": "Propalyst CRM API is running"}
@@ -19,3 +73,182 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+class BatchSearchRequest(BaseModel):
+    filter_sets: list[list[dict]]
+    count_only: bool = False
+
+
+@app.post("/api/search/batch")
+def batch_search(request: BatchSearchRequest):
+    """Answer many filter sets (e.g. one per lead or dashboard card) in one call."""
+    return {"results": search_listings_batch(request.filter_sets, request.count_only)}
+
+
+# user_id of callers that do not identify themselves
+ANONYMOUS_USER = "anonymous"
+
+
+class ChatRequest(BaseModel):
+    message: str
+    user_id: str = ANONYMOUS_USER
+    session_id: str | None = None
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _get_or_create_session(user_id: str, session_id: str | None):
+    """Resume an existing chat session or start a new one."""
+    if session_id:
+        session = await session_service.get_session(
+            app_name=APP_NAME, user_id=user_id, session_id=session_id
+        )
+        if session:
+            return session
+    return await session_service.create_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+
+
+async def _stream_chat(message: str, user_id: str, session_id: str, ticket, cacheable: bool):
+    """
+    Run one agent turn and relay it as SSE frames.
+
+    Frames:
+    - token: partial text chunk, sent as soon as the model emits it
+    - tool_call / tool_result: tool activity, by tool name
+    - message: complete text of a model response
+    - done / error: end of the turn
+
+    If cacheable, the final answer is stored in the answer cache.
+    """
+    content = types.Content(role="user", parts=[types.Part.from_text(text=message)])
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+    start = time.perf_counter()
+    first_token_seen = False
+    final_text = None
+
+    try:
+        async for event in runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=content,
+            run_config=run_config,
+        ):
+            if not event.content or not event.content.parts:
+                continue
+
+            if event.author == root_agent.name and event.is_final_response() and not event.partial:
+                final_text = "".join(part.text for part in event.content.parts if part.text) or final_text
+
+            for part in event.content.parts:
+                if part.text:
+                    if not first_token_seen:
+                        first_token_seen = True
+                        LLM_TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - start)
+                    frame = "token" if event.partial else "message"
+                    yield _sse(frame, {"author": event.author, "text": part.text})
+                elif part.function_call:
+                    # SSE streaming repeats each call in a partial event
+                    # before the final one; report it once
+                    if not event.partial:
+                        yield _sse("tool_call", {"name": part.function_call.name, "args": part.function_call.args})
+                elif part.function_response:
+                    yield _sse("tool_result", {"name": part.function_response.name})
+
+        LLM_TURN_LATENCY.observe(time.perf_counter() - start)
+        if cacheable and final_text:
+            answer_cache.store(message, final_text)
+        yield _sse("done", {"session_id": session_id})
+
+    except Exception as e:
+        print(f"❌ Chat stream error: {e}")
+        yield _sse("error", {"message": str(e)})
+
+    finally:
+        ticket.release()
+
+
+async def _stream_ready_answer(session, message: str, text: str, source: str):
+    """
+    Relay an answer produced without the agent (fast path or answer cache).
+
+    The exchange is appended to the session so later turns that do reach the
+    agent still see it in the conversation history.
+    """
+    invocation_id = f"e-{uuid.uuid4()}"
+    await session_service.append_event(session, Event(
+        invocation_id=invocation_id,
+        author="user",
+        content=types.Content(role="user", parts=[types.Part.from_text(text=message)]),
+    ))
+    await session_service.append_event(session, Event(
+        invocation_id=invocation_id,
+        author=root_agent.name,
+        content=types.Content(role="model", parts=[types.Part.from_text(text=text)]),
+    ))
+
+    yield _sse("message", {"author": root_agent.name, "text": text, "source": source})
+    yield _sse("done", {"session_id": session.id})
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Stream an agent reply for one chat message as Server-Sent Events.
+
+    Formulaic questions are answered by the deterministic fast path, and
+    near-repeats of recent questions from the answer cache, without running
+    the agent. The fast path still queries Supabase, so requests are admitted
+    before either is tried. Returns 429 with a Retry-After header when admission
+    control rejects the request.
+    """
+    # The shared anonymous ID is not one user, so it only counts globally
+    user_key = None if request.user_id == ANONYMOUS_USER else request.user_id
+    try:
+        ticket = await admission.acquire(user_key)
+    except AdmissionRejected as e:
+        return JSONResponse(
+            status_code=429,
+            content={"error": "Too many requests", "reason": e.reason, "retry_after": e.retry_after},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    headers = {
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # Disable proxy buffering so tokens flush immediately
+    }
+    try:
+        session = await _get_or_create_session(request.user_id, request.session_id)
+        headers["X-Session-Id"] = session.id
+
+        ready = None
+        if FAST_PATH_ENABLED:
+            answer = await run_in_threadpool(try_answer, request.message)
+            if answer:
+                ready = _stream_ready_answer(session, request.message, answer.text, f"fast_path:{answer.intent}")
+
+        cacheable = is_self_contained(request.message, has_history=bool(session.events))
+        if ready is None and cacheable:
+            cached = await run_in_threadpool(answer_cache.lookup, request.message)
+            if cached:
+                ready = _stream_ready_answer(session, request.message, cached, "answer_cache")
+    except Exception:
+        ticket.release()
+        raise
+
+    return StreamingResponse(
+        ready or _stream_chat(request.message, request.user_id, session.id, ticket, cacheable),
+        media_type="text/event-stream",
+        headers=headers,
+        background=BackgroundTask(ticket.release),  # In case the stream never starts
+    )
@@ -0,0 +1,144 @@
+"""
+Admission control for agent requests.
+
+Every admitted chat turn fans out into Gemini calls, Supabase queries and web
+searches, so the number of turns in flight is capped globally and per user.
+A bounded number of requests may wait for a free slot; everything beyond that
+is rejected immediately with a retry-after hint instead of piling up as
+model-side 429s. Requests without a user (user_id None) share the global cap
+only, since one per-user budget would throttle every anonymous caller at once.
+"""
+
+import asyncio
+import math
+import os
+import time
+
+from .metrics import ADMISSION_ACTIVE, ADMISSION_QUEUED, ADMISSION_REJECTIONS
+
+MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "8"))
+MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+MAX_PER_USER = int(os.getenv("ADMISSION_MAX_PER_USER", "2"))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "15"))
+
+# Starting estimate of a turn's duration, refined as turns complete
+INITIAL_TURN_SECONDS = 5.0
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries a retry-after hint."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Request rejected ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """A granted slot. Release it exactly once when the turn ends."""
+
+    def __init__(self, controller, user_id):
+        self._controller = controller
+        self.user_id = user_id
+        self.started = time.monotonic()
+        self._released = False
+
+    def release(self):
+        """Return the slot; safe to call more than once."""
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(self)
+
+
+class AdmissionController:
+    """
+    Bounded work queue with global and per-user concurrency caps.
+
+    Args:
+        max_concurrent: Turns allowed to run at once across all users
+        max_queue: Requests allowed to wait for a slot; more are rejected
+        max_per_user: Turns (running or waiting) allowed per user; not applied
+            to requests with user_id None
+        queue_timeout: Seconds a request may wait before it is rejected
+    """
+
+    def __init__(
+        self,
+        max_concurrent=MAX_CONCURRENT,
+        max_queue=MAX_QUEUE,
+        max_per_user=MAX_PER_USER,
+        queue_timeout=QUEUE_TIMEOUT_SECONDS,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.queue_timeout = queue_timeout
+
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._active = 0
+        self._waiting = 0
+        self._per_user = {}
+        self._avg_turn_seconds = INITIAL_TURN_SECONDS
+
+    def retry_after(self):
+        """Seconds until the current backlog is expected to drain one slot."""
+        backlog = self._waiting + 1
+        return max(1, math.ceil(backlog / self.max_concurrent * self._avg_turn_seconds))
+
+    def _reject(self, reason):
+        ADMISSION_REJECTIONS.labels(reason=reason).inc()
+        raise AdmissionRejected(reason, self.retry_after())
+
+    async def acquire(self, user_id):
+        """
+        Wait for a slot for user_id (None for requests without a user).
+
+        Returns:
+            AdmissionTicket to release when the turn is finished
+
+        Raises:
+            AdmissionRejected: per-user cap reached, queue full, or queue timeout
+        """
+        if user_id is not None and self._per_user.get(user_id, 0) >= self.max_per_user:
+            self._reject("per_user_limit")
+        if self._active >= self.max_concurrent and self._waiting >= self.max_queue:
+            self._reject("queue_full")
+
+        if user_id is not None:
+            self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        self._waiting += 1
+        ADMISSION_QUEUED.set(self._waiting)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            self._forget_user(user_id)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject("queue_timeout")
+        finally:
+            self._waiting -= 1
+            ADMISSION_QUEUED.set(self._waiting)
+
+        self._active += 1
+        ADMISSION_ACTIVE.set(self._active)
+        return AdmissionTicket(self, user_id)
+
+    def _release(self, ticket):
+        # Exponential moving average of turn duration feeds retry_after()
+        elapsed = time.monotonic() - ticket.started
+        self._avg_turn_seconds = 0.8 * self._avg_turn_seconds + 0.2 * elapsed
+
+        self._active -= 1
+        ADMISSION_ACTIVE.set(self._active)
+        self._forget_user(ticket.user_id)
+        self._slots.release()
+
+    def _forget_user(self, user_id):
+        if user_id is None:
+            return
+        remaining = self._per_user.get(user_id, 0) - 1
+        if remaining > 0:
+            self._per_user[user_id] = remaining
+        else:
+            self._per_user.pop(user_id, None)
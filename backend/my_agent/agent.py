@@ -1,9 +1,13 @@
 from google.adk.agents.llm_agent import Agent
 from google.adk.tools import google_search
-from .tools import search_listings, get_locality_stats, get_nearby_localities, get_listing_details, get_agent_details, get_listings_by_type
+from .tools import search_listings, get_locality_stats, get_nearby_localities, get_listing_details, get_agent_details, get_broker_listings, get_listings_by_type
 from .analytics_tools import get_price_distribution, get_bhk_distribution, get_summary_stats, get_locality_breakdown
+from .compaction import compact_tool_response
+from .context_window import manage_context
+from .routing import LARGE_MODEL, route_model
+from .parallel import run_in_pool
 import pathlib
-from google.adk.tools import AgentTool
+from .web_research import CachedAgentTool
 
 # Load instructions from external file
 try:
@@ -16,7 +20,7 @@ except Exception as e:
 
 # Web Research Agent - Handles web searches
 web_research_agent = Agent(
-    model='gemini-2.5-flash',
+    model=LARGE_MODEL,
     name='web_research_agent',
     description="Searches the web for real estate market information, developer news, and locality trends",
     instruction="You search the web for real estate information. Use google_search to find market trends, developer reputation, locality news, and regulations.",
@@ -25,25 +29,37 @@ web_research_agent = Agent(
 
 # Main Agent
 root_agent = Agent(
-    model='gemini-2.5-flash',
+    # Default model; route_model picks small or large per call
+    model=LARGE_MODEL,
     name='my_agent',
     description="Real estate broker assistant for Bangalore properties.",
     instruction=agent_instruction,
     tools=[
-        # Search tools
-        search_listings, 
-        get_locality_stats, 
-        get_nearby_localities, 
-        get_listing_details, 
-        get_agent_details, 
-        get_listings_by_type,
-        # Analytics tools (for summaries)
-        get_price_distribution,
-        get_bhk_distribution,
-        get_summary_stats,
-        get_locality_breakdown,
-        AgentTool(agent=web_research_agent)
-    ]
+        # Search and analytics tools run on a thread pool so independent
+        # calls from one model response execute concurrently
+        *[run_in_pool(tool) for tool in [
+            # Search tools
+            search_listings, 
+            get_locality_stats, 
+            get_nearby_localities, 
+            get_listing_details, 
+            get_agent_details, 
+            get_broker_listings,
+            get_listings_by_type,
+            # Analytics tools (for summaries)
+            get_price_distribution,
+            get_bhk_distribution,
+            get_summary_stats,
+            get_locality_breakdown,
+        ]],
+        # Research results are cached on disk and deduplicated in flight
+        CachedAgentTool(agent=web_research_agent)
+    ],
+    # Shrink tool output to a token budget before it enters the model context
+    after_tool_callback=compact_tool_response,
+    # Summarize earlier turns' tool results and cap history size per model call,
+    # then route the call to the small or large model
+    before_model_callback=[manage_context, route_model],
 )
 
 from google.adk.apps.app import App
@@ -25,6 +25,7 @@ from vertexai.agent_engines.templates.adk import AdkApp
 from my_agent.agent import app as adk_app
 from my_agent.app_utils.telemetry import setup_telemetry
 from my_agent.app_utils.typing import Feedback
+from my_agent.session_store import CompactingSessionService
 
 
 class AgentEngineApp(AdkApp):
@@ -58,4 +59,7 @@ agent_engine = AgentEngineApp(
     artifact_service_builder=lambda: GcsArtifactService(bucket_name=logs_bucket_name)
     if logs_bucket_name
     else InMemoryArtifactService(),
+    session_service_builder=CompactingSessionService
+    if os.environ.get("SESSION_DB_PATH")
+    else None,
 )
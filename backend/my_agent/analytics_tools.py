@@ -2,10 +2,14 @@
 Analytics tools for aggregating and summarizing listing data.
 These tools process data in Python to avoid overwhelming the LLM with raw listings.
 """
+from google.adk.tools import ToolContext
+
+from .metrics import timed_tool
 from .tools import search_listings
 
 
-def get_price_distribution(filters):
+@timed_tool
+def get_price_distribution(filters, tool_context: ToolContext = None):
     """
     Get price distribution for listings matching filters.
     Groups listings into price ranges instead of returning raw data.
@@ -28,7 +32,7 @@ def get_price_distribution(filters):
         }
     """
     # Get raw listings
-    listings = search_listings(filters)
+    listings = search_listings(filters, tool_context=tool_context)
     
     if not listings:
         return {"total_count": 0, "distribution": {}}
@@ -79,7 +83,8 @@ def get_price_distribution(filters):
     }
 
 
-def get_bhk_distribution(filters):
+@timed_tool
+def get_bhk_distribution(filters, tool_context: ToolContext = None):
     """
     Get BHK distribution for listings matching filters.
     
@@ -99,7 +104,7 @@ def get_bhk_distribution(filters):
             }
         }
     """
-    listings = search_listings(filters)
+    listings = search_listings(filters, tool_context=tool_context)
     
     if not listings:
         return {"total_count": 0, "distribution": {}}
@@ -141,7 +146,8 @@ def get_bhk_distribution(filters):
     }
 
 
-def get_summary_stats(filters):
+@timed_tool
+def get_summary_stats(filters, tool_context: ToolContext = None):
     """
     Get statistical summary for listings matching filters.
     
@@ -155,7 +161,8 @@ def get_summary_stats(filters):
                 "min_cr": float,
                 "max_cr": float,
                 "avg_cr": float,
-                "median_cr": float
+                "median_cr": float,
+                "avg_price_per_sqft": int  # Sale listings with a known rate
             },
             "area_stats": {
                 "min_sqft": int,
@@ -164,14 +171,18 @@ def get_summary_stats(filters):
             }
         }
     """
-    listings = search_listings(filters)
-    
+    return summarize_listings(search_listings(filters, tool_context=tool_context))
+
+
+def summarize_listings(listings):
+    """Count, price and area statistics of a list of listings (see get_summary_stats)."""
     if not listings:
         return {"count": 0, "price_stats": {}, "area_stats": {}}
     
     # Extract prices and areas
     prices = [l.get("price", 0) / 10000000 for l in listings if l.get("price") is not None]
     areas = [l.get("area_sqft", 0) for l in listings if l.get("area_sqft")]
+    rates = [listing["price_per_sqft"] for listing in listings if listing.get("price_per_sqft")]
     
     # Calculate median
     def median(values):
@@ -194,6 +205,8 @@ def get_summary_stats(filters):
             "avg_cr": round(sum(prices) / len(prices), 2),
             "median_cr": round(median(prices), 2)
         }
+        if rates:
+            result["price_stats"]["avg_price_per_sqft"] = int(sum(rates) / len(rates))
     
     if areas:
         result["area_stats"] = {
@@ -205,7 +218,8 @@ def get_summary_stats(filters):
     return result
 
 
-def get_locality_breakdown(filters):
+@timed_tool
+def get_locality_breakdown(filters, tool_context: ToolContext = None):
     """
     Get breakdown of listings by locality.
     
@@ -224,7 +238,7 @@ def get_locality_breakdown(filters):
             }
         }
     """
-    listings = search_listings(filters)
+    listings = search_listings(filters, tool_context=tool_context)
     
     if not listings:
         return {"total_count": 0, "localities": {}}
@@ -0,0 +1,223 @@
+"""
+Semantic cache of final agent answers.
+
+Brokers in the same office ask near-identical questions within minutes. An
+answer is reused when a new question has the same intent signature (the
+filters that can be read off the text: BHK, property type, purpose,
+localities, numbers, bound direction, negation) and its local
+hashing-vectorizer embedding is close enough to the cached question.
+Entries expire after a TTL, or sooner when new listings land.
+"""
+
+import math
+import os
+import pathlib
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from .database import USE_SUPABASE, latest_listing_timestamp
+from .fast_path import MESSAGE_TYPE_PHRASES, PROPERTY_TYPE_WORDS
+from .locality_data import known_localities
+from .metrics import record_cache
+
+# Signatures must match exactly, so the text similarity bar can be moderate
+SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.6"))
+CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "300"))
+MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+# How often the data version (newest listing timestamp) is re-read
+DATA_VERSION_CHECK_SECONDS = 30
+
+EMBEDDING_DIM = 2**12
+
+# What kind of answer is asked for; part of the intent signature
+QUESTION_KINDS = {
+    "average": r"\b(avg|average|mean|median)\b",
+    "count": r"\b(how many|count|number of)\b",
+    "range": r"\b(range|distribution|breakdown|min|max|cheapest|costliest)\b",
+    "near": r"\b(near|around|close to)\b",
+}
+# Direction of a bound ("under 2 cr" vs "above 2 cr"); part of the signature
+COMPARATORS = {
+    "max": r"\b(under|below|less than|lower than|cheaper than|upto|up to|at most|max|maximum)\b",
+    "min": r"\b(above|over|more than|higher than|at least|min|minimum)\b",
+}
+NEGATION_PATTERN = r"\b(not|except|excluding|other than|without|\w+n t)\b"
+MOCK_LISTINGS_PATH = pathlib.Path(__file__).parent.parent / "mock_listings.json"
+
+
+def normalize(question):
+    """Lowercase, strip punctuation and collapse whitespace."""
+    text = re.sub(r"[^a-z0-9 .]", " ", question.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def intent_signature(question):
+    """
+    Filters that can be read directly off the question.
+
+    Two questions only share an answer if their signatures are equal, so
+    "3 BHK in Hebbal" never reuses the answer for "4 BHK in Hebbal", nor
+    "under 2 cr" the answer for "above 2 cr", however similar the wording.
+    """
+    text = normalize(question)
+    padded = f" {text} "
+    slots = set()
+
+    for bhk in re.findall(r"(\d+)\s?bhk", text):
+        slots.add(("bhk", bhk))
+    for word, property_type in PROPERTY_TYPE_WORDS.items():
+        if f" {word} " in padded:
+            slots.add(("property_type", property_type))
+    for phrase, message_type in MESSAGE_TYPE_PHRASES.items():
+        if f" {phrase} " in padded:
+            slots.add(("message_type", message_type))
+    for key, locality in known_localities().items():
+        if key in text:
+            slots.add(("locality", locality))
+    for kind, pattern in QUESTION_KINDS.items():
+        if re.search(pattern, text):
+            slots.add(("kind", kind))
+    for comparator, pattern in COMPARATORS.items():
+        if re.search(pattern, text):
+            slots.add(("comparator", comparator))
+    if re.search(NEGATION_PATTERN, text):
+        slots.add(("negation", "not"))
+    for number in re.findall(r"\d+(?:\.\d+)?", re.sub(r"\d+\s?bhk", "", text)):
+        slots.add(("number", number))
+
+    return tuple(sorted(slots))
+
+
+def embed(question):
+    """
+    Sparse, L2-normalized hashing-vectorizer embedding.
+
+    Features are word unigrams plus character trigrams, hashed into
+    EMBEDDING_DIM buckets; no model or external service is involved.
+    """
+    text = normalize(question)
+    features = text.split()
+    padded = f" {text} "
+    features.extend(padded[i : i + 3] for i in range(len(padded) - 2))
+
+    vector = {}
+    for feature in features:
+        bucket = zlib.crc32(feature.encode()) % EMBEDDING_DIM
+        vector[bucket] = vector.get(bucket, 0.0) + 1.0
+
+    norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+    return {k: v / norm for k, v in vector.items()}
+
+
+def cosine(a, b):
+    """Cosine similarity of two normalized sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+class AnswerCache:
+    """In-process semantic answer cache shared by all users of the server."""
+
+    def __init__(
+        self,
+        threshold=SIMILARITY_THRESHOLD,
+        ttl=CACHE_TTL_SECONDS,
+        max_entries=MAX_ENTRIES,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (signature, question) -> entry
+        self._lock = threading.Lock()
+        self._data_version = None
+        self._data_version_checked = 0.0
+
+    def data_version(self):
+        """Marker that changes whenever the listing data changes."""
+        now = time.time()
+        if now - self._data_version_checked > DATA_VERSION_CHECK_SECONDS:
+            if USE_SUPABASE:
+                self._data_version = latest_listing_timestamp()
+            elif MOCK_LISTINGS_PATH.exists():
+                self._data_version = MOCK_LISTINGS_PATH.stat().st_mtime
+            self._data_version_checked = now
+        return self._data_version
+
+    def invalidate(self):
+        """Drop every cached answer, e.g. after a bulk load."""
+        with self._lock:
+            self._entries.clear()
+            self._data_version_checked = 0.0
+
+    def lookup(self, question):
+        """
+        Return a cached answer for a similar question, or None.
+
+        Args:
+            question: The user's chat message
+
+        Returns:
+            Answer text from an earlier turn, or None on a miss
+        """
+        signature = intent_signature(question)
+        vector = embed(question)
+        version = self.data_version()
+        now = time.time()
+
+        best, best_score = None, self.threshold
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if (
+                    now - entry["cached_at"] > self.ttl
+                    or entry["data_version"] != version
+                ):
+                    del self._entries[key]
+                    continue
+                if entry["signature"] != signature:
+                    continue
+                score = cosine(vector, entry["vector"])
+                if score >= best_score:
+                    best, best_score = key, score
+
+            if best is not None:
+                self._entries.move_to_end(best)
+                answer = self._entries[best]["answer"]
+
+        record_cache("answer", hit=best is not None)
+        if best is None:
+            return None
+
+        print(f"♻️  Answer cache hit (similarity {best_score:.2f})")
+        return answer
+
+    def store(self, question, answer):
+        """Cache the final answer for a question."""
+        signature = intent_signature(question)
+        entry = {
+            "signature": signature,
+            "vector": embed(question),
+            "answer": answer,
+            "cached_at": time.time(),
+            "data_version": self.data_version(),
+        }
+        with self._lock:
+            self._entries[(signature, normalize(question))] = entry
+            self._entries.move_to_end((signature, normalize(question)))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def is_self_contained(question, has_history):
+    """
+    Whether a question can be answered independently of the conversation.
+
+    Opening questions always qualify; mid-conversation ones only if they name a
+    locality, since follow-ups like "and for 4 BHK?" depend on earlier turns.
+    """
+    if not has_history:
+        return True
+    return any(slot[0] == "locality" for slot in intent_signature(question))
@@ -0,0 +1,502 @@
+"""
+Incremental agent profile builder.
+
+Agent profiles (mock_agents.json) summarise each broker's listings: count,
+top localities, specializations and average deal value. Brokers are the
+entities resolved by BrokerIndex (see brokers.py), so listings without a
+broker name still count and same-named brokers stay apart. Rather than
+recomputing every profile from all listings, ProfileBuilder keeps mergeable
+running aggregates per broker (counters and a count/sum price accumulator)
+plus each listing's contribution, and re-resolves only the brokers a changed
+listing's numbers or name reach, so adding, updating or removing a listing
+touches only the brokers it belongs to before and after. Listings and their
+brokers are saved to a state file between runs; only the first run needs
+every listing.
+
+Usage (from backend/):
+    python -m my_agent.broker_profiles --rebuild mock_listings.json
+    python -m my_agent.broker_profiles --upsert new_rows.jsonl --remove ID [ID ...]
+"""
+
+import json
+import os
+import pathlib
+from collections import Counter, defaultdict
+
+from .brokers import broker_id, cluster_id, listing_evidence, name_key, split_phones
+from .dedup import UnionFind
+
+BACKEND_DIR = pathlib.Path(__file__).parent.parent
+STATE_PATH = pathlib.Path(
+    os.getenv(
+        "AGENT_PROFILES_STATE_PATH",
+        BACKEND_DIR / ".cache" / "agent_profiles_state.json",
+    )
+)
+PROFILES_PATH = BACKEND_DIR / "mock_agents.json"
+# Brokers with fewer listings don't get a profile
+MIN_LISTINGS = 2
+RECENT_LISTINGS = 5
+# Bumped when the state file format changes
+STATE_VERSION = 3
+REBUILD_COMMAND = "python -m my_agent.broker_profiles --rebuild <listings file>"
+
+
+class RunningStats:
+    """Count and mean that support add, remove and merge."""
+
+    def __init__(self, count=0, total=0.0):
+        self.count = count
+        self.total = total
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+
+    def remove(self, value):
+        self.count -= 1
+        self.total -= value
+
+    def merge(self, other):
+        """Fold in stats computed elsewhere, e.g. on another shard of listings."""
+        self.count += other.count
+        self.total += other.total
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+def _decrement(counter, key):
+    if key:
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+
+def _top(counter, n):
+    """Most common keys, ties broken by key so the order doesn't depend on history."""
+    return [
+        key
+        for key, _ in sorted(counter.items(), key=lambda kv: (-kv[1], str(kv[0])))[:n]
+    ]
+
+
+def _agent_number(profile):
+    suffix = profile["id"].rsplit("_", 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
+
+
+class _Aggregate:
+    """Running aggregates of one broker's listings."""
+
+    def __init__(self):
+        self.listings = {}  # listing ID -> contribution (see _contribution)
+        self.names = Counter()
+        self.companies = Counter()
+        self.contacts = Counter()
+        self.locations = Counter()
+        self.property_types = Counter()
+        self.prices = RunningStats()
+
+    def _counters(self, contribution):
+        _, location, property_type, _, name, contact, company = contribution
+        return (
+            (self.names, name),
+            (self.companies, company),
+            (self.contacts, contact),
+            (self.locations, location),
+            (self.property_types, property_type),
+        )
+
+    def add(self, listing_id, contribution):
+        self.listings[listing_id] = contribution
+        for counter, key in self._counters(contribution):
+            if key:
+                counter[key] += 1
+        if contribution[3]:
+            self.prices.add(contribution[3])
+
+    def remove(self, listing_id):
+        contribution = self.listings.pop(listing_id)
+        for counter, key in self._counters(contribution):
+            _decrement(counter, key)
+        if contribution[3]:
+            self.prices.remove(contribution[3])
+
+
+def _contribution(listing):
+    """
+    What a listing adds to its broker's profile: (message_date, location,
+    property_type, price, agent_name, agent_contact, company_name)
+    """
+    try:
+        price = float(listing.get("price") or 0)
+    except (TypeError, ValueError):
+        price = 0.0
+    return (
+        str(listing.get("message_date") or listing.get("created_at") or ""),
+        listing.get("location"),
+        listing.get("property_type"),
+        price if price > 0 else 0.0,
+        listing.get("agent_name"),
+        listing.get("agent_contact"),
+        listing.get("company_name"),
+    )
+
+
+def _discard(index, key, listing_id):
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(listing_id)
+        if not ids:
+            del index[key]
+
+
+def _broker_fields(listing_id, contribution):
+    """The fields BrokerIndex resolves a listing's broker from."""
+    return {
+        "id": listing_id,
+        "agent_name": contribution[4],
+        "agent_contact": contribution[5],
+        "company_name": contribution[6],
+    }
+
+
+class ProfileBuilder:
+    """
+    Agent profiles maintained listing by listing.
+
+    Brokers are resolved as in BrokerIndex, but incrementally: when profiles
+    are next read, only the clusters the changed listings' numbers and
+    name-at-company keys belong to (before and after the change) are rebuilt
+    with union-find, and only the numberless listings whose name may now
+    point elsewhere are matched again. A listing that links two brokers
+    merges their aggregates; removing it splits them again. Each listing's
+    contribution is kept because removing it must subtract what it added.
+
+    Args:
+        existing_profiles: Current profiles; their IDs and response times are
+                           kept for the brokers with the same phone number or,
+                           failing that, the same name
+    """
+
+    def __init__(self, existing_profiles=()):
+        self._contributions = {}  # listing ID -> contribution
+        self._evidence = {}  # listing ID -> BrokerIndex graph nodes
+        self._listings_at = {}  # graph node -> IDs of the listings carrying it
+        self._named = {}  # agent name key -> IDs of listings with nodes and that name
+        self._numberless = {}  # name (or company) key -> IDs of listings without nodes
+        self._mentions = {}  # name or company key -> IDs of listings naming it
+        self._cluster_of = {}  # graph node -> broker ID
+        self._clusters = {}  # broker ID -> graph nodes
+        self._brokers = {}  # broker ID -> _Aggregate
+        self._broker_of = {}  # listing ID -> broker ID
+        self._dirty = set()  # listing IDs upserted or removed since the last resolve
+        self._touched_nodes = set()  # Their graph nodes, before and after
+        self._touched_keys = set()  # Their name and company keys, before and after
+        self._ids = {}
+        self._response_times = {}
+        self._existing = list(existing_profiles)  # Not yet matched to a broker
+        self._next_number = max(map(_agent_number, self._existing), default=0) + 1
+        self._changed = set()
+
+    @property
+    def changed(self):
+        """IDs of the brokers changed since the last apply_to."""
+        self._resolve()
+        return self._changed
+
+    def upsert(self, listings):
+        """Add listings, replacing earlier versions of the same IDs."""
+        for listing in listings:
+            self._unindex(listing["id"])
+            self._index(listing["id"], _contribution(listing))
+
+    def remove(self, listing_ids):
+        """Remove listings by ID; unknown IDs are ignored."""
+        for listing_id in listing_ids:
+            self._unindex(listing_id)
+
+    @staticmethod
+    def _keys(contribution):
+        return name_key(contribution[4]), name_key(contribution[6])
+
+    def _index(self, listing_id, contribution):
+        nodes = listing_evidence(_broker_fields(listing_id, contribution))
+        name, company = self._keys(contribution)
+        self._contributions[listing_id] = contribution
+        self._evidence[listing_id] = nodes
+        for node in nodes:
+            self._listings_at.setdefault(node, set()).add(listing_id)
+        if nodes and name:
+            self._named.setdefault(name, set()).add(listing_id)
+        elif not nodes and (name or company):
+            self._numberless.setdefault(name or company, set()).add(listing_id)
+        for key in {name, company} - {""}:
+            self._mentions.setdefault(key, set()).add(listing_id)
+        self._touch(listing_id, nodes, (name, company))
+
+    def _unindex(self, listing_id):
+        contribution = self._contributions.pop(listing_id, None)
+        if contribution is None:
+            return
+        nodes = self._evidence.pop(listing_id)
+        name, company = self._keys(contribution)
+        for node in nodes:
+            _discard(self._listings_at, node, listing_id)
+        _discard(self._named, name, listing_id)
+        _discard(self._numberless, name or company, listing_id)
+        for key in (name, company):
+            _discard(self._mentions, key, listing_id)
+        self._touch(listing_id, nodes, (name, company))
+
+    def _touch(self, listing_id, nodes, keys):
+        self._dirty.add(listing_id)
+        self._touched_nodes.update(nodes)
+        self._touched_keys.update(key for key in keys if key)
+
+    def _resolve(self):
+        """Re-resolve the brokers reached from changed listings and move their listings."""
+        if not self._dirty:
+            return
+        # Whole clusters are rebuilt, since removing a listing may split one
+        nodes = set()
+        for node in self._touched_nodes:
+            bid = self._cluster_of.get(node)
+            nodes.update(self._clusters.pop(bid) if bid in self._clusters else (node,))
+        listing_ids = set()
+        for node in nodes:
+            self._cluster_of.pop(node, None)
+            listing_ids.update(self._listings_at.get(node, ()))
+
+        clusters = UnionFind()
+        for listing_id in listing_ids:
+            first, *rest = self._evidence[listing_id]
+            clusters.find(first)
+            for node in rest:
+                clusters.union(first, node)
+        members = defaultdict(set)
+        for node in list(clusters.parent):
+            members[clusters.find(node)].add(node)
+        for cluster in members.values():
+            bid = cluster_id(cluster)
+            self._clusters[bid] = cluster
+            self._cluster_of.update(dict.fromkeys(cluster, bid))
+        moves = {i: self._cluster_of[self._evidence[i][0]] for i in listing_ids}
+
+        # A name seen with the numbers of exactly one broker identifies that
+        # broker on listings that carry nothing else
+        keys = self._touched_keys | {
+            self._keys(self._contributions[i])[0] for i in listing_ids
+        }
+        for key in keys - {""}:
+            owners = {
+                moves.get(i) or self._broker_of[i] for i in self._named.get(key, ())
+            }
+            owner = next(iter(owners)) if len(owners) == 1 else broker_id(key)
+            moves.update(dict.fromkeys(self._numberless.get(key, ()), owner))
+
+        for listing_id in self._dirty:
+            moves.setdefault(listing_id, None)
+        for listing_id, new in moves.items():
+            old = self._broker_of.get(listing_id)
+            if old == new and listing_id not in self._dirty:
+                continue
+            if old is not None:
+                aggregate = self._brokers[old]
+                aggregate.remove(listing_id)
+                if not aggregate.listings:
+                    del self._brokers[old]
+                del self._broker_of[listing_id]
+                self._changed.add(old)
+            if new is not None:
+                self._brokers.setdefault(new, _Aggregate()).add(
+                    listing_id, self._contributions[listing_id]
+                )
+                self._broker_of[listing_id] = new
+                self._changed.add(new)
+        self._dirty.clear()
+        self._touched_nodes.clear()
+        self._touched_keys.clear()
+
+    def _lookup(self, text):
+        """Broker a phone number or name refers to, or None (see BrokerIndex.resolve)."""
+        phones = split_phones(text)
+        if phones:
+            return self._cluster_of.get(("phone", phones[0]))
+        brokers = {self._broker_of[i] for i in self._mentions.get(name_key(text), ())}
+        return next(iter(brokers)) if len(brokers) == 1 else None
+
+    def _match_existing(self, key):
+        """Take the existing profile of a broker out of the unmatched ones."""
+        for field in (
+            "contact",
+            "name",
+        ):  # A name only counts if no other broker shares it
+            for profile in self._existing:
+                if profile.get(field) and self._lookup(profile[field]) == key:
+                    self._existing.remove(profile)
+                    return profile
+        return None
+
+    def _agent_id(self, key):
+        if key not in self._ids:
+            profile = self._match_existing(key)
+            if profile is not None and profile["id"] not in self._ids.values():
+                self._ids[key] = profile["id"]
+                if profile.get("response_time"):
+                    self._response_times[key] = profile["response_time"]
+            else:
+                self._ids[key] = f"agent_{self._next_number}"
+                self._next_number += 1
+        return self._ids[key]
+
+    def profile(self, key):
+        """Profile of one broker, or None below MIN_LISTINGS listings."""
+        self._resolve()
+        aggregate = self._brokers.get(key)
+        if aggregate is None or len(aggregate.listings) < MIN_LISTINGS:
+            return None
+        recent = sorted(
+            aggregate.listings,
+            key=lambda i: (aggregate.listings[i][0], i),
+            reverse=True,
+        )
+        contact = (_top(aggregate.contacts, 1) or [None])[0]
+        return {
+            "id": self._agent_id(key),
+            "broker_id": key,
+            "name": (
+                _top(aggregate.names, 1) or _top(aggregate.companies, 1) or [contact]
+            )[0],
+            "contact": contact,
+            "active_listings_count": len(aggregate.listings),
+            "top_localities": _top(aggregate.locations, 3),
+            "specializations": _top(aggregate.property_types, 2),
+            "avg_deal_value_cr": round(aggregate.prices.mean / 10000000, 2),
+            "response_time": self._response_times.get(key),
+            "recent_transaction_ids": recent[:RECENT_LISTINGS],
+        }
+
+    def profiles(self):
+        """All current profiles, ordered by agent ID."""
+        self._resolve()
+        profiles = [p for p in map(self.profile, sorted(self._brokers)) if p]
+        return sorted(profiles, key=_agent_number)
+
+    def apply_to(self, profiles):
+        """
+        Update a profile list for the brokers changed since the last call.
+
+        Profiles of untouched brokers are returned as they were.
+        """
+        self._resolve()
+        by_id = {p["id"]: p for p in profiles}
+        for key in sorted(self._changed):
+            agent_id = self._ids.get(key)
+            profile = self.profile(key)
+            if profile is not None:
+                by_id[profile["id"]] = profile
+            elif agent_id is not None:
+                by_id.pop(agent_id, None)
+        self._changed.clear()
+        return sorted(by_id.values(), key=_agent_number)
+
+    def to_json(self):
+        self._resolve()
+        return {
+            "version": STATE_VERSION,
+            "ids": self._ids,
+            "response_times": self._response_times,
+            "existing": self._existing,
+            "listings": self._contributions,
+            "brokers": self._broker_of,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """Restore a saved state; listings are re-indexed, not re-resolved."""
+        if data.get("version") != STATE_VERSION:
+            raise ValueError("agent profile state is from an older version")
+        builder = cls(data["existing"])
+        builder._ids = dict(data["ids"])
+        taken = [_agent_number({"id": v}) + 1 for v in builder._ids.values()]
+        builder._next_number = max([builder._next_number, *taken])
+        builder._response_times = dict(data["response_times"])
+        for listing_id, contribution in data["listings"].items():
+            builder._index(listing_id, tuple(contribution))
+        for listing_id, bid in data["brokers"].items():
+            builder._broker_of[listing_id] = bid
+            builder._brokers.setdefault(bid, _Aggregate()).add(
+                listing_id, builder._contributions[listing_id]
+            )
+            for node in builder._evidence[listing_id]:
+                builder._cluster_of[node] = bid
+                builder._clusters.setdefault(bid, set()).add(node)
+        builder._dirty.clear()
+        builder._touched_nodes.clear()
+        builder._touched_keys.clear()
+        return builder
+
+    def save(self, path=STATE_PATH):
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.to_json()))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        return cls.from_json(json.loads(pathlib.Path(path).read_text()))
+
+
+def main():
+    import argparse
+
+    from .loader import read_rows
+
+    parser = argparse.ArgumentParser(description="Update agent profiles incrementally")
+    parser.add_argument(
+        "--rebuild", help="Listings file to build the state from scratch"
+    )
+    parser.add_argument(
+        "--upsert", nargs="*", default=[], help="Files of added or changed listings"
+    )
+    parser.add_argument(
+        "--remove", nargs="*", default=[], help="IDs of removed listings"
+    )
+    parser.add_argument("--state", default=str(STATE_PATH))
+    parser.add_argument("--profiles", default=str(PROFILES_PATH))
+    cli = parser.parse_args()
+
+    profiles_path = pathlib.Path(cli.profiles)
+    profiles = json.loads(profiles_path.read_text()) if profiles_path.exists() else []
+    if cli.rebuild:
+        builder = ProfileBuilder(profiles)
+        builder.upsert(read_rows(cli.rebuild))
+        profiles = builder.profiles()
+        builder.changed.clear()
+    else:
+        try:
+            builder = ProfileBuilder.load(cli.state)
+        except FileNotFoundError:
+            parser.error(
+                f"no agent profile state at {cli.state}; build it first with {REBUILD_COMMAND}"
+            )
+        except ValueError as e:
+            parser.error(f"{e}; rebuild it with {REBUILD_COMMAND}")
+
+    for path in cli.upsert:
+        builder.upsert(read_rows(path))
+    builder.remove(cli.remove)
+    changed = len(builder.changed)
+    profiles = builder.apply_to(profiles)
+
+    builder.save(cli.state)
+    profiles_path.write_text(json.dumps(profiles, indent=2))
+    print(f"✅ {len(profiles)} agent profiles, {changed} brokers updated")
+
+
+if __name__ == "__main__":
+    main()
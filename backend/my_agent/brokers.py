@@ -0,0 +1,231 @@
+"""
+Broker entity resolution.
+
+Listings carry broker details as free text: agent_contact may hold several
+numbers in any format ("7026070800/ 9916251225", "+91 74110 06000") and
+agent_name is often missing. BrokerIndex normalizes phone numbers to E.164,
+treats every number on a listing, and a broker name given together with a
+company, as evidence of one broker, and joins the evidence with union-find.
+A name alone never joins listings with different numbers: "Rahul Kumar" is
+many brokers. A listing without a number joins the one broker whose numbered
+listings carry its name, if there is exactly one. Each resulting broker gets
+an ID derived from its lowest phone number (or its name when it has no
+number), so IDs survive rebuilds, and lookups by phone, name or ID and
+per-broker listing retrieval are dict lookups.
+"""
+
+import hashlib
+import re
+from collections import defaultdict
+
+from .dedup import UnionFind
+
+DEFAULT_COUNTRY_CODE = "91"
+
+PHONE_CANDIDATE_PATTERN = re.compile(r"(?:\+|\b00)?\d[\d\s\-().]{6,}\d")
+NAME_NOISE_PATTERN = re.compile(r"[^a-z0-9\s]+")
+HONORIFICS = {"mr", "mrs", "ms", "dr", "sri", "shri", "smt"}
+
+
+def normalize_phone(text, country_code=DEFAULT_COUNTRY_CODE):
+    """
+    E.164 form of one phone number, or None if it isn't a plausible number.
+
+    National numbers (10 digits, or 11 with a trunk 0) get country_code.
+    """
+    text = (text or "").strip()
+    international = text.startswith("+") or text.startswith("00")
+    digits = re.sub(r"\D", "", text)
+    if text.startswith("00"):
+        digits = digits[2:]
+    if international:
+        return f"+{digits}" if 8 <= len(digits) <= 15 else None
+    if len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    if len(digits) == 10:
+        return f"+{country_code}{digits}"
+    if len(digits) == 10 + len(country_code) and digits.startswith(country_code):
+        return f"+{digits}"
+    return None
+
+
+def split_phones(text, country_code=DEFAULT_COUNTRY_CODE):
+    """
+    All distinct phone numbers in a contact field, in E.164 and in order.
+
+    Numbers may be separated by "/", ",", "or" and so on, or only by
+    spaces; a digit run that is several national numbers long is split.
+    """
+    phones = []
+    for match in PHONE_CANDIDATE_PATTERN.finditer(text or ""):
+        candidate = match.group(0)
+        phone = normalize_phone(candidate, country_code)
+        if phone is None:
+            digits = re.sub(r"\D", "", candidate)
+            if len(digits) > 12 and len(digits) % 10 == 0:
+                parts = [digits[i : i + 10] for i in range(0, len(digits), 10)]
+                phones += [
+                    p
+                    for p in (normalize_phone(part, country_code) for part in parts)
+                    if p
+                ]
+            continue
+        phones.append(phone)
+    return list(dict.fromkeys(phones))
+
+
+def name_key(name):
+    """Lowercase name without punctuation or honorifics, for matching."""
+    words = NAME_NOISE_PATTERN.sub(" ", (name or "").lower()).split()
+    return " ".join(w for w in words if w not in HONORIFICS)
+
+
+def broker_id(anchor):
+    """Stable broker ID for a cluster's anchor (phone number or name key)."""
+    return "broker_" + hashlib.sha1(anchor.encode()).hexdigest()[:12]
+
+
+def listing_evidence(listing):
+    """Graph nodes a listing provides: its numbers, and name at company."""
+    nodes = [("phone", p) for p in split_phones(listing.get("agent_contact"))]
+    name, company = (
+        name_key(listing.get("agent_name")),
+        name_key(listing.get("company_name")),
+    )
+    if name and company:
+        nodes.append(("person", f"{name} @ {company}"))
+    return nodes
+
+
+def cluster_id(nodes):
+    """Broker ID of a cluster of nodes: its lowest number, else its least value."""
+    numbers = sorted(value for kind, value in nodes if kind == "phone")
+    return broker_id(numbers[0] if numbers else min(value for _, value in nodes))
+
+
+class BrokerIndex:
+    """
+    Brokers resolved from listings.
+
+    Args:
+        listings: Listing dicts with id, agent_name, agent_contact and
+                  company_name
+    """
+
+    def __init__(self, listings=()):
+        self.brokers = {}
+        self._by_phone = {}
+        self._by_name = {}
+        self._by_listing = {}
+        self._listing_ids = {}
+        self._build(listings)
+
+    def __len__(self):
+        return len(self.brokers)
+
+    def _build(self, listings):
+        clusters = UnionFind()
+        evidence = {}
+        unlinked = []
+        for listing in listings:
+            nodes = listing_evidence(listing)
+            if not nodes:
+                unlinked.append(listing)
+                continue
+            evidence[listing["id"]] = nodes
+            for node in nodes:
+                clusters.find(node)
+            for node in nodes[1:]:
+                clusters.union(nodes[0], node)
+
+        # A name seen with the numbers of exactly one broker identifies that
+        # broker on listings that carry nothing else
+        owners = defaultdict(set)
+        for listing in listings:
+            key = name_key(listing.get("agent_name"))
+            if key and listing["id"] in evidence:
+                owners[key].add(clusters.find(evidence[listing["id"]][0]))
+        for listing in unlinked:
+            # A firm has several brokers, so its name only stands in for a
+            # missing broker name
+            key = name_key(listing.get("agent_name")) or name_key(
+                listing.get("company_name")
+            )
+            if not key:
+                continue
+            node = (
+                next(iter(owners[key]))
+                if len(owners.get(key, ())) == 1
+                else ("name", key)
+            )
+            clusters.find(node)
+            evidence[listing["id"]] = [node]
+
+        members = defaultdict(set)
+        for node in list(clusters.parent):
+            members[clusters.find(node)].add(node)
+        root_ids, phones = {}, {}
+        for root, nodes in members.items():
+            numbers = sorted(value for kind, value in nodes if kind == "phone")
+            bid = root_ids[root] = cluster_id(nodes)
+            phones[bid] = numbers
+            for number in numbers:
+                self._by_phone[number] = bid
+
+        names = defaultdict(lambda: defaultdict(int))
+        companies = defaultdict(lambda: defaultdict(int))
+        for listing in listings:
+            nodes = evidence.get(listing["id"])
+            if nodes is None:
+                continue
+            bid = root_ids[clusters.find(nodes[0])]
+            self._by_listing[listing["id"]] = bid
+            self._listing_ids.setdefault(bid, []).append(listing["id"])
+            for field, counts in (("agent_name", names), ("company_name", companies)):
+                if listing.get(field):
+                    counts[bid][listing[field]] += 1
+                    self._by_name.setdefault(name_key(listing[field]), set()).add(bid)
+
+        for bid, numbers in phones.items():
+            self.brokers[bid] = {
+                "broker_id": bid,
+                # Most frequent spelling wins
+                "name": max(names[bid], key=names[bid].get) if names[bid] else None,
+                "company_name": max(companies[bid], key=companies[bid].get)
+                if companies[bid]
+                else None,
+                "phones": numbers,
+                "listing_count": len(self._listing_ids[bid]),
+            }
+
+    def matches(self, query):
+        """IDs of every broker a broker ID, phone number or name may refer to."""
+        query = str(query or "").strip()
+        if query in self.brokers:
+            return [query]
+        phones = split_phones(query)
+        if phones:
+            bid = self._by_phone.get(phones[0])
+            return [bid] if bid else []
+        return sorted(self._by_name.get(name_key(query), ()))
+
+    def resolve(self, query):
+        """
+        Broker ID for a broker ID, phone number or name, or None if there is
+        no such broker or several brokers share the name (see matches).
+        """
+        matches = self.matches(query)
+        return matches[0] if len(matches) == 1 else None
+
+    def lookup(self, query):
+        """Broker profile for a broker ID, phone number or name, or None."""
+        bid = self.resolve(query)
+        return self.brokers.get(bid) if bid else None
+
+    def broker_of(self, listing_id):
+        """Broker ID of a listing, or None."""
+        return self._by_listing.get(listing_id)
+
+    def listing_ids(self, broker):
+        """IDs of a broker's listings, in input order."""
+        return self._listing_ids.get(broker, [])
@@ -0,0 +1,214 @@
+"""
+Token-budgeted compaction of tool responses.
+
+Runs as the root agent's after_tool_callback, so tools keep returning full
+listing dicts to Python callers (analytics, session cache) while the model
+only sees a compact form: heavy fields dropped, long text truncated, listing
+lists turned into a column/row table with constant columns hoisted out, and
+rows trimmed to fit the budget.
+"""
+
+import json
+import os
+
+from .metrics import TOOL_RESPONSE_TOKENS
+
+TOKEN_BUDGET = int(os.getenv("TOOL_RESPONSE_TOKEN_BUDGET", "3000"))
+
+# Rough token estimate for JSON-heavy text; avoids a tokenizer round trip
+CHARS_PER_TOKEN = 4
+
+# Fields the model never needs to answer broker questions
+DROPPED_FIELDS = {
+    "raw_message",
+    "llm_json",
+    "idx",
+    "source_raw_message_id",
+    "created_at",
+}
+
+MAX_TEXT_CHARS = 80
+# get_listing_details keeps the original WhatsApp text, truncated
+DETAIL_MESSAGE_CHARS = 600
+
+
+def estimate_tokens(payload):
+    """Estimate the prompt tokens a JSON-serializable payload will cost."""
+    text = json.dumps(payload, default=str, separators=(",", ":"), ensure_ascii=False)
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _truncate(value, limit):
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit] + "…"
+    return value
+
+
+def _is_listing(value):
+    return (
+        isinstance(value, dict)
+        and "id" in value
+        and ("location" in value or "price" in value)
+    )
+
+
+def compact_listing(listing, keep_message=False):
+    """Drop heavy and empty fields and truncate long text in one listing."""
+    compact = {}
+    for field, value in listing.items():
+        if field in DROPPED_FIELDS and not (keep_message and field == "raw_message"):
+            continue
+        if value is None or value == [] or value == "":
+            continue
+        limit = DETAIL_MESSAGE_CHARS if field == "raw_message" else MAX_TEXT_CHARS
+        compact[field] = _truncate(value, limit)
+    return compact
+
+
+def to_table(listings):
+    """
+    Convert listing dicts to a compact table.
+
+    Returns:
+        {
+            "columns": [str],
+            "rows": [[value]],
+            "same_for_all": {column: value}  # Columns with one repeated value
+        }
+    """
+    compacted = [compact_listing(listing) for listing in listings]
+
+    columns = []
+    for listing in compacted:
+        for field in listing:
+            if field not in columns:
+                columns.append(field)
+
+    # Hoist columns whose value is identical in every row
+    same_for_all = {}
+    if len(compacted) > 1:
+        for column in columns:
+            values = {
+                json.dumps(listing.get(column), default=str) for listing in compacted
+            }
+            if len(values) == 1 and column != "id":
+                same_for_all[column] = compacted[0].get(column)
+    columns = [c for c in columns if c not in same_for_all]
+
+    table = {
+        "columns": columns,
+        "rows": [[listing.get(c) for c in columns] for listing in compacted],
+    }
+    if same_for_all:
+        table["same_for_all"] = same_for_all
+    return table
+
+
+def _fit_table(table, budget_tokens):
+    """Drop trailing rows until the table fits the budget."""
+    total = len(table["rows"])
+    tokens = estimate_tokens(table)
+    if tokens <= budget_tokens:
+        return table
+
+    # Count the truncation markers against the budget too
+    table["total_rows"] = total
+    table["omitted_rows"] = total
+    while table["rows"] and tokens > budget_tokens:
+        # Cut in proportion to the overshoot, always at least one row
+        keep = min(len(table["rows"]) - 1, len(table["rows"]) * budget_tokens // tokens)
+        table["rows"] = table["rows"][:keep]
+        tokens = estimate_tokens(table)
+    table["omitted_rows"] = total - len(table["rows"])
+    return table
+
+
+def _longest_list(node):
+    """Find the longest list anywhere inside a nested value."""
+    longest = node if isinstance(node, list) else None
+    if isinstance(node, dict):
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        children = []
+    for child in children:
+        candidate = _longest_list(child)
+        if candidate is not None and (longest is None or len(candidate) > len(longest)):
+            longest = candidate
+    return longest
+
+
+def _trim_lists(value, budget_tokens):
+    """Halve the longest list in a nested response until it fits."""
+    while estimate_tokens(value) > budget_tokens:
+        longest = _longest_list(value)
+        if not longest or len(longest) <= 1:
+            break
+        del longest[len(longest) // 2 :]
+    return value
+
+
+def compact_response(response, budget_tokens=TOKEN_BUDGET):
+    """
+    Shape a tool response to fit within budget_tokens.
+
+    Args:
+        response: Raw tool return value
+        budget_tokens: Maximum estimated tokens for the result
+
+    Returns:
+        Compacted JSON-serializable value
+    """
+    if (
+        isinstance(response, list)
+        and response
+        and all(_is_listing(x) for x in response)
+    ):
+        return _fit_table(to_table(response), budget_tokens)
+
+    if _is_listing(response):
+        return compact_listing(response, keep_message=True)
+
+    if (
+        isinstance(response, dict)
+        and response
+        and all(
+            isinstance(v, list) and all(_is_listing(x) for x in v)
+            for v in response.values()
+        )
+    ):
+        # Grouped listings, e.g. get_listings_by_type(group_by_agent=True)
+        per_group = budget_tokens // max(len(response), 1)
+        return {
+            group: _fit_table(to_table(listings), per_group)
+            for group, listings in response.items()
+        }
+
+    results = response.get("results") if isinstance(response, dict) else None
+    if isinstance(results, list) and results and all(_is_listing(x) for x in results):
+        # Listings with metadata, e.g. get_broker_listings
+        return {**response, "results": _fit_table(to_table(results), budget_tokens)}
+
+    return _trim_lists(json.loads(json.dumps(response, default=str)), budget_tokens)
+
+
+def compact_tool_response(tool, args, tool_context, tool_response):
+    """
+    after_tool_callback that compacts function tool responses for the model.
+
+    Agent tools (web research) return prose and are passed through unchanged.
+    """
+    if not hasattr(tool, "func"):
+        return None
+
+    before = estimate_tokens(tool_response)
+    compacted = compact_response(tool_response)
+    after = estimate_tokens(compacted)
+
+    TOOL_RESPONSE_TOKENS.labels(tool=tool.name, stage="raw").observe(before)
+    TOOL_RESPONSE_TOKENS.labels(tool=tool.name, stage="compact").observe(after)
+    if after < before:
+        print(f"🗜️  {tool.name} response compacted: ~{before} → ~{after} tokens")
+
+    return compacted if isinstance(compacted, dict) else {"result": compacted}
@@ -0,0 +1,138 @@
+"""
+Context window management for the root agent.
+
+Runs as a before_model_callback. Tool results from earlier turns are swapped
+for short summaries that keep only listing IDs and counts, and if the history
+is still over CONTEXT_TOKEN_BUDGET the oldest turns are dropped. The current
+turn is never touched, so the model always sees the results it is working on.
+"""
+
+import json
+import os
+
+from google.genai import types
+
+from .compaction import estimate_tokens
+from .metrics import CONTEXT_TOKENS
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "12000"))
+# Stale results this small are cheaper to keep than to describe
+STALE_KEEP_TOKENS = 150
+STALE_NOTE = (
+    "Result from an earlier turn, summarized. Call the tool again for full data."
+)
+
+
+def _table_summary(table):
+    rows = table.get("rows", [])
+    columns = table.get("columns", [])
+    ids = [row[columns.index("id")] for row in rows] if "id" in columns else []
+    summary = {"listings": table.get("total_rows", len(rows)), "ids": ids}
+    if table.get("same_for_all"):
+        summary["same_for_all"] = table["same_for_all"]
+    return summary
+
+
+def _is_table(value):
+    return isinstance(value, dict) and "columns" in value and "rows" in value
+
+
+def summarize_tool_response(response):
+    """
+    Compact stand-in for a stale tool response.
+
+    Listing tables (see compaction.to_table) become their count and IDs, so
+    the model can still refer to or fetch earlier listings; other large
+    responses are cut to a short JSON preview.
+    """
+    if estimate_tokens(response) <= STALE_KEEP_TOKENS:
+        return response
+    if _is_table(response):
+        return {"note": STALE_NOTE, **_table_summary(response)}
+    if (
+        isinstance(response, dict)
+        and response
+        and all(_is_table(v) for v in response.values())
+    ):
+        return {
+            "note": STALE_NOTE,
+            "groups": {k: _table_summary(v) for k, v in response.items()},
+        }
+    preview = json.dumps(response, default=str, ensure_ascii=False)
+    return {"note": STALE_NOTE, "preview": preview[: STALE_KEEP_TOKENS * 2] + "…"}
+
+
+def _is_user_message(content):
+    """A content that starts a turn: user text, not a function response."""
+    return (
+        content.role == "user"
+        and bool(content.parts)
+        and all(
+            p.text is not None and p.function_response is None for p in content.parts
+        )
+    )
+
+
+def _content_tokens(content):
+    return estimate_tokens(content.model_dump(mode="json", exclude_none=True))
+
+
+def _summarize_content(content):
+    parts = []
+    for part in content.parts or []:
+        if part.function_response is not None:
+            response = part.function_response
+            part = types.Part(
+                function_response=types.FunctionResponse(
+                    id=response.id,
+                    name=response.name,
+                    response=summarize_tool_response(response.response),
+                )
+            )
+        parts.append(part)
+    return types.Content(role=content.role, parts=parts)
+
+
+def fit_contents(contents, budget_tokens=CONTEXT_TOKEN_BUDGET):
+    """
+    Shrink a conversation history to fit budget_tokens.
+
+    Args:
+        contents: List of genai Content, oldest first
+        budget_tokens: Maximum estimated tokens for the history
+
+    Returns:
+        New list of Content; the input objects are left unmodified
+    """
+    turn_starts = [i for i, c in enumerate(contents) if _is_user_message(c)]
+    current = turn_starts[-1] if turn_starts else 0
+
+    fitted = [_summarize_content(c) for c in contents[:current]] + list(
+        contents[current:]
+    )
+
+    # Drop whole turns, oldest first, so tool calls keep their responses
+    tokens = sum(_content_tokens(c) for c in fitted)
+    for start in turn_starts[1:]:
+        if tokens <= budget_tokens:
+            break
+        dropped = len(contents) - len(fitted)
+        tokens -= sum(_content_tokens(c) for c in fitted[: start - dropped])
+        fitted = fitted[start - dropped :]
+    return fitted
+
+
+def manage_context(callback_context, llm_request):
+    """before_model_callback that summarizes stale tool output and enforces the budget."""
+    if not llm_request.contents:
+        return None
+
+    before = sum(_content_tokens(c) for c in llm_request.contents)
+    llm_request.contents = fit_contents(llm_request.contents, CONTEXT_TOKEN_BUDGET)
+    after = sum(_content_tokens(c) for c in llm_request.contents)
+
+    CONTEXT_TOKENS.labels(stage="raw").observe(before)
+    CONTEXT_TOKENS.labels(stage="managed").observe(after)
+    if after < before:
+        print(f"🧹 Context trimmed: ~{before} → ~{after} tokens")
+    return None
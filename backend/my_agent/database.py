@@ -6,6 +6,8 @@ import os
 import json
 from dotenv import load_dotenv
 
+from .metrics import DB_QUERY_LATENCY
+
 # Load environment variables
 load_dotenv()
 
@@ -29,6 +31,14 @@ if USE_SUPABASE and SUPABASE_URL and SUPABASE_KEY:
 else:
     print("📁 Using mock data (Supabase disabled)")
 
+# Hide reposts once the dedup backfill has written is_duplicate (see dedup.py)
+CANONICAL_ONLY = os.getenv("SUPABASE_CANONICAL_ONLY", "false").lower() == "true"
+
+
+def canonical_only(query):
+    """Restrict a listings query to canonical listings if enabled."""
+    return query.eq("is_duplicate", False) if CANONICAL_ONLY else query
+
 
 def parse_listing_data(listing):
     """Parse and clean listing data from database."""
@@ -79,7 +89,8 @@ def query_listings(query_builder):
     
     try:
         print("Executing query:", query_builder)
-        response = query_builder.execute()
+        with DB_QUERY_LATENCY.labels(operation="query_listings").time():
+            response = canonical_only(query_builder).execute()
         results = response.data
         
         # Parse and clean results
@@ -98,10 +109,11 @@ def get_listing_by_id(listing_id: str):
         return None
     
     try:
-        response = supabase.table('whatsapp_listings_relevant')\
-            .select('*')\
-            .eq('id', listing_id)\
-            .execute()
+        with DB_QUERY_LATENCY.labels(operation="get_listing_by_id").time():
+            response = supabase.table('whatsapp_listings_relevant')\
+                .select('*')\
+                .eq('id', listing_id)\
+                .execute()
         if response.data:
             listing = response.data[0]
             parse_listing_data(listing)
@@ -112,16 +124,211 @@ def get_listing_by_id(listing_id: str):
     return None
 
 
+def query_all_listings(build_query, page_size=1000):
+    """
+    Execute a listings query page by page and return every parsed row.
+
+    A single query_listings call returns at most the PostgREST row limit,
+    so counts and aggregates over a broad query must page through it.
+
+    Args:
+        build_query: Function returning a fresh query builder; called once
+            per page, since a builder can't be re-ranged
+        page_size: Rows per request, at most the PostgREST max-rows setting
+
+    Returns:
+        List of parsed listings, ordered by id
+    """
+    results = []
+    start = 0
+    while True:
+        page = query_listings(build_query().order('id').range(start, start + page_size - 1))
+        results += page
+        if len(page) < page_size:
+            return results
+        start += page_size
+
+
+def get_listings_by_ids(listing_ids, chunk_size=200):
+    """Fetch listings by ID, in chunks that keep the request URL short."""
+    listing_ids = list(listing_ids)
+    results = []
+    for start in range(0, len(listing_ids), chunk_size):
+        query = supabase.table('whatsapp_listings_relevant')\
+            .select('*')\
+            .in_('id', listing_ids[start:start + chunk_size])
+        results += query_listings(query)
+    return results
+
+
 def count_listings_by_location(locality: str):
     """Count listings in a specific locality."""
     if not supabase:
         return 0
     
     try:
-        response = supabase.table('whatsapp_listings_relevant')\
-            .select('id', count='exact')\
-            .eq('location', locality)\
-            .execute()
+        with DB_QUERY_LATENCY.labels(operation="count_listings_by_location").time():
+            query = supabase.table('whatsapp_listings_relevant')\
+                .select('id', count='exact')\
+                .eq('location', locality)
+            response = canonical_only(query).execute()
         return response.count or 0
     except:
         return 0
+
+
+def latest_listing_timestamp():
+    """Return created_at of the newest listing, used as a data version marker."""
+    if not supabase:
+        return None
+
+    try:
+        with DB_QUERY_LATENCY.labels(operation="latest_listing_timestamp").time():
+            response = supabase.table('whatsapp_listings_relevant')\
+                .select('created_at')\
+                .order('created_at', desc=True)\
+                .limit(1)\
+                .execute()
+        if response.data:
+            return response.data[0].get('created_at')
+    except Exception as e:
+        print(f"Error fetching latest listing timestamp: {e}")
+
+    return None
+
+
+# Table the ingestion pipeline writes to; whatsapp_listings_relevant is read-only
+LISTINGS_TABLE = os.getenv("LISTINGS_TABLE", "whatsapp_listing_data")
+
+
+def upsert_listings(rows, on_conflict="id"):
+    """
+    Insert or update listing rows in one request.
+
+    Args:
+        rows: List of row dicts keyed by table column
+        on_conflict: Column(s) identifying an existing row
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        RuntimeError: If Supabase is not configured
+    """
+    if not supabase:
+        raise RuntimeError("Supabase is not configured; set USE_SUPABASE, SUPABASE_URL and SUPABASE_KEY")
+    if not rows:
+        return 0
+
+    with DB_QUERY_LATENCY.labels(operation="upsert_listings").time():
+        supabase.table(LISTINGS_TABLE)\
+            .upsert(rows, on_conflict=on_conflict)\
+            .execute()
+    return len(rows)
+
+
+def iter_listings(columns, page_size=1000, searchable=False):
+    """
+    Stream selected columns of every row in LISTINGS_TABLE, ordered by id.
+
+    Args:
+        columns: Columns to read
+        page_size: Rows per request
+        searchable: Read the rows searches see instead: the
+                    whatsapp_listings_relevant view, restricted by canonical_only
+
+    Raises:
+        RuntimeError: If Supabase is not configured
+    """
+    if not supabase:
+        raise RuntimeError("Supabase is not configured; set USE_SUPABASE, SUPABASE_URL and SUPABASE_KEY")
+
+    start = 0
+    while True:
+        with DB_QUERY_LATENCY.labels(operation="iter_listings").time():
+            query = supabase.table('whatsapp_listings_relevant' if searchable else LISTINGS_TABLE)\
+                .select(",".join(columns))
+            if searchable:
+                query = canonical_only(query)
+            response = query\
+                .order('id')\
+                .range(start, start + page_size - 1)\
+                .execute()
+        yield from response.data
+        if len(response.data) < page_size:
+            return
+        start += page_size
+
+
+def mark_duplicates(canonical_id, duplicate_ids):
+    """
+    Point reposts at their canonical listing and flag them as duplicates.
+
+    Raises:
+        RuntimeError: If Supabase is not configured
+    """
+    if not supabase:
+        raise RuntimeError("Supabase is not configured; set USE_SUPABASE, SUPABASE_URL and SUPABASE_KEY")
+
+    with DB_QUERY_LATENCY.labels(operation="mark_duplicates").time():
+        supabase.table(LISTINGS_TABLE)\
+            .update({"canonical_id": canonical_id, "is_duplicate": True})\
+            .in_('id', list(duplicate_ids))\
+            .execute()
+        supabase.table(LISTINGS_TABLE)\
+            .update({"canonical_id": canonical_id, "is_duplicate": False})\
+            .eq('id', canonical_id)\
+            .execute()
+
+
+def clear_duplicates(listing_ids, chunk_size=200):
+    """
+    Unflag listings that are no longer reposts of another listing.
+
+    Raises:
+        RuntimeError: If Supabase is not configured
+    """
+    if not supabase:
+        raise RuntimeError("Supabase is not configured; set USE_SUPABASE, SUPABASE_URL and SUPABASE_KEY")
+
+    listing_ids = list(listing_ids)
+    for start in range(0, len(listing_ids), chunk_size):
+        with DB_QUERY_LATENCY.labels(operation="clear_duplicates").time():
+            supabase.table(LISTINGS_TABLE)\
+                .update({"canonical_id": None, "is_duplicate": False})\
+                .in_('id', listing_ids[start:start + chunk_size])\
+                .execute()
+
+
+def update_listing_columns(rows, columns, chunk_size=200):
+    """
+    Write selected columns of existing listings.
+
+    Rows are updated, never inserted, so a listing deleted in the meantime
+    stays deleted. Rows with the same values share one UPDATE ... WHERE id IN
+    request per chunk.
+
+    Returns:
+        Number of rows updated
+
+    Raises:
+        RuntimeError: If Supabase is not configured
+    """
+    if not supabase:
+        raise RuntimeError("Supabase is not configured; set USE_SUPABASE, SUPABASE_URL and SUPABASE_KEY")
+
+    groups = {}
+    for row in rows:
+        values = tuple(row.get(column) for column in columns)
+        groups.setdefault(values, []).append(row["id"])
+
+    updated = 0
+    for values, listing_ids in groups.items():
+        for start in range(0, len(listing_ids), chunk_size):
+            with DB_QUERY_LATENCY.labels(operation="update_listing_columns").time():
+                response = supabase.table(LISTINGS_TABLE)\
+                    .update(dict(zip(columns, values, strict=True)))\
+                    .in_('id', listing_ids[start:start + chunk_size])\
+                    .execute()
+            updated += len(response.data)
+    return updated
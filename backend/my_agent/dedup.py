@@ -0,0 +1,357 @@
+"""
+Near-duplicate detection for listings reposted across WhatsApp groups.
+
+Brokers forward the same property to several groups, often with reworded
+text and their own signature, so one property shows up as several rows.
+Each raw_message is reduced to word shingles, summarised as a MinHash
+signature and bucketed with LSH banding: only listings sharing a band bucket
+are compared, so finding duplicates costs roughly O(n) instead of O(n²).
+Candidate pairs are confirmed with the exact Jaccard similarity of their
+shingles, and confirmed pairs are joined into clusters with union-find.
+
+Every listing in a cluster gets the cluster's canonical_id, the ID of its
+earliest listing. Search and aggregates only look at canonical listings.
+
+On Supabase, the backfill writes canonical_id and is_duplicate columns that
+need to exist first:
+
+    alter table whatsapp_listing_data
+        add column canonical_id uuid,
+        add column is_duplicate boolean not null default false;
+
+and the whatsapp_listings_relevant view must expose is_duplicate. Then run
+`python -m my_agent.dedup --backfill` and set SUPABASE_CANONICAL_ONLY=true.
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import re
+from collections import defaultdict
+
+from .metrics import DEDUP_DUPLICATES
+
+# 16 bands of 4 rows catch pairs from a Jaccard similarity of about
+# (1/16) ** (1/4) = 0.5, below the confirmation threshold
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_WORDS = 2
+DEDUP_JACCARD_THRESHOLD = float(os.getenv("DEDUP_JACCARD_THRESHOLD", "0.6"))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(41)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
+PHONE_PATTERN = re.compile(r"(?:\+91[\s-]*)?\d[\d\s-]{8,}\d")
+# "3BHK" and "3 BHK" should produce the same shingles
+DIGIT_LETTER_PATTERN = re.compile(r"(?<=\d)(?=[a-z])|(?<=[a-z])(?=\d)")
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9.]+|(?<!\d)\.|\.(?!\d)")
+
+# Reposts of one property never change these; differing values mean
+# two similar templates for different properties, such as one broker's
+# posts for several units in a project
+GUARD_FIELDS = ("message_type", "property_type", "bedroom_count", "area_sqft", "price")
+# Prices are compared to the lakh, so "1.85 Cr" and "185 L" agree
+PRICE_BUCKET = 100_000
+
+
+def normalize_text(text):
+    """Lowercase text with URLs, phone numbers, emoji and punctuation removed."""
+    text = (text or "").lower()
+    text = URL_PATTERN.sub(" ", text)
+    text = PHONE_PATTERN.sub(" ", text)
+    text = DIGIT_LETTER_PATTERN.sub(" ", text)
+    return " ".join(NON_WORD_PATTERN.sub(" ", text).split())
+
+
+def shingles(text):
+    """Set of SHINGLE_WORDS-word shingles of the normalized text."""
+    words = normalize_text(text).split()
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {
+        " ".join(words[i : i + SHINGLE_WORDS])
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash(shingle_set):
+    """MinHash signature: the minimum of each permutation over the shingle hashes."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in shingle_set
+    ]
+    if not hashes:
+        return None
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS
+    )
+
+
+def _bands(signature):
+    for band in range(LSH_BANDS):
+        yield band, signature[band * LSH_ROWS : (band + 1) * LSH_ROWS]
+
+
+class UnionFind:
+    """Disjoint sets over hashable items, with path compression."""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        root = self.parent.setdefault(item, item)
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while item != root:  # Path compression
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+def _number(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def guard_key(listing):
+    """Fields two listings must share to be reposts of one property."""
+    price = _number(listing.get("price"))
+    return (
+        listing.get("message_type"),
+        listing.get("property_type"),
+        _number(listing.get("bedroom_count")),
+        _number(listing.get("area_sqft")),
+        None if price is None else round(price / PRICE_BUCKET),
+    )
+
+
+def _sort_key(listing):
+    return (str(listing.get("message_date") or ""), str(listing.get("id")))
+
+
+class DedupIndex:
+    """
+    Incremental near-duplicate index.
+
+    Listings are added one at a time; each is compared only with earlier
+    listings that share an LSH bucket with it.
+    """
+
+    def __init__(self, threshold=DEDUP_JACCARD_THRESHOLD):
+        self.threshold = threshold
+        self._buckets = defaultdict(list)
+        self._shingles = {}
+        self._guards = {}
+        self._clusters = UnionFind()
+
+    def __len__(self):
+        return len(self._shingles)
+
+    def candidates(self, signature):
+        """IDs sharing at least one band bucket with the signature."""
+        found = set()
+        for key in _bands(signature):
+            found.update(self._buckets.get(key, ()))
+        return found
+
+    def add(self, listing):
+        """
+        Index a listing and link it to any near-duplicates already indexed.
+
+        Returns:
+            IDs of the confirmed duplicates among earlier listings
+        """
+        listing_id = listing["id"]
+        self._clusters.find(listing_id)
+        shingle_set = shingles(listing.get("raw_message"))
+        signature = minhash(shingle_set)
+        if signature is None:
+            return []
+
+        guard = guard_key(listing)
+        matches = [
+            other
+            for other in self.candidates(signature)
+            if self._guards[other] == guard
+            and jaccard(shingle_set, self._shingles[other]) >= self.threshold
+        ]
+        for other in matches:
+            self._clusters.union(other, listing_id)
+
+        self._shingles[listing_id] = shingle_set
+        self._guards[listing_id] = guard
+        for key in _bands(signature):
+            self._buckets[key].append(listing_id)
+        return matches
+
+    def clusters(self):
+        """Mapping of cluster root to the IDs in that cluster."""
+        groups = defaultdict(list)
+        for listing_id in self._clusters.parent:
+            groups[self._clusters.find(listing_id)].append(listing_id)
+        return groups
+
+
+def find_duplicates(listings, threshold=DEDUP_JACCARD_THRESHOLD):
+    """
+    Cluster near-duplicate listings.
+
+    Returns:
+        Dict of listing ID to canonical listing ID (the earliest listing of
+        its cluster by message_date, then ID). Unique listings map to
+        themselves.
+    """
+    ordered = sorted(listings, key=_sort_key)
+    index = DedupIndex(threshold)
+    for listing in ordered:
+        index.add(listing)
+
+    position = {listing["id"]: i for i, listing in enumerate(ordered)}
+    canonical = {}
+    for members in index.clusters().values():
+        first = min(members, key=position.__getitem__)
+        for listing_id in members:
+            canonical[listing_id] = first
+    return canonical
+
+
+def annotate_duplicates(listings, threshold=DEDUP_JACCARD_THRESHOLD):
+    """
+    Set canonical_id, is_duplicate and duplicate_count on listings in place.
+
+    duplicate_count is the number of reposts folded into a canonical listing
+    (0 on the reposts themselves).
+
+    Returns:
+        The listings
+    """
+    canonical = find_duplicates(listings, threshold)
+    counts = defaultdict(int)
+    for listing_id, canonical_id in canonical.items():
+        if listing_id != canonical_id:
+            counts[canonical_id] += 1
+    for listing in listings:
+        canonical_id = canonical.get(listing["id"], listing["id"])
+        listing["canonical_id"] = canonical_id
+        listing["is_duplicate"] = canonical_id != listing["id"]
+        listing["duplicate_count"] = counts.get(listing["id"], 0)
+    DEDUP_DUPLICATES.set(sum(counts.values()))
+    return listings
+
+
+def canonical_listings(listings):
+    """Listings that are not reposts of an earlier listing."""
+    if hasattr(listings, "canonical"):
+        # A ListingSnapshot stores canonical rows first and slices them
+        return listings.canonical()
+    return [listing for listing in listings if not listing.get("is_duplicate")]
+
+
+def backfill(page_size=1000):
+    """
+    Recompute clusters over the whole listings table and store canonical IDs.
+
+    Listings flagged by an earlier backfill that no longer belong to a
+    cluster are cleared.
+
+    Returns:
+        (listings scanned, listings marked as duplicates)
+    """
+    from .database import clear_duplicates, iter_listings, mark_duplicates
+
+    listings = list(
+        iter_listings(
+            [
+                "id",
+                "raw_message",
+                "message_date",
+                "canonical_id",
+                "is_duplicate",
+                *GUARD_FIELDS,
+            ],
+            page_size=page_size,
+        )
+    )
+    canonical = find_duplicates(listings)
+
+    clusters = defaultdict(list)
+    for listing_id, canonical_id in canonical.items():
+        clusters[canonical_id].append(listing_id)
+    stale = [
+        listing["id"]
+        for listing in listings
+        if canonical[listing["id"]] == listing["id"]
+        and len(clusters[listing["id"]]) == 1
+        and (
+            listing.get("is_duplicate")
+            or listing.get("canonical_id") not in (None, listing["id"])
+        )
+    ]
+    if stale:
+        clear_duplicates(stale)
+    duplicates = 0
+    for canonical_id, members in clusters.items():
+        if len(members) > 1:
+            mark_duplicates(canonical_id, [m for m in members if m != canonical_id])
+            duplicates += len(members) - 1
+    DEDUP_DUPLICATES.set(duplicates)
+    return len(listings), duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate listings")
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Write canonical_id and is_duplicate to Supabase",
+    )
+    parser.add_argument(
+        "--input", help="Report clusters in a JSON/JSONL/CSV export instead"
+    )
+    parser.add_argument("--page-size", type=int, default=1000)
+    cli = parser.parse_args()
+
+    if cli.backfill:
+        scanned, duplicates = backfill(cli.page_size)
+        print(f"Scanned {scanned} listings, marked {duplicates} duplicates")
+        return
+    if not cli.input:
+        parser.error("pass --backfill or --input")
+
+    from .loader import read_rows
+
+    listings = [listing for listing in read_rows(cli.input) if listing.get("id")]
+    canonical = find_duplicates(listings)
+    clusters = defaultdict(list)
+    for listing_id, canonical_id in canonical.items():
+        clusters[canonical_id].append(listing_id)
+    repeated = {k: v for k, v in clusters.items() if len(v) > 1}
+    print(
+        f"{len(listings)} listings, {len(repeated)} clusters, "
+        f"{sum(len(v) - 1 for v in repeated.values())} duplicates"
+    )
+    for canonical_id, members in sorted(repeated.items(), key=lambda kv: -len(kv[1])):
+        print(f"  {canonical_id}: {len(members) - 1} reposts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Deterministic fast path for formulaic broker questions.
+
+Questions like "how many villas in Hebbal", "avg price 3BHK Whitefield" or
+"localities near Manyata Tech Park" are parsed with regular expressions and
+answered straight from the tools with a templated reply, skipping the model
+round trips. Anything that doesn't parse cleanly returns None and goes to
+the LLM as before.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+
+from .analytics_tools import summarize_listings
+from .geo import resolve_place
+from .locality_data import known_localities
+from .metrics import FAST_PATH_REQUESTS
+from .tools import get_nearby_localities, search_all_listings, search_listings_batch
+
+PROPERTY_TYPE_WORDS = {
+    "apartment": "apartment",
+    "apartments": "apartment",
+    "flat": "apartment",
+    "flats": "apartment",
+    "villa": "villa",
+    "villas": "villa",
+    "plot": "plot",
+    "plots": "plot",
+    "land": "plot",
+    "lands": "plot",
+    "office": "office",
+    "offices": "office",
+    "house": "independent_house",
+    "houses": "independent_house",
+    "independent house": "independent_house",
+    "independent houses": "independent_house",
+}
+# Words that mean "any property"
+ANY_PROPERTY_WORDS = {"listing", "listings", "property", "properties", "units"}
+
+MESSAGE_TYPE_PHRASES = {
+    "for sale": "supply_sale",
+    "on sale": "supply_sale",
+    "for rent": "supply_rent",
+    "on rent": "supply_rent",
+}
+
+_TYPE = "|".join(
+    sorted(list(PROPERTY_TYPE_WORDS) + list(ANY_PROPERTY_WORDS), key=len, reverse=True)
+)
+_PURPOSE = "|".join(MESSAGE_TYPE_PHRASES)
+_LOCALITY = r"(?P<locality>[a-z][a-z .\-]{1,40}?)"
+
+COUNT_PATTERN = re.compile(
+    rf"^how many (?P<type>{_TYPE})(?: are there| are available| available)?"
+    rf"(?: (?P<purpose>{_PURPOSE}))? in {_LOCALITY}(?: (?P<purpose_after>{_PURPOSE}))?$"
+)
+AVG_PRICE_PATTERN = re.compile(
+    rf"^(?:what is |what's )?(?:the )?(?:avg|average|mean) price(?: of| for)?"
+    rf"(?: (?P<bhk>\d)\s?bhk)?(?: (?P<type>{_TYPE}))?(?: in)? {_LOCALITY}$"
+)
+NEARBY_PATTERN = re.compile(
+    r"^(?:which |what |show |list )?(?:the )?(?:localities|areas|places|locations) "
+    r"(?:near|around|close to) (?P<landmark>[a-z][a-z .\-]{1,40})$"
+)
+
+
+@dataclass
+class FastPathAnswer:
+    """A templated reply produced without the LLM."""
+
+    intent: str
+    text: str
+    filters: list = field(default_factory=list)
+
+
+def _normalize(message):
+    text = message.lower().strip()
+    text = re.sub(r"[?!.,]+$", "", text)
+    return re.sub(r"\s+", " ", text)
+
+
+def _locality_filter(raw):
+    """Locality filter plus whether the name is a known locality."""
+    known = known_localities()
+    name = known.get(raw.strip(), raw.strip().title())
+    return {"field": "locality", "op": "eq", "value": name}, raw.strip() in known
+
+
+def _type_filters(type_word):
+    property_type = PROPERTY_TYPE_WORDS.get(type_word)
+    if property_type:
+        return [{"field": "property_type", "op": "eq", "value": property_type}]
+    return []
+
+
+def _format(filters, summary):
+    """Reply in the agent's required format: filters JSON block, then prose."""
+    return f"```json\n{json.dumps(filters, indent=2)}\n```\n{summary}"
+
+
+def _answer_count(match):
+    locality_filter, known = _locality_filter(match["locality"])
+    filters = _type_filters(match["type"])
+    purpose = match["purpose"] or match["purpose_after"]
+    if purpose:
+        filters.append(
+            {
+                "field": "message_type",
+                "op": "eq",
+                "value": MESSAGE_TYPE_PHRASES[purpose],
+            }
+        )
+    filters.append(locality_filter)
+
+    count = search_listings_batch([filters], count_only=True)[0]["count"]
+    if count == 0 and not known:
+        return None  # Probably not a locality; let the model interpret it
+
+    property_type = PROPERTY_TYPE_WORDS.get(match["type"])
+    label = f"{property_type.replace('_', ' ')} " if property_type else ""
+    purpose_text = f" {purpose}" if purpose else ""
+    verb, plural = ("is", "") if count == 1 else ("are", "s")
+    summary = f"There {verb} {count} {label}listing{plural}{purpose_text} in {locality_filter['value']}."
+    return FastPathAnswer("count", _format(filters, summary), filters)
+
+
+def _answer_avg_price(match):
+    locality_filter, known = _locality_filter(match["locality"])
+    filters = []
+    if match["bhk"]:
+        filters.append({"field": "bhk", "op": "eq", "value": int(match["bhk"])})
+    if match["type"]:
+        filters.extend(_type_filters(match["type"]))
+    filters.append(locality_filter)
+
+    # Every match, not the first MAX_RESULTS a search returns
+    stats = summarize_listings(search_all_listings(filters))
+    price_stats = stats.get("price_stats")
+    if not price_stats:
+        if not known:
+            return None
+        summary = f"No priced listings match in {locality_filter['value']}."
+        return FastPathAnswer("avg_price", _format(filters, summary), filters)
+
+    what = f"{match['bhk']} BHK " if match["bhk"] else ""
+    summary = (
+        f"The average price of {what}listings in {locality_filter['value']} is "
+        f"₹{price_stats['avg_cr']} Cr across {stats['count']} listings "
+        f"(median ₹{price_stats['median_cr']} Cr, range ₹{price_stats['min_cr']}\u2013{price_stats['max_cr']} Cr)."
+    )
+    return FastPathAnswer("avg_price", _format(filters, summary), filters)
+
+
+def _answer_nearby(match):
+    landmark = resolve_place(match["landmark"])
+    if not landmark:
+        return None
+
+    localities = get_nearby_localities(landmark)
+    if not localities:
+        return None
+
+    filters = [{"field": "near_landmark", "op": "near", "value": landmark}]
+    summary = f"Localities near {landmark}: {', '.join(localities)}."
+    return FastPathAnswer("nearby", _format(filters, summary), filters)
+
+
+PATTERNS = [
+    (COUNT_PATTERN, _answer_count),
+    (AVG_PRICE_PATTERN, _answer_avg_price),
+    (NEARBY_PATTERN, _answer_nearby),
+]
+
+
+def try_answer(message):
+    """
+    Answer a formulaic question without the LLM.
+
+    Args:
+        message: The user's chat message
+
+    Returns:
+        FastPathAnswer, or None if the message should go to the agent
+    """
+    text = _normalize(message)
+    for pattern, handler in PATTERNS:
+        match = pattern.match(text)
+        if not match:
+            continue
+        try:
+            answer = handler(match)
+        except Exception as e:
+            print(f"⚠️  Fast path failed, falling back to agent: {e}")
+            answer = None
+        if answer:
+            FAST_PATH_REQUESTS.labels(intent=answer.intent).inc()
+            print(f"⚡ Fast path answered '{answer.intent}' query")
+            return answer
+        break
+
+    FAST_PATH_REQUESTS.labels(intent="none").inc()
+    return None
@@ -2,20 +2,54 @@
 Filter logic and query building for listings search.
 """
 from pydantic import BaseModel, Field
-from typing import List, Literal, Union
+from typing import List, Literal, Optional, Union
 from datetime import datetime, timedelta
+from functools import lru_cache
+import json
+
+# Default look-back window applied when a query has no date filter
+DEFAULT_RECENT_DAYS = 30
 
 class ListingFilter(BaseModel):
     field: Literal["price_cr", "bhk", "area_sqft", "locality", "near_landmark", 
                    "status", "property_type", "investment_grade", "message_type", "message_date"] = Field(
                        description="The attribute to filter on"
                    )
-    op: Literal["eq", "gt", "lt", "gte", "lte", "in", "near"] = Field(
+    op: Literal["eq", "gt", "lt", "gte", "lte", "in", "near", "within_km"] = Field(
         description="The comparison operator"
     )
     value: Union[str, int, float, bool, List[str], List[int]] = Field(
         description="The value to compare against"
     )
+    km: Optional[float] = Field(
+        default=None, description="Radius in kilometres for the within_km op"
+    )
+
+
+def is_geo_filter(field, op):
+    """
+    Whether a filter selects listings by distance from a place. Every
+    near_landmark filter does; listings have no landmark column.
+    """
+    return op == "within_km" or field == "near_landmark"
+
+
+def geo_localities(op, place, km=None):
+    """
+    Localities a geo filter matches: those within km of place for within_km,
+    or the landmark's nearby localities for near (see geo.py).
+    """
+    from .geo import GEO_NEAR_KM, localities_within, nearby_localities
+
+    if op == "within_km":
+        return localities_within(place, GEO_NEAR_KM if km is None else km)
+    return nearby_localities(place)
+
+
+@lru_cache(maxsize=1024)
+def _geo_location_keys(op, place, km=None):
+    """Lowercased geo_localities, for matching listing locations."""
+    return frozenset(l.lower() for l in geo_localities(op, place, km))
 
 
 def get_listing_value(listing: dict, field: str):
@@ -35,6 +69,9 @@ def get_listing_value(listing: dict, field: str):
         return listing.get("property_type")
     elif field == "message_type":
         return listing.get("message_type")
+    elif field == "message_date":
+        # ISO-8601 strings compare correctly as plain strings
+        return listing.get("message_date")
     elif field == "status":
         # Derive from special_features
         features = listing.get("special_features", [])
@@ -61,7 +98,11 @@ def apply_filter(listing: dict, filter_obj: ListingFilter) -> bool:
     field = filter_obj.field
     op = filter_obj.op
     value = filter_obj.value
-    
+
+    if is_geo_filter(field, op):
+        location = listing.get("location")
+        return bool(location) and location.lower() in _geo_location_keys(op, str(value), filter_obj.km)
+
     listing_value = get_listing_value(listing, field)
     
     if listing_value is None:
@@ -93,13 +134,6 @@ def apply_filter(listing: dict, filter_obj: ListingFilter) -> bool:
             return listing_value in value
         return False
     elif op == "near":
-        # Import here to avoid circular dependency
-        from .locality_data import LANDMARK_TO_LOCALITIES
-        # For near_landmark, check if locality is in the landmark's area
-        if field == "near_landmark":
-            locality = listing.get("location")
-            nearby = LANDMARK_TO_LOCALITIES.get(value, [])
-            return locality in nearby
         # For locality partial match
         if isinstance(listing_value, str) and isinstance(value, str):
             return value.lower() in listing_value.lower()
@@ -108,14 +142,59 @@ def apply_filter(listing: dict, filter_obj: ListingFilter) -> bool:
     return False
 
 
-def apply_filters_to_supabase_query(query, filters):
-    """Apply filter JSON to Supabase query dynamically."""
-    from .locality_data import LANDMARK_TO_LOCALITIES
-    
+def filter_key(filter_obj):
+    """
+    Canonical, hashable key for a filter dict or ListingFilter.
+
+    Two filters with the same key select the same listings, so the key can be
+    used to share predicate evaluation and cache results across queries.
+    """
+    if isinstance(filter_obj, ListingFilter):
+        filter_obj = filter_obj.model_dump()
+    field = filter_obj.get("field")
+    op = filter_obj.get("op")
+    value = filter_obj.get("value")
+    if field == "locality":
+        # Locality matching is case-insensitive
+        value = [v.lower() for v in value] if isinstance(value, list) else str(value).lower()
+    if op == "in" and isinstance(value, list):
+        value = sorted(value, key=str)
+    if op == "within_km":
+        value = [str(value).lower(), filter_obj.get("km")]
+    return (field, op, json.dumps(value, sort_keys=True, default=str))
+
+
+def recent_date_filter():
+    """Filter dict for the default 'last N days' window used by Supabase queries."""
+    since = (datetime.now() - timedelta(days=DEFAULT_RECENT_DAYS)).isoformat()
+    return {"field": "message_date", "op": "gte", "value": since}
+
+
+def has_date_filter(filters):
+    """True if any filter in the list constrains message_date."""
+    return any(f.get("field") in ["message_date", "date"] for f in filters)
+
+
+def apply_filters_to_supabase_query(query, filters, default_recent=True):
+    """
+    Apply filter JSON to Supabase query dynamically.
+
+    If default_recent is True and no date filter is given, the query is limited
+    to listings from the last DEFAULT_RECENT_DAYS days.
+    """
     for filter_obj in filters:
         field = filter_obj.get("field")
         op = filter_obj.get("op")
         value = filter_obj.get("value")
+
+        if is_geo_filter(field, op):
+            # Distance resolves to a set of localities, matched exactly; an
+            # unknown place matches nothing, as in apply_filter
+            nearby_localities = geo_localities(op, str(value), filter_obj.get("km"))
+            if not nearby_localities:
+                print(f"⚠️  Unknown place for {field} {op}: {value}")
+            query = query.in_("location", list(nearby_localities))
+            continue
         
         # Map filter fields to database columns
         db_field = field
@@ -149,12 +228,6 @@ def apply_filters_to_supabase_query(query, filters):
                     or_conditions = ",".join([f'location.ilike.%{v}%' for v in value])
                     query = query.or_(or_conditions)
                 continue
-        elif field == "near_landmark":
-            # Handle landmark proximity with location IN query
-            nearby_localities = LANDMARK_TO_LOCALITIES.get(value, [])
-            if nearby_localities:
-                query = query.in_("location", nearby_localities)
-            continue
         elif field == "status":
             # Status is derived from special_features, skip for now
             continue
@@ -184,10 +257,8 @@ def apply_filters_to_supabase_query(query, filters):
             query = query.ilike(db_field, f"%{value}%")
     
     # If no date filter specified, default to recent listings (last 30 days)
-    has_date_filter = any(f.get("field") in ["message_date", "date"] for f in filters)
-    if not has_date_filter:
-        thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
-        query = query.gte("message_date", thirty_days_ago)
-        print(f"📅 No date filter specified, defaulting to listings from last 30 days")
+    if default_recent and not has_date_filter(filters):
+        query = query.gte("message_date", recent_date_filter()["value"])
+        print(f"📅 No date filter specified, defaulting to listings from last {DEFAULT_RECENT_DAYS} days")
     
     return query
@@ -0,0 +1,131 @@
+"""
+Radius search over localities.
+
+Places (localities and landmarks) come from the offline coordinate tables in
+locality_data. Localities are bucketed in a fixed latitude/longitude grid,
+so finding those within a radius only measures the few cells the radius
+overlaps. Results are memoized per (place, radius): a filter resolves to its
+candidate locality set once, and that set becomes a location IN query on
+Supabase or a set lookup in mock mode.
+"""
+
+import math
+import os
+from collections import defaultdict
+from functools import lru_cache
+
+from .locality_data import (
+    LANDMARK_ALIASES,
+    LANDMARK_COORDINATES,
+    LANDMARK_TO_LOCALITIES,
+    LOCALITY_COORDINATES,
+)
+
+# Radius used by the "near" op
+GEO_NEAR_KM = float(os.getenv("GEO_NEAR_KM", "5"))
+EARTH_RADIUS_KM = 6371.0
+# Grid cell size in degrees (about 5.5 km north-south)
+CELL_DEGREES = 0.05
+
+
+def distance_km(a, b):
+    """Great-circle distance between two (latitude, longitude) points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def _cell(point):
+    return (math.floor(point[0] / CELL_DEGREES), math.floor(point[1] / CELL_DEGREES))
+
+
+class GridIndex:
+    """
+    Named points bucketed by grid cell.
+
+    Args:
+        points: Dict of name to (latitude, longitude)
+    """
+
+    def __init__(self, points):
+        self.points = dict(points)
+        self._cells = defaultdict(list)
+        for name, point in self.points.items():
+            self._cells[_cell(point)].append(name)
+
+    def within(self, center, km):
+        """Names within km of center, nearest first, as (name, distance) pairs."""
+        lat_cells = math.ceil(km / 111.0 / CELL_DEGREES)
+        lon_km = 111.0 * max(math.cos(math.radians(center[0])), 0.01)
+        lon_cells = math.ceil(km / lon_km / CELL_DEGREES)
+        row, col = _cell(center)
+
+        found = []
+        for r in range(row - lat_cells, row + lat_cells + 1):
+            for c in range(col - lon_cells, col + lon_cells + 1):
+                for name in self._cells.get((r, c), ()):
+                    d = distance_km(center, self.points[name])
+                    if d <= km:
+                        found.append((name, d))
+        return sorted(found, key=lambda nd: (nd[1], nd[0]))
+
+
+LOCALITY_INDEX = GridIndex(LOCALITY_COORDINATES)
+_PLACES = {
+    name.lower(): name for name in {**LOCALITY_COORDINATES, **LANDMARK_COORDINATES}
+}
+
+
+def resolve_place(name):
+    """
+    Canonical name of a locality or landmark, or None if it isn't known.
+
+    Accepts any case, known aliases ("manyata", "KIA") and unambiguous
+    partial names.
+    """
+    key = " ".join(str(name or "").lower().split())
+    if not key:
+        return None
+    if key in _PLACES:
+        return _PLACES[key]
+    if key in LANDMARK_ALIASES:
+        return LANDMARK_ALIASES[key]
+    partial = {place for k, place in _PLACES.items() if key in k}
+    return partial.pop() if len(partial) == 1 else None
+
+
+def coordinates(place):
+    """(latitude, longitude) of a place name, or None."""
+    place = resolve_place(place)
+    if place is None:
+        return None
+    # Landmarks first: a landmark named after a locality marks its hub
+    return LANDMARK_COORDINATES.get(place) or LOCALITY_COORDINATES.get(place)
+
+
+@lru_cache(maxsize=1024)
+def localities_within(place, km=GEO_NEAR_KM):
+    """
+    Localities within km of a locality or landmark, nearest first.
+
+    Returns:
+        Tuple of locality names; empty if the place is unknown
+    """
+    center = coordinates(place)
+    if center is None:
+        return ()
+    return tuple(name for name, _ in LOCALITY_INDEX.within(center, float(km)))
+
+
+@lru_cache(maxsize=1024)
+def nearby_localities(place, km=None):
+    """
+    Localities near a place: the curated LANDMARK_TO_LOCALITIES entry, then
+    the rest of those within km (GEO_NEAR_KM by default).
+    """
+    km = GEO_NEAR_KM if km is None else km
+    curated = LANDMARK_TO_LOCALITIES.get(resolve_place(place) or place, [])
+    return tuple(dict.fromkeys([*curated, *localities_within(place, km)]))
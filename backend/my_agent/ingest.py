@@ -0,0 +1,522 @@
+"""
+WhatsApp message ingestion pipeline.
+
+Raw broker messages are split into one chunk per listing. Chunks the rule
+extractor parses with high confidence skip the model; the rest are extracted
+to structured rows by Gemini in batches (bounded concurrency, retry with
+backoff). Everything is validated, price columns are normalized per batch,
+and rows are bulk upserted. Completed message IDs are appended
+to a checkpoint log after every upsert, so a crashed run resumes where it
+stopped; row IDs are derived from the source message, so replaying a
+partially written batch is harmless.
+
+Usage (from backend/):
+    python -m my_agent.ingest messages.jsonl --checkpoint .cache/ingest.ckpt
+    python -m my_agent.ingest export.csv --out listings.jsonl
+"""
+
+import asyncio
+import csv
+import json
+import os
+import pathlib
+import random
+import re
+import time
+import uuid
+from typing import Literal
+
+from pydantic import BaseModel, Field, ValidationError
+
+from . import rule_extractor
+from .metrics import (
+    INGEST_BATCH_LATENCY,
+    INGEST_CHUNKS,
+    INGEST_MESSAGES,
+    INGEST_ROWS_WRITTEN,
+    INGEST_THROUGHPUT,
+)
+from .prices import normalize_rows
+
+INGEST_MODEL = os.getenv("INGEST_MODEL", "gemini-2.5-flash")
+# Chunks per extraction request, and requests in flight at once
+EXTRACT_BATCH_SIZE = int(os.getenv("INGEST_EXTRACT_BATCH_SIZE", "10"))
+EXTRACT_CONCURRENCY = int(os.getenv("INGEST_EXTRACT_CONCURRENCY", "4"))
+MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "3"))
+RETRY_BASE_SECONDS = 1.0
+UPSERT_BATCH_SIZE = int(os.getenv("INGEST_UPSERT_BATCH_SIZE", "200"))
+
+# Namespace for deterministic listing IDs (source message ID + split index)
+LISTING_ID_NAMESPACE = uuid.UUID("6f1c3c2e-4a43-4b8e-9a55-0d6c2b7f9e10")
+
+BHK_PATTERN = re.compile(r"\b\d+(?:\.5)?\s*bhk\b", re.IGNORECASE)
+AREA_PATTERN = re.compile(
+    r"\b\d[\d,]*(?:\.\d+)?\s*(?:sq\.?\s*ft|sqft|sft|sq\.?\s*yd|sq\.?\s*m|acres?|guntas?)\b"
+    r"|\b\d{2,3}\s*[x\u00d7]\s*\d{2,3}\b",
+    re.IGNORECASE,
+)
+PRICE_PATTERN = re.compile(
+    r"(?:₹|\brs\.?|\binr)\s*\d"
+    r"|\b\d[\d,]*(?:\.\d+)?\s*(?:cr|crs|crore|crores|l|lac|lacs|lakh|lakhs|k)\b",
+    re.IGNORECASE,
+)
+SEPARATOR_PATTERN = re.compile(r"\n\s*(?:[-=_*~•]{3,}\s*)?\n")
+
+try:
+    _instruction_path = pathlib.Path(__file__).parent / "extraction_instructions.md"
+    with open(_instruction_path) as f:
+        EXTRACTION_INSTRUCTION = f.read()
+except Exception as e:
+    print(f"Error loading extraction instructions: {e}")
+    EXTRACTION_INSTRUCTION = (
+        "Extract one JSON object per numbered WhatsApp property message."
+    )
+
+
+class ExtractedListing(BaseModel):
+    """One listing as returned by the extraction model."""
+
+    index: int = Field(description="Number of the message this listing came from")
+    message_type: Literal[
+        "supply_sale", "supply_rent", "demand_buy", "demand_rent", "other"
+    ]
+    property_type: (
+        Literal[
+            "apartment",
+            "villa",
+            "independent_house",
+            "plot",
+            "office",
+            "commercial",
+            "land",
+        ]
+        | None
+    ) = None
+    bedroom_count: int | None = Field(default=None, ge=0, le=20)
+    area_sqft: int | None = Field(default=None, ge=0)
+    price: int | None = Field(default=None, ge=0)
+    price_text: str | None = None
+    location: str | None = None
+    project_name: str | None = None
+    furnishing_status: (
+        Literal["unfurnished", "semi_furnished", "fully_furnished"] | None
+    ) = None
+    facing_direction: str | None = None
+    parking_count: int | None = Field(default=None, ge=0)
+    special_features: list[str] = Field(default_factory=list)
+    agent_name: str | None = None
+    company_name: str | None = None
+    agent_contact: str | None = None
+
+
+def _is_valid(fields):
+    """True if rule-extracted fields pass the same validation as model output."""
+    try:
+        ExtractedListing.model_validate({"index": 0, **fields})
+    except ValidationError:
+        return False
+    return True
+
+
+def _signal_count(text):
+    """How many of BHK, area and price a block of text states."""
+    return sum(bool(p.search(text)) for p in (BHK_PATTERN, AREA_PATTERN, PRICE_PATTERN))
+
+
+def split_message(text):
+    """
+    Split a multi-listing broker message into one chunk per listing.
+
+    A paragraph stating at least two of BHK, area and price counts as a
+    listing. With two or more such paragraphs, each chunk keeps the shared
+    header (paragraphs before the first listing) and footer (after the last,
+    usually the broker's signature) so it can be extracted on its own.
+    Paragraphs between listings, such as titles, attach to the next listing.
+
+    Returns:
+        List of chunk strings; a single-element list if nothing was split
+    """
+    paragraphs = [p.strip() for p in SEPARATOR_PATTERN.split(text or "") if p.strip()]
+    items = [i for i, p in enumerate(paragraphs) if _signal_count(p) >= 2]
+    if len(items) < 2:
+        return [text]
+
+    header = paragraphs[: items[0]]
+    footer = paragraphs[items[-1] + 1 :]
+    chunks = []
+    start = items[0]
+    for item in items:
+        body = paragraphs[start : item + 1]
+        chunks.append("\n\n".join(header + body + footer))
+        start = item + 1
+    return chunks
+
+
+def listing_id(source_id, split_index):
+    """Deterministic row ID, so re-ingesting a message updates its rows in place."""
+    return str(uuid.uuid5(LISTING_ID_NAMESPACE, f"{source_id}:{split_index}"))
+
+
+def read_messages(path):
+    """
+    Stream raw messages from a JSONL or CSV file, one dict per unique message.
+
+    Each record needs an ID (source_raw_message_id or id) and raw_message;
+    message_date, agent_name and agent_contact are carried over when present.
+    """
+    path = pathlib.Path(path)
+    seen = set()
+    with open(path, newline="", encoding="utf-8") as f:
+        records = (
+            csv.DictReader(f)
+            if path.suffix == ".csv"
+            else (json.loads(line) for line in f if line.strip())
+        )
+        for record in records:
+            source_id = record.get("source_raw_message_id") or record.get("id")
+            if not source_id or not record.get("raw_message") or source_id in seen:
+                continue
+            seen.add(source_id)
+            yield {
+                "id": source_id,
+                "raw_message": record["raw_message"],
+                "message_date": record.get("message_date") or None,
+                "agent_name": record.get("agent_name") or None,
+                "agent_contact": record.get("agent_contact") or None,
+            }
+
+
+class Checkpoint:
+    """
+    Append-only log of message IDs whose rows are safely written.
+
+    Args:
+        path: Log file (None = no checkpointing)
+    """
+
+    def __init__(self, path=None):
+        self.path = pathlib.Path(path) if path else None
+        self.done = set()
+        if self.path and self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        self.done.update(json.loads(line)["done"])
+                    except (json.JSONDecodeError, KeyError):
+                        continue  # Blank or torn last line from a crash
+
+    def mark(self, message_ids):
+        self.done.update(message_ids)
+        if not self.path or not message_ids:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"done": sorted(message_ids), "at": time.time()}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class GeminiExtractor:
+    """Extracts a batch of message chunks with one structured-output Gemini call."""
+
+    def __init__(self, model=INGEST_MODEL):
+        self.model = model
+        self._client = None
+
+    async def __call__(self, chunks):
+        from google import genai
+        from google.genai import types
+
+        if self._client is None:
+            self._client = genai.Client()
+        prompt = "\n\n".join(f"[{i}]\n{text}" for i, text in enumerate(chunks))
+        response = await self._client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                system_instruction=EXTRACTION_INSTRUCTION,
+                response_mime_type="application/json",
+                response_schema=list[ExtractedListing],
+                temperature=0,
+            ),
+        )
+        return json.loads(response.text)
+
+
+async def extract_with_retry(extract, chunks, max_retries=MAX_RETRIES):
+    """Call extract(chunks), retrying failures with exponential backoff and jitter."""
+    for attempt in range(max_retries + 1):
+        try:
+            return await extract(chunks)
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = RETRY_BASE_SECONDS * (2**attempt + random.random())
+            print(
+                f"⚠️  Extraction failed ({e}); retry {attempt + 1}/{max_retries} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+
+def build_rows(messages, chunk_refs, extracted, extractor="llm"):
+    """
+    Validate extracted objects and turn them into listing table rows.
+
+    Args:
+        messages: Source message dicts by ID
+        chunk_refs: (message_id, split_index or None, chunk text) per chunk, in prompt order
+        extracted: Raw objects returned by the extractor
+        extractor: "llm" or "rules", recorded in llm_json
+
+    Returns:
+        (rows, rejected) where rejected counts objects that failed validation
+    """
+    rows, rejected = [], 0
+    for item in extracted:
+        try:
+            listing = ExtractedListing.model_validate(item)
+            message_id, split_index, chunk = chunk_refs[listing.index]
+        except (ValidationError, IndexError, TypeError):
+            rejected += 1
+            continue
+        if listing.message_type == "other":
+            continue
+
+        message = messages[message_id]
+        data = listing.model_dump(exclude={"index"})
+        rows.append(
+            {
+                **data,
+                "id": listing_id(message_id, split_index),
+                "source_raw_message_id": message_id,
+                "message_date": message["message_date"],
+                "raw_message": chunk,
+                "agent_name": data["agent_name"] or message["agent_name"],
+                "agent_contact": data["agent_contact"] or message["agent_contact"],
+                "special_features": json.dumps(data["special_features"]),
+                "llm_json": json.dumps(
+                    {
+                        "split_index": split_index,
+                        "message_type": listing.message_type,
+                        "split_from_original": split_index is not None,
+                        "extractor": extractor,
+                    }
+                ),
+            }
+        )
+    return rows, rejected
+
+
+class IngestPipeline:
+    """
+    Streaming extraction pipeline.
+
+    Args:
+        sink: Callable writing a list of rows (e.g. database.upsert_listings)
+        extract: Async callable mapping a list of chunk texts to extracted objects
+        checkpoint: Checkpoint of completed message IDs
+        batch_size: Chunks per extraction call
+        concurrency: Extraction calls in flight
+        upsert_batch_size: Rows buffered before a write
+        rules_threshold: Rule-extractor confidence at which the LLM is skipped
+                         (None = always use the LLM)
+    """
+
+    def __init__(
+        self,
+        sink,
+        extract=None,
+        checkpoint=None,
+        batch_size=EXTRACT_BATCH_SIZE,
+        concurrency=EXTRACT_CONCURRENCY,
+        upsert_batch_size=UPSERT_BATCH_SIZE,
+        rules_threshold=rule_extractor.RULES_CONFIDENCE_THRESHOLD,
+    ):
+        self.sink = sink
+        self.extract = extract or GeminiExtractor()
+        self.checkpoint = checkpoint or Checkpoint()
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.upsert_batch_size = upsert_batch_size
+        self.rules_threshold = rules_threshold
+        self.stats = {
+            "messages": 0,
+            "skipped": 0,
+            "failed": 0,
+            "rejected": 0,
+            "rows": 0,
+            "rules_chunks": 0,
+            "llm_chunks": 0,
+        }
+        self._pending_rows = []
+        self._pending_ids = set()
+
+    def _batches(self, messages):
+        """
+        Group messages into extraction batches; a message's chunks stay together.
+
+        Yields:
+            (messages by ID, chunk refs for the LLM, (chunk ref, fields) parsed by rules)
+        """
+        batch, refs, ruled = {}, [], []
+        for message in messages:
+            if message["id"] in self.checkpoint.done:
+                self.stats["skipped"] += 1
+                INGEST_MESSAGES.labels(status="skipped").inc()
+                continue
+            chunks = split_message(message["raw_message"])
+            batch[message["id"]] = message
+            for i, chunk in enumerate(chunks):
+                ref = (message["id"], i if len(chunks) > 1 else None, chunk)
+                fields, confidence = rule_extractor.extract(chunk)
+                # A confident parse that wouldn't validate goes to the LLM
+                # rather than being dropped after its message is checkpointed
+                if (
+                    self.rules_threshold is not None
+                    and confidence >= self.rules_threshold
+                    and _is_valid(fields)
+                ):
+                    ruled.append((ref, fields))
+                else:
+                    refs.append(ref)
+            # Rule-only batches are cheap, but still bounded for checkpointing
+            if len(refs) >= self.batch_size or len(batch) >= self.batch_size * 5:
+                yield batch, refs, ruled
+                batch, refs, ruled = {}, [], []
+        if batch:
+            yield batch, refs, ruled
+
+    async def _process(self, batch, refs, ruled):
+        self.stats["rules_chunks"] += len(ruled)
+        self.stats["llm_chunks"] += len(refs)
+        INGEST_CHUNKS.labels(extractor="rules").inc(len(ruled))
+        INGEST_CHUNKS.labels(extractor="llm").inc(len(refs))
+
+        start = time.perf_counter()
+        try:
+            extracted = []
+            if refs:
+                extracted = await extract_with_retry(
+                    self.extract, [text for _, _, text in refs]
+                )
+        except Exception as e:
+            # Not checkpointed, so the next run retries these messages
+            print(f"❌ Extraction gave up on {len(batch)} messages: {e}")
+            self.stats["failed"] += len(batch)
+            INGEST_MESSAGES.labels(status="failed").inc(len(batch))
+            return
+        INGEST_BATCH_LATENCY.labels(stage="extract").observe(
+            time.perf_counter() - start
+        )
+
+        rows, rejected = build_rows(batch, refs, extracted)
+        rule_rows, _ = build_rows(
+            batch,
+            [ref for ref, _ in ruled],
+            [{"index": i, **fields} for i, (_, fields) in enumerate(ruled)],
+            extractor="rules",
+        )
+        rows += rule_rows
+        normalize_rows(rows)
+        self.stats["rejected"] += rejected
+        self.stats["messages"] += len(batch)
+        INGEST_MESSAGES.labels(status="extracted").inc(len(batch))
+        self._pending_rows.extend(rows)
+        self._pending_ids.update(batch)
+        if len(self._pending_rows) >= self.upsert_batch_size:
+            await self._flush()
+
+    async def _flush(self):
+        rows, ids = self._pending_rows, self._pending_ids
+        self._pending_rows, self._pending_ids = [], set()
+        if rows:
+            start = time.perf_counter()
+            await asyncio.to_thread(self.sink, rows)
+            INGEST_BATCH_LATENCY.labels(stage="upsert").observe(
+                time.perf_counter() - start
+            )
+            INGEST_ROWS_WRITTEN.inc(len(rows))
+            self.stats["rows"] += len(rows)
+        self.checkpoint.mark(ids)
+
+    async def run(self, messages):
+        """
+        Ingest an iterable of message dicts (see read_messages).
+
+        Returns:
+            Stats dict with message, row and failure counts and messages_per_sec
+        """
+        start = time.perf_counter()
+        in_flight = set()
+        for batch, refs, ruled in self._batches(messages):
+            if len(in_flight) >= self.concurrency:
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    task.result()  # Surface write errors instead of dropping them
+            in_flight.add(asyncio.create_task(self._process(batch, refs, ruled)))
+        if in_flight:
+            done, _ = await asyncio.wait(in_flight)
+            for task in done:
+                task.result()
+        await self._flush()
+
+        elapsed = time.perf_counter() - start
+        self.stats["seconds"] = round(elapsed, 3)
+        self.stats["messages_per_sec"] = (
+            round(self.stats["messages"] / elapsed, 2) if elapsed else 0.0
+        )
+        INGEST_THROUGHPUT.set(self.stats["messages_per_sec"])
+        return self.stats
+
+
+def jsonl_sink(path):
+    """Sink appending rows to a JSONL file, for runs without Supabase."""
+
+    def write(rows):
+        with open(path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    return write
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest raw WhatsApp broker messages")
+    parser.add_argument("input", help="JSONL or CSV file of raw messages")
+    parser.add_argument("--checkpoint", default=".cache/ingest.ckpt")
+    parser.add_argument(
+        "--out", help="Write rows to this JSONL file instead of Supabase"
+    )
+    parser.add_argument("--batch-size", type=int, default=EXTRACT_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=EXTRACT_CONCURRENCY)
+    parser.add_argument(
+        "--no-rules", action="store_true", help="Send every message to the LLM"
+    )
+    cli = parser.parse_args()
+
+    if cli.out:
+        sink = jsonl_sink(cli.out)
+    else:
+        from .database import upsert_listings
+
+        sink = upsert_listings
+
+    pipeline = IngestPipeline(
+        sink,
+        checkpoint=Checkpoint(cli.checkpoint),
+        batch_size=cli.batch_size,
+        concurrency=cli.concurrency,
+        rules_threshold=None
+        if cli.no_rules
+        else rule_extractor.RULES_CONFIDENCE_THRESHOLD,
+    )
+    stats = asyncio.run(pipeline.run(read_messages(cli.input)))
+    print(f"✅ Ingest finished: {json.dumps(stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Bulk loader for already-extracted listing rows.
+
+Reads CSV, JSON (array) or JSONL exports, normalizes each row to the
+listings table schema and upserts in large batches on parallel writers.
+Rows are keyed by source_raw_message_id: a row without an id gets the same
+deterministic id the ingestion pipeline would give it (source message ID
+plus split index), so loading a file twice updates rows instead of
+duplicating them. Repeated keys within a batch are collapsed to the last
+row, since one upsert cannot touch a row twice; a batch repeating a key of a
+batch still being written waits for it, so the last row always wins.
+
+Usage (from backend/):
+    python -m my_agent.loader export.csv more_rows.jsonl --writers 8
+    python -m my_agent.loader backfill.jsonl --dry-run
+"""
+
+import csv
+import json
+import os
+import pathlib
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .ingest import listing_id
+from .metrics import INGEST_BATCH_LATENCY, INGEST_ROWS_WRITTEN
+from .prices import normalize_rows
+
+LOADER_BATCH_SIZE = int(os.getenv("LOADER_BATCH_SIZE", "1000"))
+LOADER_WRITERS = int(os.getenv("LOADER_WRITERS", "4"))
+MAX_RETRIES = 3
+RETRY_BASE_SECONDS = 1.0
+
+# Columns written by the loader; created_at is left to the table default
+LISTING_COLUMNS = (
+    "id",
+    "source_raw_message_id",
+    "message_date",
+    "agent_contact",
+    "agent_name",
+    "company_name",
+    "raw_message",
+    "message_type",
+    "property_type",
+    "area_sqft",
+    "price",
+    "price_text",
+    "price_per_sqft",
+    "monthly_rent",
+    "location",
+    "project_name",
+    "furnishing_status",
+    "parking_count",
+    "parking_text",
+    "facing_direction",
+    "special_features",
+    "llm_json",
+    "bedroom_count",
+)
+INTEGER_COLUMNS = ("area_sqft", "price", "parking_count", "bedroom_count")
+
+
+def read_rows(path):
+    """Stream row dicts from a CSV, JSON array or JSONL file."""
+    path = pathlib.Path(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix == ".csv":
+            yield from csv.DictReader(f)
+        elif path.suffix == ".jsonl":
+            yield from (json.loads(line) for line in f if line.strip())
+        else:
+            yield from json.load(f)
+
+
+def _integer(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _json_text(value, default):
+    """JSON text of a value that may already be JSON text."""
+    if value is None:
+        return json.dumps(default)
+    if isinstance(value, str):
+        try:
+            return json.dumps(json.loads(value))
+        except json.JSONDecodeError:
+            return json.dumps(default)
+    return json.dumps(value)
+
+
+def normalize_row(record):
+    """
+    Map an exported or hand-written record onto the listings table columns.
+
+    Blank strings become None, counts become integers, special_features and
+    llm_json become JSON text, and a missing id is derived from
+    source_raw_message_id and the split index in llm_json.
+
+    Returns:
+        Row dict, or None if the record has no source_raw_message_id
+    """
+    record = {k: (None if v == "" else v) for k, v in record.items()}
+    source_id = record.get("source_raw_message_id")
+    if not source_id:
+        return None
+
+    row = {column: record.get(column) for column in LISTING_COLUMNS}
+    for column in INTEGER_COLUMNS:
+        row[column] = _integer(row[column])
+    row["special_features"] = _json_text(row["special_features"], [])
+    row["llm_json"] = _json_text(row["llm_json"], {})
+    if not row["id"]:
+        split_index = json.loads(row["llm_json"]).get("split_index")
+        row["id"] = listing_id(source_id, split_index)
+    return row
+
+
+def _write_with_retry(sink, rows):
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            start = time.perf_counter()
+            sink(rows)
+            INGEST_BATCH_LATENCY.labels(stage="load").observe(
+                time.perf_counter() - start
+            )
+            INGEST_ROWS_WRITTEN.inc(len(rows))
+            return len(rows)
+        except Exception as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = RETRY_BASE_SECONDS * (2**attempt + random.random())
+            print(
+                f"⚠️  Upsert failed ({e}); retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+
+def _batches(records, batch_size, stats):
+    """Normalized, key-unique batches of rows."""
+    batch = {}
+    for record in records:
+        stats["read"] += 1
+        row = normalize_row(record)
+        if row is None:
+            stats["rejected"] += 1
+            continue
+        if row["id"] in batch:
+            stats["collapsed"] += 1
+        batch[row["id"]] = row
+        if len(batch) >= batch_size:
+            yield normalize_rows(list(batch.values()))
+            batch = {}
+    if batch:
+        yield normalize_rows(list(batch.values()))
+
+
+def load(
+    records,
+    sink=None,
+    batch_size=LOADER_BATCH_SIZE,
+    writers=LOADER_WRITERS,
+    on_batch=None,
+):
+    """
+    Normalize and upsert records.
+
+    Args:
+        records: Iterable of row dicts (see read_rows)
+        sink: Callable writing a list of rows; None = dry run
+        batch_size: Rows per upsert
+        writers: Upserts in flight at once
+        on_batch: Optional callable given each normalized batch, e.g. to
+                  update derived data such as agent profiles
+
+    Returns:
+        Stats dict with read, rows (written, or that would be written in a
+        dry run), rejected (no source ID) and collapsed (repeated key within
+        a batch) counts, batches, seconds and rows_per_sec
+
+    Raises:
+        Exception: The sink's error, once a batch has exhausted its retries
+    """
+    stats = {"read": 0, "rows": 0, "rejected": 0, "collapsed": 0, "batches": 0}
+    start = time.perf_counter()
+
+    in_flight = {}  # future -> IDs of the rows it writes
+    writing = {}  # row ID -> future of the in-flight batch writing it
+
+    def settle(done):
+        for future in done:
+            stats["rows"] += future.result()
+            for row_id in in_flight.pop(future):
+                if writing.get(row_id) is future:
+                    del writing[row_id]
+
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        for rows in _batches(records, batch_size, stats):
+            stats["batches"] += 1
+            if on_batch is not None:
+                on_batch(rows)
+            if sink is None:
+                stats["rows"] += len(rows)
+                continue
+            # Writers run in any order, so a later version of a row must not
+            # race the batch writing an earlier one
+            earlier = {writing[row["id"]] for row in rows if row["id"] in writing}
+            if earlier:
+                settle(wait(earlier).done)
+            # Bound queued batches so memory stays flat on large files
+            if len(in_flight) >= writers * 2:
+                settle(wait(in_flight, return_when=FIRST_COMPLETED).done)
+            future = pool.submit(_write_with_retry, sink, rows)
+            in_flight[future] = [row["id"] for row in rows]
+            writing.update(dict.fromkeys(in_flight[future], future))
+        settle(wait(in_flight).done)
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def main():
+    import argparse
+    import itertools
+
+    parser = argparse.ArgumentParser(description="Bulk upsert listing rows")
+    parser.add_argument(
+        "inputs", nargs="+", help="CSV, JSON or JSONL files of listing rows"
+    )
+    parser.add_argument("--batch-size", type=int, default=LOADER_BATCH_SIZE)
+    parser.add_argument("--writers", type=int, default=LOADER_WRITERS)
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Read and normalize without writing, and report rows/sec",
+    )
+    parser.add_argument(
+        "--update-profiles",
+        action="store_true",
+        help="Also update agent profiles for the loaded brokers",
+    )
+    cli = parser.parse_args()
+
+    sink = None
+    if not cli.dry_run:
+        from .database import upsert_listings
+
+        sink = upsert_listings
+
+    builder = None
+    if cli.update_profiles:
+        from .broker_profiles import REBUILD_COMMAND, STATE_PATH, ProfileBuilder
+
+        try:
+            builder = ProfileBuilder.load()
+        except FileNotFoundError:
+            parser.error(
+                f"no agent profile state at {STATE_PATH}; build it first with {REBUILD_COMMAND}"
+            )
+        except ValueError as e:
+            parser.error(f"{e}; rebuild it with {REBUILD_COMMAND}")
+
+    records = itertools.chain.from_iterable(read_rows(p) for p in cli.inputs)
+    stats = load(
+        records,
+        sink,
+        batch_size=cli.batch_size,
+        writers=cli.writers,
+        on_batch=builder.upsert if builder else None,
+    )
+    label = "Dry run" if cli.dry_run else "Load"
+    print(f"✅ {label} finished: {json.dumps(stats)}")
+
+    if builder and not cli.dry_run:
+        from .broker_profiles import PROFILES_PATH
+
+        profiles = builder.apply_to(json.loads(PROFILES_PATH.read_text()))
+        builder.save()
+        PROFILES_PATH.write_text(json.dumps(profiles, indent=2))
+        print(f"✅ Updated agent profiles ({len(profiles)} agents)")
+
+
+if __name__ == "__main__":
+    main()
@@ -44,3 +44,106 @@ LOCALITY_STATS = {
         "rental_yield_pct": 3.2,
     },
 }
+
+
+# Approximate centre of each locality as (latitude, longitude), for radius
+# searches (see geo.py)
+LOCALITY_COORDINATES = {
+    "Banashankari": (12.9255, 77.5468),
+    "Banaswadi": (13.0140, 77.6510),
+    "Bannerghatta Road": (12.8880, 77.5970),
+    "Basavanagudi": (12.9420, 77.5750),
+    "Begur": (12.8760, 77.6280),
+    "Bellandur": (12.9260, 77.6762),
+    "Bommanahalli": (12.9030, 77.6240),
+    "Brookefield": (12.9670, 77.7170),
+    "BTM Layout": (12.9166, 77.6101),
+    "Commercial Street": (12.9822, 77.6083),
+    "Devanahalli": (13.2473, 77.7137),
+    "Domlur": (12.9610, 77.6387),
+    "Electronic City": (12.8452, 77.6602),
+    "Frazer Town": (12.9980, 77.6150),
+    "Hebbal": (13.0358, 77.5970),
+    "Hennur": (13.0358, 77.6430),
+    "Hennur Main Road": (13.0450, 77.6470),
+    "Hoodi": (12.9920, 77.7160),
+    "Horamavu": (13.0270, 77.6600),
+    "HSR Layout": (12.9116, 77.6474),
+    "Hulimavu": (12.8800, 77.6000),
+    "Indiranagar": (12.9719, 77.6412),
+    "Jakkur": (13.0780, 77.6060),
+    "Jayanagar": (12.9250, 77.5938),
+    "JP Nagar": (12.9063, 77.5857),
+    "Kadugodi": (12.9990, 77.7600),
+    "Kalyan Nagar": (13.0280, 77.6400),
+    "Kanakapura Road": (12.8700, 77.5600),
+    "Kogilu": (13.1000, 77.6190),
+    "Koramangala": (12.9352, 77.6245),
+    "KR Puram": (13.0070, 77.6960),
+    "Malleshwaram": (13.0035, 77.5710),
+    "Marathahalli": (12.9569, 77.7011),
+    "Mysore Road": (12.9450, 77.5180),
+    "Nagawara": (13.0390, 77.6218),
+    "Panathur": (12.9380, 77.7000),
+    "Rajajinagar": (12.9910, 77.5550),
+    "RT Nagar": (13.0210, 77.5950),
+    "Sahakara Nagar": (13.0620, 77.5870),
+    "Sarjapur": (12.8600, 77.7860),
+    "Sarjapur Road": (12.9100, 77.6870),
+    "Thanisandra": (13.0560, 77.6340),
+    "Ulsoor": (12.9810, 77.6200),
+    "Varthur": (12.9385, 77.7412),
+    "Vidyaranyapura": (13.0770, 77.5580),
+    "Whitefield": (12.9698, 77.7500),
+    "Yelahanka": (13.1007, 77.5963),
+    "Yeshwanthpur": (13.0280, 77.5400),
+}
+
+LANDMARK_COORDINATES = {
+    "Airport": (13.1986, 77.7066),
+    "Bagmane Tech Park": (12.9800, 77.6620),
+    "Bangalore Palace": (12.9987, 77.5920),
+    "Christ University": (12.9343, 77.6060),
+    "Cubbon Park": (12.9763, 77.5929),
+    "Ecospace": (12.9260, 77.6820),
+    "Electronic City": (12.8452, 77.6602),
+    "Embassy Tech Village": (12.9310, 77.6930),
+    "Forum Mall": (12.9345, 77.6112),
+    "Global Village Tech Park": (12.9180, 77.4990),
+    "IISc": (13.0219, 77.5671),
+    "ITPL": (12.9860, 77.7370),
+    "Koramangala": (12.9352, 77.6245),
+    "Lalbagh": (12.9507, 77.5848),
+    "Majestic": (12.9780, 77.5700),
+    "Manyata Tech Park": (13.0450, 77.6200),
+    "MG Road": (12.9756, 77.6050),
+    "Orion Mall": (13.0110, 77.5550),
+    "Phoenix Marketcity": (12.9970, 77.6960),
+    "Silk Board": (12.9177, 77.6238),
+    "Whitefield": (12.9698, 77.7500),
+}
+
+# Other names people use for landmarks
+LANDMARK_ALIASES = {
+    "manyata": "Manyata Tech Park",
+    "kia": "Airport",
+    "kempegowda airport": "Airport",
+    "kempegowda international airport": "Airport",
+    "bangalore airport": "Airport",
+    "international tech park": "ITPL",
+    "rmz ecospace": "Ecospace",
+    "etv": "Embassy Tech Village",
+    "kempegowda bus station": "Majestic",
+    "ksr station": "Majestic",
+    "silk board junction": "Silk Board",
+    "lal bagh": "Lalbagh",
+    "indian institute of science": "IISc",
+}
+
+
+def known_localities():
+    """Map of lowercased locality name to its canonical spelling."""
+    known = set(LOCALITY_STATS) | set(LOCALITY_COORDINATES)
+    for localities in LANDMARK_TO_LOCALITIES.values():
+        known.update(localities)
+    return {name.lower(): name for name in known}
@@ -0,0 +1,165 @@
+"""
+Prometheus metrics for tools, caches and the data layer.
+Scraped through the /metrics endpoint in main.py.
+"""
+
+import functools
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Row-count buckets sized around MAX_RESULTS and the Supabase page limit
+ROW_BUCKETS = (0, 1, 5, 10, 20, 50, 100, 250, 500, 1000, 5000)
+
+TOOL_LATENCY = Histogram(
+    "propalyst_tool_latency_seconds",
+    "Time spent executing an agent tool",
+    ["tool"],
+)
+TOOL_ERRORS = Counter(
+    "propalyst_tool_errors_total",
+    "Agent tool calls that raised an exception",
+    ["tool"],
+)
+DB_QUERY_LATENCY = Histogram(
+    "propalyst_db_query_seconds",
+    "Time spent waiting on Supabase",
+    ["operation"],
+)
+ROWS_FETCHED = Histogram(
+    "propalyst_search_rows_fetched",
+    "Rows matched by the data source for one search, before the result limit",
+    ["source"],
+    buckets=ROW_BUCKETS,
+)
+ROWS_RETURNED = Histogram(
+    "propalyst_search_rows_returned",
+    "Rows returned to the caller for one search",
+    ["source"],
+    buckets=ROW_BUCKETS,
+)
+SEARCH_TRUNCATIONS = Counter(
+    "propalyst_search_truncations_total",
+    "Searches whose results were cut to MAX_RESULTS",
+    ["source"],
+)
+CACHE_REQUESTS = Counter(
+    "propalyst_cache_requests_total",
+    "Cache lookups by outcome; hit ratio = hit / (hit + miss)",
+    ["cache", "result"],
+)
+LLM_TURN_LATENCY = Histogram(
+    "propalyst_llm_turn_seconds",
+    "Wall time of one agent turn, from user message to final event",
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "propalyst_llm_time_to_first_token_seconds",
+    "Time from user message to the first streamed model text",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30),
+)
+
+
+def timed_tool(func):
+    """Decorator recording latency and errors of a tool under its function name."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            TOOL_ERRORS.labels(tool=name).inc()
+            raise
+        finally:
+            TOOL_LATENCY.labels(tool=name).observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+def record_search(source, fetched, returned, truncated):
+    """Record rows fetched versus returned for one search."""
+    ROWS_FETCHED.labels(source=source).observe(fetched)
+    ROWS_RETURNED.labels(source=source).observe(returned)
+    if truncated:
+        SEARCH_TRUNCATIONS.labels(source=source).inc()
+
+
+def record_cache(cache, hit):
+    """Record one cache lookup."""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+ADMISSION_ACTIVE = Gauge(
+    "propalyst_admission_active",
+    "Agent turns currently running",
+)
+ADMISSION_QUEUED = Gauge(
+    "propalyst_admission_queued",
+    "Agent requests waiting for a free slot",
+)
+ADMISSION_REJECTIONS = Counter(
+    "propalyst_admission_rejections_total",
+    "Agent requests rejected by admission control",
+    ["reason"],
+)
+TOOL_RESPONSE_TOKENS = Histogram(
+    "propalyst_tool_response_tokens",
+    "Estimated tokens of a tool response sent to the model, before and after compaction",
+    ["tool", "stage"],
+    buckets=(50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+FAST_PATH_REQUESTS = Counter(
+    "propalyst_fast_path_requests_total",
+    "Chat messages by fast-path intent; 'none' fell through to the LLM",
+    ["intent"],
+)
+SESSION_LOAD_LATENCY = Histogram(
+    "propalyst_session_load_seconds",
+    "Time to load a persisted chat session with its events",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+SESSION_COMPACTIONS = Counter(
+    "propalyst_session_compactions_total",
+    "Times older session events were folded into a summary event",
+)
+CONTEXT_TOKENS = Histogram(
+    "propalyst_context_tokens",
+    "Estimated tokens of conversation history per model call, before and after context management",
+    ["stage"],
+    buckets=(500, 1000, 2000, 4000, 8000, 12000, 16000, 32000, 64000, 128000),
+)
+MODEL_CALLS = Counter(
+    "propalyst_model_calls_total",
+    "Model calls by routed model and agent step",
+    ["model", "step"],
+)
+INGEST_MESSAGES = Counter(
+    "propalyst_ingest_messages_total",
+    "Raw WhatsApp messages seen by the ingestion pipeline, by outcome",
+    ["status"],
+)
+INGEST_ROWS_WRITTEN = Counter(
+    "propalyst_ingest_rows_written_total",
+    "Listing rows upserted by the ingestion pipeline",
+)
+INGEST_BATCH_LATENCY = Histogram(
+    "propalyst_ingest_batch_seconds",
+    "Time per ingestion batch by stage",
+    ["stage"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+INGEST_THROUGHPUT = Gauge(
+    "propalyst_ingest_messages_per_second",
+    "Messages per second of the last ingestion run",
+)
+INGEST_CHUNKS = Counter(
+    "propalyst_ingest_chunks_total",
+    "Listing chunks extracted, by extractor (rules or llm)",
+    ["extractor"],
+)
+DEDUP_DUPLICATES = Gauge(
+    "propalyst_dedup_duplicates",
+    "Listings found to be reposts of a canonical listing in the last dedup run",
+)
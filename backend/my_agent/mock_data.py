@@ -4,12 +4,32 @@ Mock data loader for testing ADK workflow without database.
 import json
 import pathlib
 
+from .database import parse_listing_data
+from .dedup import annotate_duplicates
+from .metrics import DEDUP_DUPLICATES
+from .prices import normalize_rows
+from .snapshot import SNAPSHOT_PATH, SOURCE_PATH, ListingSnapshot, is_fresh
+
+def prepare_listings(records):
+    """Parse raw listing records, normalize prices and mark reposts."""
+    listings = [parse_listing_data(listing) for listing in records]
+    normalize_rows(listings)
+    # Reposts stay reachable by ID but are left out of searches and counts
+    return annotate_duplicates(listings)
+
 def load_mock_listings():
-    """Load mock listings from JSON file."""
+    """
+    Load mock listings, from the columnar snapshot when it is up to date
+    (see snapshot.py) and otherwise by parsing the JSON file.
+    """
     try:
-        data_path = pathlib.Path(__file__).parent.parent / 'mock_listings.json'
-        with open(data_path, 'r') as f:
-            listings = json.load(f)
+        if is_fresh(SNAPSHOT_PATH, SOURCE_PATH):
+            listings = ListingSnapshot.open(SNAPSHOT_PATH)
+            DEDUP_DUPLICATES.set(len(listings) - listings.canonical_rows)
+            print(f"✅ Mapped {len(listings)} mock listings from {SNAPSHOT_PATH.name}")
+            return listings
+        with open(SOURCE_PATH) as f:
+            listings = prepare_listings(json.load(f))
         print(f"✅ Loaded {len(listings)} mock listings")
         return listings
     except Exception as e:
@@ -41,6 +61,11 @@ def apply_mock_filters(listings, validated_filters):
     """
     from .filters import apply_filter
     
+    if hasattr(listings, "filter"):
+        # A ListingSnapshot filters its columns; listing dicts are built
+        # only for the matches that are read
+        return listings.filter(validated_filters)
+
     results = []
     for listing in listings:
         # Apply all filters - listing must pass all
@@ -55,3 +80,61 @@ def apply_mock_filters(listings, validated_filters):
     
     return results
 
+
+def apply_mock_filters_batch(listings, filter_sets):
+    """
+    Apply many filter sets to listings in a single pass.
+
+    Filters that appear in several sets are evaluated once per listing and the
+    outcome is shared, so N overlapping queries cost one scan instead of N.
+
+    Args:
+        listings: List of listing dicts
+        filter_sets: List of lists of ListingFilter objects
+
+    Returns:
+        List of filtered listing lists, in the same order as filter_sets
+    """
+    from .filters import apply_filter, filter_key
+
+    if hasattr(listings, "filter_batch"):
+        return listings.filter_batch(filter_sets)
+
+    # Deduplicate predicates across all sets
+    predicates = {}
+    share_counts = {}
+    set_keys = []
+    for filters in filter_sets:
+        keys = []
+        for filter_obj in filters:
+            key = filter_key(filter_obj)
+            if key in keys:
+                continue
+            predicates.setdefault(key, filter_obj)
+            share_counts[key] = share_counts.get(key, 0) + 1
+            keys.append(key)
+        set_keys.append(keys)
+
+    # Check the most widely shared predicates first so their outcome is
+    # already known when later sets reach them
+    for keys in set_keys:
+        keys.sort(key=lambda k: share_counts[k], reverse=True)
+
+    results = [[] for _ in filter_sets]
+    for listing in listings:
+        outcomes = {}
+        for i, keys in enumerate(set_keys):
+            passes_all = True
+            for key in keys:
+                passed = outcomes.get(key)
+                if passed is None:
+                    passed = apply_filter(listing, predicates[key])
+                    outcomes[key] = passed
+                if not passed:
+                    passes_all = False
+                    break
+
+            if passes_all:
+                results[i].append(listing)
+
+    return results
@@ -0,0 +1,39 @@
+"""
+Concurrent execution of synchronous tools.
+
+ADK gathers the function calls from one model response with asyncio, but a
+synchronous tool blocks the event loop while it waits on Supabase, so the
+calls still run one after another. run_in_pool turns a sync tool into a
+coroutine that runs on a bounded thread pool, so independent calls from the
+same response overlap and a turn costs max(tool) instead of sum(tool).
+ADK still gathers the results in call order.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+TOOL_POOL_SIZE = int(os.getenv("TOOL_POOL_SIZE", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=TOOL_POOL_SIZE, thread_name_prefix="tool")
+
+
+def run_in_pool(func):
+    """
+    Wrap a synchronous tool so it runs on the shared tool thread pool.
+
+    The wrapper keeps the tool's name, docstring and signature, so ADK builds
+    the same function declaration and still injects tool_context.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Carry context variables (e.g. tracing spans) into the worker thread
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        return await loop.run_in_executor(_executor, call)
+
+    return wrapper
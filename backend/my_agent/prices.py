@@ -0,0 +1,253 @@
+"""
+Parsing of broker price text such as "₹ 1.28 Cr.", "Rent 5.00 Lakhs",
+"85k plus maintenance" or "Rs. 30,000/- Per Sft.".
+
+normalize_price_columns derives total price, price per sqft and monthly
+rent for whole columns at once, during ingestion and in the backfill
+(`python -m my_agent.prices --backfill`), so searches and analytics read
+stored values. The backfill needs two extra columns:
+
+    alter table whatsapp_listing_data
+        add column price_per_sqft numeric,
+        add column monthly_rent numeric;
+"""
+
+import argparse
+import re
+from dataclasses import dataclass
+
+UNIT_MULTIPLIERS = {
+    "cr": 10_000_000,
+    "crs": 10_000_000,
+    "crore": 10_000_000,
+    "crores": 10_000_000,
+    "l": 100_000,
+    "lac": 100_000,
+    "lacs": 100_000,
+    "lakh": 100_000,
+    "lakhs": 100_000,
+    "k": 1_000,
+}
+
+SQFT_PER_ACRE = 43_560
+# Message types whose price is a monthly rent
+RENT_MESSAGE_TYPES = ("supply_rent", "demand_rent")
+# A stored price this close to the price text is kept; the text is often rounded
+PRICE_TOLERANCE = 0.05
+# Smaller totals are stray numbers, e.g. a struck-through "~₹ 1.45~ Cr."
+MIN_TOTAL_RUPEES = 1_000
+
+PRICE_PATTERN = re.compile(
+    r"(?P<currency>₹|\brs\.?|\binr\b)?\s*"
+    r"(?P<number>\d[\d,]*(?:\.\d+)?)(?!\.?\d)\s*"
+    r"(?:(?P<unit>crores?|crs?|lakhs?|lacs?|lac|l|k)(?![a-z]))?\.?\s*"
+    r"(?:/-\s*)?"
+    r"(?P<basis>(?:per|/)\s*(?:sq\.?\s*ft|sqft|sft|square\s*feet|acre|month)\.?|\bp\.?m\b\.?)?",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class PriceQuote:
+    """
+    One price found in text.
+
+    Attributes:
+        amount: Rupees as written, before applying the basis
+        basis: "total", "per_sqft", "per_acre" or "per_month"
+        text: The matched text
+    """
+
+    amount: float
+    basis: str
+    text: str
+
+    def total(self, area_sqft=None):
+        """Total price in rupees, or None if the basis needs an unknown area."""
+        if self.basis == "per_sqft":
+            return self.amount * area_sqft if area_sqft else None
+        if self.basis == "per_acre":
+            return self.amount * area_sqft / SQFT_PER_ACRE if area_sqft else None
+        return self.amount
+
+
+def _basis(raw):
+    raw = (raw or "").lower()
+    if not raw:
+        return "total"
+    if "acre" in raw:
+        return "per_acre"
+    if "month" in raw or raw.replace(".", "").strip() == "pm":
+        return "per_month"
+    return "per_sqft"
+
+
+def find_prices(text):
+    """
+    All price quotes in text, in order of appearance.
+
+    A number only counts as a price when it has a currency marker or an
+    amount unit (Cr, Lakh, k), so areas and phone numbers are ignored.
+    """
+    quotes = []
+    for match in PRICE_PATTERN.finditer(text or ""):
+        currency, unit = match.group("currency"), match.group("unit")
+        if not currency and not unit:
+            continue
+        number = float(match.group("number").replace(",", ""))
+        quote = PriceQuote(
+            amount=number * UNIT_MULTIPLIERS.get((unit or "").lower(), 1),
+            basis=_basis(match.group("basis")),
+            text=match.group(0).strip(),
+        )
+        if quote.basis in ("total", "per_month") and quote.amount < MIN_TOTAL_RUPEES:
+            continue
+        quotes.append(quote)
+    return quotes
+
+
+def parse_price_text(text):
+    """The first price quote in text, or None."""
+    quotes = find_prices(text)
+    return quotes[0] if quotes else None
+
+
+def _number(value):
+    """Positive float of a numeric column value, or None for blanks and junk."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+def _last_quote(text):
+    quotes = find_prices(text)
+    # Later quotes are usually the offer price, e.g. after a struck-out one
+    return quotes[-1] if quotes else None
+
+
+def normalize_price_columns(price_text, area_sqft, message_type, price=None):
+    """
+    Derive price columns for many listings at once.
+
+    Each distinct price_text is parsed once per call, so columns with
+    repeated templates ("Rs 1.2 Cr", "45 L") cost one parse per value.
+    Per-sqft and per-acre quotes are multiplied out by the area. A stored
+    price is kept when it agrees with the text within PRICE_TOLERANCE or
+    when the text has no usable price.
+
+    Args:
+        price_text: Column of price text as written
+        area_sqft: Column of areas (numbers, numeric strings or None)
+        message_type: Column of message types
+        price: Column of stored prices, if any
+
+    Returns:
+        Dict of "price" (total rupees, or monthly rent for rentals),
+        "price_per_sqft" (sales only) and "monthly_rent" columns; missing
+        values are None
+    """
+    if price is None:
+        price = [None] * len(price_text)
+    quotes = {text: _last_quote(text) for text in set(price_text)}
+
+    columns = {"price": [], "price_per_sqft": [], "monthly_rent": []}
+    for text, area, kind, stored in zip(
+        price_text, area_sqft, message_type, price, strict=True
+    ):
+        area, stored, quote = _number(area), _number(stored), quotes[text]
+        parsed = quote.total(area) if quote else None
+        if parsed is None or (
+            stored
+            and quote.basis in ("total", "per_month")
+            and abs(stored - parsed) <= PRICE_TOLERANCE * parsed
+        ):
+            value = stored
+        else:
+            value = parsed
+
+        rent = kind in RENT_MESSAGE_TYPES or (
+            quote is not None and quote.basis == "per_month"
+        )
+        per_sqft = None
+        if not rent:
+            if quote and quote.basis == "per_sqft":
+                per_sqft = quote.amount
+            elif quote and quote.basis == "per_acre":
+                per_sqft = quote.amount / SQFT_PER_ACRE
+            elif value and area:
+                per_sqft = value / area
+
+        columns["price"].append(round(value) if value else None)
+        columns["price_per_sqft"].append(round(per_sqft) if per_sqft else None)
+        columns["monthly_rent"].append(round(value) if value and rent else None)
+    return columns
+
+
+def normalize_rows(rows):
+    """
+    Set price, price_per_sqft and monthly_rent on listing dicts in place.
+
+    Returns:
+        The rows
+    """
+    columns = normalize_price_columns(
+        [row.get("price_text") for row in rows],
+        [row.get("area_sqft") for row in rows],
+        [row.get("message_type") for row in rows],
+        [row.get("price") for row in rows],
+    )
+    for name, values in columns.items():
+        for row, value in zip(rows, values, strict=True):
+            row[name] = value
+    return rows
+
+
+def backfill(page_size=1000):
+    """
+    Recompute the price columns of every stored listing.
+
+    Only rows whose values change are written back; rows deleted in the
+    meantime are not recreated.
+
+    Returns:
+        (listings scanned, listings updated)
+    """
+    from .database import iter_listings, update_listing_columns
+
+    fields = ("price", "price_per_sqft", "monthly_rent")
+    rows = list(
+        iter_listings(
+            ["id", "price_text", "area_sqft", "message_type", *fields],
+            page_size=page_size,
+        )
+    )
+    before = [tuple(_number(row.get(f)) for f in fields) for row in rows]
+    normalize_rows(rows)
+    changed = [
+        row
+        for row, old in zip(rows, before, strict=True)
+        if tuple(_number(row[f]) for f in fields) != old
+    ]
+    return len(rows), update_listing_columns(changed, fields)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize stored listing prices")
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Rewrite price, price_per_sqft and monthly_rent in Supabase",
+    )
+    parser.add_argument("--page-size", type=int, default=1000)
+    cli = parser.parse_args()
+    if not cli.backfill:
+        parser.error("pass --backfill")
+
+    scanned, updated = backfill(cli.page_size)
+    print(f"Scanned {scanned} listings, updated {updated}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Tiered model routing for agent model calls.
+
+Runs as a before_model_callback and picks the model per call: the first call
+of a turn for a listing lookup (filter extraction into tool calls) goes to a
+small, fast model, and calls that read tool results and write the answer go
+to the larger model. Other first calls (advice, market questions, small talk)
+are likely answered without a tool, so they go straight to the larger model.
+Which model reads each tool's result is configurable, so cheap hops such as
+get_nearby_localities -> search_listings stay small.
+
+Policies are compared offline with tests/eval/routing_eval.py.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+
+from .locality_data import LANDMARK_TO_LOCALITIES, known_localities
+from .metrics import MODEL_CALLS
+
+SMALL_MODEL = os.getenv("ROUTING_SMALL_MODEL", "gemini-2.5-flash-lite")
+LARGE_MODEL = os.getenv("ROUTING_LARGE_MODEL", "gemini-2.5-flash")
+
+# Tools whose results only feed another tool call, not the final answer
+DEFAULT_TOOL_TIERS = "get_nearby_localities=small"
+
+# Places and words of a message that asks for listings, brokers or prices,
+# which the planning model turns into tool calls
+_PLACES = {
+    *known_localities(),
+    *(landmark.lower() for landmark in LANDMARK_TO_LOCALITIES),
+}
+LOOKUP_PATTERN = re.compile(
+    r"\b(?:\d\s?bhk|bhk|apartments?|flats?|villas?|plots?|lands?|offices?|houses?|"
+    r"listings?|propert(?:y|ies)|units?|sale|rent|rental|lease|buyers?|tenants?|"
+    r"brokers?|agents?|price|prices|crores?|cr|lakhs?|sq\s?ft|sqft|near|localities|"
+    + "|".join(re.escape(place) for place in sorted(_PLACES, key=len, reverse=True))
+    + r")\b",
+    re.IGNORECASE,
+)
+
+
+def _resolve(tier):
+    """Map "small"/"large" to the configured model; anything else is a model name."""
+    return {"small": SMALL_MODEL, "large": LARGE_MODEL}.get(tier.strip(), tier.strip())
+
+
+def parse_tool_models(spec):
+    """
+    Parse a per-tool model spec.
+
+    Args:
+        spec: Comma-separated tool=tier pairs, e.g.
+              "get_nearby_localities=small,get_summary_stats=large"
+
+    Returns:
+        Dict of tool name to model name
+    """
+    models = {}
+    for pair in filter(None, (p.strip() for p in spec.split(","))):
+        tool, _, tier = pair.partition("=")
+        if not tier:
+            raise ValueError(f"Invalid tool routing entry '{pair}', expected tool=tier")
+        models[tool.strip()] = _resolve(tier)
+    return models
+
+
+@dataclass
+class RoutingPolicy:
+    """
+    Which model serves each kind of agent step.
+
+    Attributes:
+        name: Policy name, used in metrics and eval reports
+        planning_model: First call of a turn for a listing lookup
+        synthesis_model: Calls reading tool results, unless tool_models says
+                         otherwise, and first calls for any other message
+        tool_models: Tool name -> model for the call that reads that tool's result
+    """
+
+    name: str
+    planning_model: str
+    synthesis_model: str
+    tool_models: dict = field(default_factory=dict)
+
+    def choose(self, contents):
+        """
+        Pick the model for a request.
+
+        Returns:
+            (step, model) where step is "planning", "answer" (a first call
+            that will likely reply without tools) or "synthesis"
+        """
+        last = contents[-1] if contents else None
+        parts = last.parts or [] if last else []
+        tools = [
+            p.function_response.name for p in parts if p.function_response is not None
+        ]
+        if not tools:
+            text = " ".join(p.text for p in parts if p.text)
+            if LOOKUP_PATTERN.search(text):
+                return "planning", self.planning_model
+            return "answer", self.synthesis_model
+
+        models = {self.tool_models.get(t, self.synthesis_model) for t in tools}
+        model = models.pop() if len(models) == 1 else self.synthesis_model
+        return "synthesis", model
+
+
+POLICIES = {
+    "single": RoutingPolicy("single", LARGE_MODEL, LARGE_MODEL),
+    "tiered": RoutingPolicy(
+        "tiered",
+        planning_model=SMALL_MODEL,
+        synthesis_model=LARGE_MODEL,
+        tool_models=parse_tool_models(
+            os.getenv("ROUTING_TOOL_MODELS", DEFAULT_TOOL_TIERS)
+        ),
+    ),
+}
+
+active_policy = POLICIES[os.getenv("MODEL_ROUTING_POLICY", "tiered")]
+
+
+def set_policy(name):
+    """Switch the routing policy for subsequent model calls."""
+    global active_policy
+    active_policy = POLICIES[name]
+
+
+def route_model(callback_context, llm_request):
+    """before_model_callback that sets llm_request.model from the active policy."""
+    step, model = active_policy.choose(llm_request.contents)
+    llm_request.model = model
+    MODEL_CALLS.labels(model=model, step=step).inc()
+    return None
@@ -0,0 +1,213 @@
+"""
+Rule-based listing extraction for simple broker messages.
+
+Short messages such as "1720 sqft, 3BHK available for sale in Whitefield"
+are parsed with regular expressions, and each parse gets a confidence score.
+The ingestion pipeline only sends messages below RULES_CONFIDENCE_THRESHOLD
+to the LLM, so cost and latency fall with the share of easy messages.
+
+Confidence starts at 1.0 and is reduced for anything the rules could not pin
+down: no or conflicting message type, unknown property type, several
+different prices, a per-sqft price without an area, numbers no rule
+explains, no known locality, or a long message (amenity lists and terms are
+better read by the model).
+"""
+
+import os
+import re
+
+from .locality_data import known_localities
+from .prices import find_prices
+
+RULES_CONFIDENCE_THRESHOLD = float(os.getenv("RULES_CONFIDENCE_THRESHOLD", "0.8"))
+# Longer messages usually carry details the rules don't capture
+LONG_MESSAGE_CHARS = 400
+
+BHK_PATTERN = re.compile(
+    r"\b(\d+)(?:\.5)?\s*-?\s*bhk\b|\b(\d+)\s*bed(?:room)?s?\b", re.IGNORECASE
+)
+AREA_PATTERNS = [
+    (
+        re.compile(
+            r"\b(\d[\d,]*(?:\.\d+)?)\s*(?:sq\.?\s*ft|sqft|sft|sq\.?\s*feet|square\s*feet)\b\.?",
+            re.IGNORECASE,
+        ),
+        1,
+    ),
+    (
+        re.compile(
+            r"\b(\d[\d,]*(?:\.\d+)?)\s*(?:sq\.?\s*yds?|sq\.?\s*yards?)\b\.?",
+            re.IGNORECASE,
+        ),
+        9,
+    ),
+    (re.compile(r"\b(\d+(?:\.\d+)?)\s*acres?\b", re.IGNORECASE), 43_560),
+    (re.compile(r"\b(\d+(?:\.\d+)?)\s*guntas?\b", re.IGNORECASE), 1_089),
+]
+DIMENSION_PATTERN = re.compile(r"\b(\d{2,3})\s*[x\u00d7]\s*(\d{2,3})\b", re.IGNORECASE)
+PHONE_PATTERN = re.compile(r"(?:\+91[\s-]*)?\d[\d\s-]{8,}\d")
+NUMBER_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+DEMAND_PATTERN = re.compile(
+    r"\b(?:required|requirement|wanted|looking\s+for|need(?:ed)?|in\s+need\s+of|want(?:s)?\s+to\s+(?:buy|rent)"
+    r"|preferred|budget|up\s*to)\b",
+    re.IGNORECASE,
+)
+RENT_PATTERN = re.compile(
+    r"\b(?:rent|rental|lease|to[\s-]let|tenants?|per\s+month|pm)\b", re.IGNORECASE
+)
+SALE_PATTERN = re.compile(
+    r"\b(?:sale|sell|selling|resale|outright|buy)\b", re.IGNORECASE
+)
+
+PROPERTY_TYPE_PATTERNS = [
+    ("villa", re.compile(r"\bvillas?\b", re.IGNORECASE)),
+    (
+        "independent_house",
+        re.compile(
+            r"\b(?:independent\s+house|house|duplex|row\s*house|bungalow)\b",
+            re.IGNORECASE,
+        ),
+    ),
+    ("plot", re.compile(r"\b(?:plots?|sites?)\b", re.IGNORECASE)),
+    ("land", re.compile(r"\b(?:land|farm\s*land)\b", re.IGNORECASE)),
+    ("office", re.compile(r"\b(?:office|office\s+space|co-?working)\b", re.IGNORECASE)),
+    (
+        "commercial",
+        re.compile(r"\b(?:commercial|showroom|shop|retail|warehouse)\b", re.IGNORECASE),
+    ),
+    ("apartment", re.compile(r"\b(?:flats?|apartments?|condo)\b", re.IGNORECASE)),
+]
+FURNISHING_PATTERNS = [
+    ("semi_furnished", re.compile(r"\bsemi[\s-]*furnished\b", re.IGNORECASE)),
+    (
+        "unfurnished",
+        re.compile(r"\b(?:un[\s-]*furnished|bare\s*shell)\b", re.IGNORECASE),
+    ),
+    (
+        "fully_furnished",
+        re.compile(r"\b(?:fully|full)[\s-]*furnished\b|\bfurnished\b", re.IGNORECASE),
+    ),
+]
+
+
+def _number(text):
+    return float(text.replace(",", ""))
+
+
+def _first(patterns, text):
+    for value, pattern in patterns:
+        if pattern.search(text):
+            return value
+    return None
+
+
+def _message_type(text):
+    """Message type, or None when absent or ambiguous."""
+    rent = bool(RENT_PATTERN.search(text))
+    sale = bool(SALE_PATTERN.search(text))
+    if DEMAND_PATTERN.search(text):
+        if rent != sale:
+            return "demand_rent" if rent else "demand_buy"
+        return None
+    if rent != sale:
+        return "supply_rent" if rent else "supply_sale"
+    return None
+
+
+def _area(text):
+    """(area in sqft, matched spans) from the first recognised area unit."""
+    for pattern, multiplier in AREA_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return round(_number(match.group(1)) * multiplier), [match.span()]
+    match = DIMENSION_PATTERN.search(text)
+    if match:
+        return int(match.group(1)) * int(match.group(2)), [match.span()]
+    return None, []
+
+
+def _location(text):
+    lowered = text.lower()
+    for key, name in sorted(known_localities().items(), key=lambda kv: -len(kv[0])):
+        if re.search(rf"\b{re.escape(key)}\b", lowered):
+            return name
+    return None
+
+
+def _unexplained_numbers(text, spans):
+    """Numbers outside any recognised BHK, area, price or phone match."""
+    masked = list(text)
+    for start, end in spans:
+        masked[start:end] = " " * (end - start)
+    remaining = "".join(masked)
+    remaining = PHONE_PATTERN.sub(" ", remaining)
+    return NUMBER_PATTERN.findall(remaining)
+
+
+def extract(text):
+    """
+    Parse one message with rules.
+
+    Returns:
+        (fields, confidence) where fields uses the ExtractedListing field
+        names (without index) and confidence is between 0 and 1
+    """
+    text = text or ""
+    spans = []
+    confidence = 1.0
+
+    message_type = _message_type(text)
+    if message_type is None:
+        return {}, 0.0
+
+    bhk_match = BHK_PATTERN.search(text)
+    bedroom_count = int(bhk_match.group(1) or bhk_match.group(2)) if bhk_match else None
+    spans += [m.span() for m in BHK_PATTERN.finditer(text)]
+
+    area_sqft, area_spans = _area(text)
+    spans += area_spans
+
+    property_type = _first(PROPERTY_TYPE_PATTERNS, text)
+    if property_type is None:
+        if bedroom_count is None:
+            confidence -= 0.3
+        else:
+            # "3BHK" with no other type is nearly always a flat
+            property_type = "apartment"
+            confidence -= 0.05
+
+    price, price_text = None, None
+    quotes = find_prices(text)
+    spans += [m.span() for q in quotes for m in re.finditer(re.escape(q.text), text)]
+    if len({(q.amount, q.basis) for q in quotes}) > 1:
+        confidence -= 0.25
+    if quotes:
+        quote = quotes[-1]  # Later quotes are usually the offer price
+        price_text = quote.text
+        total = quote.total(area_sqft)
+        if total is None:
+            confidence -= 0.3
+        else:
+            price = round(total)
+
+    location = _location(text)
+    if location is None:
+        confidence -= 0.1
+
+    unexplained = _unexplained_numbers(text, spans)
+    confidence -= min(0.3, 0.1 * len(unexplained))
+    if len(text) > LONG_MESSAGE_CHARS:
+        confidence -= 0.2
+
+    fields = {
+        "message_type": message_type,
+        "property_type": property_type,
+        "bedroom_count": bedroom_count,
+        "area_sqft": area_sqft,
+        "price": price,
+        "price_text": price_text,
+        "location": location,
+        "furnishing_status": _first(FURNISHING_PATTERNS, text),
+    }
+    return fields, round(max(confidence, 0.0), 2)
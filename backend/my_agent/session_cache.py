@@ -0,0 +1,130 @@
+"""
+Session-scoped memoization of search results.
+
+Matches for each filter set are kept in ADK session state, keyed by the
+canonical form of the filters. A follow-up search with the same filters is a
+direct hit; one that only adds filters to a cached set ("now only 3BHK") is
+answered by filtering the cached superset locally.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from .filters import filter_key, has_date_filter
+from .metrics import record_cache
+
+INDEX_KEY = "search_cache_index"
+ENTRY_PREFIX = "search_cache:"
+
+CACHE_TTL_SECONDS = int(os.getenv("SESSION_CACHE_TTL_SECONDS", "600"))
+# Larger result sets are not cached; they would bloat the session state
+MAX_CACHED_ROWS = int(os.getenv("SESSION_CACHE_MAX_ROWS", "200"))
+MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "5"))
+
+# Searches of one turn can run in parallel threads (see parallel.py); stores
+# update the shared index under this lock so none of them is lost
+_index_lock = threading.Lock()
+
+
+def _canonical_keys(filters):
+    """Sorted, JSON-serializable canonical keys for a filter list."""
+    return sorted({filter_key(f) for f in filters})
+
+
+def _entry_id(keys):
+    digest = hashlib.sha1(json.dumps(keys).encode()).hexdigest()
+    return digest[:16]
+
+
+def lookup(tool_context, filters):
+    """
+    Return all listings matching filters from the session cache, or None.
+
+    Args:
+        tool_context: ADK ToolContext of the current tool call
+        filters: List of filter dicts (same format as search_listings)
+
+    Returns:
+        Full (not truncated) list of matching listings, or None on a miss
+    """
+    from .mock_data import apply_mock_filters
+    from .tools import _validate_filters
+
+    keys = _canonical_keys(filters)
+    query_keys = {tuple(k) for k in keys}
+    now = time.time()
+
+    # Smallest fresh cached set whose filters are a subset of this query's
+    best = None
+    best_keys = None
+    for entry in tool_context.state.get(INDEX_KEY, []):
+        if now - entry["cached_at"] > CACHE_TTL_SECONDS:
+            continue
+        entry_keys = {tuple(k) for k in entry["keys"]}
+        if not entry_keys <= query_keys:
+            continue
+        # Without a date filter Supabase applies its default window, so a
+        # cached set is only a superset if both agree on having a date filter
+        if entry["has_date"] != has_date_filter(filters):
+            continue
+        if best is None or entry["count"] < best["count"]:
+            best = entry
+            best_keys = entry_keys
+
+    if best is None:
+        record_cache("session_search", hit=False)
+        return None
+
+    rows = tool_context.state.get(ENTRY_PREFIX + best["id"])
+    if rows is None:
+        record_cache("session_search", hit=False)
+        return None
+
+    record_cache("session_search", hit=True)
+    remaining = [f for f in filters if filter_key(f) not in best_keys]
+    if not remaining:
+        print(f"♻️  Session cache hit: {len(rows)} listings")
+        return rows
+
+    results = apply_mock_filters(rows, _validate_filters(remaining))
+    print(f"♻️  Session cache narrowed {len(rows)} cached listings to {len(results)}")
+    return results
+
+
+def store(tool_context, filters, rows):
+    """
+    Memoize the full match list for filters in session state.
+
+    Result sets over MAX_CACHED_ROWS are skipped. The oldest entry is evicted
+    once MAX_ENTRIES are cached.
+    """
+    if len(rows) > MAX_CACHED_ROWS:
+        return
+
+    keys = [list(k) for k in _canonical_keys(filters)]
+    entry_id = _entry_id(keys)
+    with _index_lock:
+        index = [
+            e for e in tool_context.state.get(INDEX_KEY, []) if e["id"] != entry_id
+        ]
+        index.append(
+            {
+                "id": entry_id,
+                "keys": keys,
+                "has_date": has_date_filter(filters),
+                "count": len(rows),
+                "cached_at": time.time(),
+            }
+        )
+
+        # Each entry lives under its own key so a store only writes one result
+        # set into the state delta
+        while len(index) > MAX_ENTRIES:
+            evicted = index.pop(0)
+            tool_context.state[ENTRY_PREFIX + evicted["id"]] = None
+
+        tool_context.state[ENTRY_PREFIX + entry_id] = list(rows)
+        tool_context.state[INDEX_KEY] = index
@@ -0,0 +1,500 @@
+"""
+Persistent chat sessions backed by SQLite.
+
+Events are buffered in memory and written in batches, so a streamed turn
+costs one transaction instead of one per event. A background task started
+with start() writes whatever is still buffered every flush interval, so an
+idle session doesn't hold events in memory until its next request. Once a session grows past
+MAX_EVENTS, everything but the most recent turns is folded into a single
+summary event, which keeps both session load time and the history sent to
+the model bounded no matter how long a conversation runs.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+import uuid
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import ListSessionsResponse
+from google.adk.sessions.state import State
+from google.genai import types
+
+from .metrics import SESSION_COMPACTIONS, SESSION_LOAD_LATENCY
+
+DB_PATH = pathlib.Path(
+    os.getenv(
+        "SESSION_DB_PATH",
+        pathlib.Path(__file__).parent.parent / ".cache" / "sessions.db",
+    )
+)
+BATCH_SIZE = int(os.getenv("SESSION_WRITE_BATCH_SIZE", "16"))
+FLUSH_INTERVAL_SECONDS = float(os.getenv("SESSION_FLUSH_INTERVAL_SECONDS", "2"))
+# Compact once a session holds more than MAX_EVENTS stored events
+MAX_EVENTS = int(os.getenv("SESSION_MAX_EVENTS", "60"))
+KEEP_RECENT_EVENTS = int(os.getenv("SESSION_KEEP_RECENT_EVENTS", "20"))
+SUMMARY_MAX_CHARS = int(os.getenv("SESSION_SUMMARY_MAX_CHARS", "4000"))
+
+SUMMARY_AUTHOR = "user"
+SUMMARY_INVOCATION_ID = "session_compaction"
+SUMMARY_HEADER = "Summary of earlier conversation:"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    event_data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session
+    ON events (app_name, user_id, session_id, seq);
+"""
+
+
+def _split_state(state):
+    """Split a state dict into app:, user: and session-scoped parts (temp: dropped)."""
+    parts = {"app": {}, "user": {}, "session": {}}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            parts["app"][key[len(State.APP_PREFIX) :]] = value
+        elif key.startswith(State.USER_PREFIX):
+            parts["user"][key[len(State.USER_PREFIX) :]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            parts["session"][key] = value
+    return parts
+
+
+def _merge_state(app_state, user_state, session_state):
+    merged = dict(session_state)
+    merged.update({State.APP_PREFIX + k: v for k, v in app_state.items()})
+    merged.update({State.USER_PREFIX + k: v for k, v in user_state.items()})
+    return merged
+
+
+def _event_text(event):
+    if not event.content or not event.content.parts:
+        return ""
+    return " ".join(p.text for p in event.content.parts if p.text).strip()
+
+
+def _has_function_parts(event):
+    if not event.content or not event.content.parts:
+        return False
+    return any(p.function_call or p.function_response for p in event.content.parts)
+
+
+def is_summary(event):
+    """True for a summary event written by compaction."""
+    return event.invocation_id == SUMMARY_INVOCATION_ID
+
+
+def _shorten(text, limit):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def summarize_events(events, max_chars=SUMMARY_MAX_CHARS):
+    """
+    Deterministic text summary of a run of events.
+
+    Keeps user questions and the agent's final answers; tool calls and tool
+    results are dropped since their conclusions are in the answers. A previous
+    summary at the head is carried over, and the oldest lines are dropped
+    first when the summary would exceed max_chars.
+    """
+    lines = []
+    for event in events:
+        text = _event_text(event)
+        if is_summary(event):
+            lines.extend(text[len(SUMMARY_HEADER) :].strip().splitlines())
+        elif not text or _has_function_parts(event):
+            continue
+        elif event.author == "user":
+            lines.append(f"- User: {_shorten(text, 200)}")
+        else:
+            lines.append(f"- Assistant: {_shorten(text, 300)}")
+
+    while lines and sum(len(line) + 1 for line in lines) > max_chars:
+        lines.pop(0)
+    return SUMMARY_HEADER + "\n" + "\n".join(lines)
+
+
+def _compaction_cut(events, keep_recent):
+    """
+    Number of leading events to fold into a summary, or 0 to leave as is.
+
+    The cut is moved forward to the start of a user turn so a tool call is
+    never separated from its response.
+    """
+    cut = len(events) - keep_recent
+    while 0 < cut < len(events):
+        event = events[cut]
+        if (
+            event.author == "user"
+            and not is_summary(event)
+            and not _has_function_parts(event)
+        ):
+            break
+        cut += 1
+    if cut >= len(events) or (cut <= 1 and is_summary(events[0])):
+        return 0
+    return max(cut, 0)
+
+
+class CompactingSessionService(BaseSessionService):
+    """
+    SQLite session service with batched writes and history compaction.
+
+    Args:
+        db_path: SQLite file (":memory:" for a throwaway store)
+        batch_size: Buffered events that trigger a write
+        flush_interval: Seconds after which buffered events are written anyway,
+            by the background task while it runs (see start()) and otherwise on
+            the next append
+        max_events: Stored events per session before compaction kicks in
+        keep_recent: Most recent events kept verbatim when compacting
+    """
+
+    def __init__(
+        self,
+        db_path=DB_PATH,
+        batch_size=BATCH_SIZE,
+        flush_interval=FLUSH_INTERVAL_SECONDS,
+        max_events=MAX_EVENTS,
+        keep_recent=KEEP_RECENT_EVENTS,
+    ):
+        if str(db_path) != ":memory:":
+            pathlib.Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self.keep_recent = keep_recent
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._flusher = None
+
+    def _load_json(self, sql, params):
+        row = self._conn.execute(sql, params).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _app_state(self, app_name):
+        return self._load_json(
+            "SELECT state FROM app_states WHERE app_name=?", (app_name,)
+        )
+
+    def _user_state(self, app_name, user_id):
+        return self._load_json(
+            "SELECT state FROM user_states WHERE app_name=? AND user_id=?",
+            (app_name, user_id),
+        )
+
+    def _apply_state(self, app_name, user_id, session_id, state, now):
+        parts = _split_state(state)
+        if parts["app"]:
+            merged = {**self._app_state(app_name), **parts["app"]}
+            self._conn.execute(
+                "INSERT OR REPLACE INTO app_states VALUES (?, ?)",
+                (app_name, json.dumps(merged)),
+            )
+        if parts["user"]:
+            merged = {**self._user_state(app_name, user_id), **parts["user"]}
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_states VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(merged)),
+            )
+        current = self._load_json(
+            "SELECT state FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+            (app_name, user_id, session_id),
+        )
+        current.update(parts["session"])
+        self._conn.execute(
+            "UPDATE sessions SET state=?, update_time=? WHERE app_name=? AND user_id=? AND id=?",
+            (json.dumps(current), now, app_name, user_id, session_id),
+        )
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        touched = set()
+        for key, event in self._pending:
+            app_name, user_id, session_id = key
+            self._conn.execute(
+                "INSERT INTO events (app_name, user_id, session_id, timestamp, event_data)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    app_name,
+                    user_id,
+                    session_id,
+                    event.timestamp,
+                    event.model_dump_json(exclude_none=True),
+                ),
+            )
+            delta = event.actions.state_delta if event.actions else None
+            self._apply_state(app_name, user_id, session_id, delta, event.timestamp)
+            touched.add(key)
+        for key in touched:
+            self._compact_locked(*key)
+        self._conn.commit()
+        self._pending = []
+        self._last_flush = time.monotonic()
+
+    def _compact_locked(self, app_name, user_id, session_id):
+        rows = self._conn.execute(
+            "SELECT seq, event_data FROM events WHERE app_name=? AND user_id=? AND session_id=?"
+            " ORDER BY seq",
+            (app_name, user_id, session_id),
+        ).fetchall()
+        if len(rows) <= self.max_events:
+            return
+        events = [Event.model_validate_json(data) for _, data in rows]
+        cut = _compaction_cut(events, self.keep_recent)
+        if not cut:
+            return
+
+        folded = events[:cut]
+        summary = Event(
+            id=str(uuid.uuid4()),
+            invocation_id=SUMMARY_INVOCATION_ID,
+            author=SUMMARY_AUTHOR,
+            timestamp=folded[-1].timestamp,
+            content=types.Content(
+                role="user", parts=[types.Part(text=summarize_events(folded))]
+            ),
+        )
+        # The summary takes the slot of the last folded event so ordering holds
+        last_seq = rows[cut - 1][0]
+        self._conn.execute(
+            "DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=? AND seq<=?",
+            (app_name, user_id, session_id, last_seq),
+        )
+        self._conn.execute(
+            "INSERT INTO events (seq, app_name, user_id, session_id, timestamp, event_data)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                last_seq,
+                app_name,
+                user_id,
+                session_id,
+                summary.timestamp,
+                summary.model_dump_json(exclude_none=True),
+            ),
+        )
+        SESSION_COMPACTIONS.inc()
+
+    def _flush_sync(self):
+        with self._lock:
+            self._flush_locked()
+
+    async def flush(self):
+        """Write all buffered events to the database."""
+        await asyncio.to_thread(self._flush_sync)
+
+    async def start(self):
+        """Start writing buffered events every flush_interval seconds."""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        """Stop the background task and write all buffered events."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        await self.flush()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._pending:
+                try:
+                    await self.flush()
+                except Exception as e:
+                    print(f"❌ Session flush error: {e}")
+
+    def close(self):
+        """Flush buffered events and close the database connection."""
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+    def _create_sync(self, app_name, user_id, state, session_id):
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if exists:
+                raise AlreadyExistsError(
+                    f"Session with id {session_id} already exists."
+                )
+            self._conn.execute(
+                "INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, "{}", now, now),
+            )
+            self._apply_state(app_name, user_id, session_id, state, now)
+            self._conn.commit()
+            merged = _merge_state(
+                self._app_state(app_name),
+                self._user_state(app_name, user_id),
+                _split_state(state)["session"],
+            )
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=merged,
+            events=[],
+            last_update_time=now,
+        )
+
+    async def create_session(self, *, app_name, user_id, state=None, session_id=None):
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        return await asyncio.to_thread(
+            self._create_sync, app_name, user_id, state, session_id
+        )
+
+    def _get_sync(self, app_name, user_id, session_id, config):
+        start = time.perf_counter()
+        with self._lock:
+            self._flush_locked()
+            row = self._conn.execute(
+                "SELECT state, update_time FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT event_data FROM events WHERE app_name=? AND user_id=? AND session_id=?"
+                " ORDER BY seq",
+                (app_name, user_id, session_id),
+            ).fetchall()
+            merged = _merge_state(
+                self._app_state(app_name),
+                self._user_state(app_name, user_id),
+                json.loads(row[0]),
+            )
+
+        events = [Event.model_validate_json(data) for (data,) in rows]
+        if config and config.after_timestamp:
+            events = [e for e in events if e.timestamp >= config.after_timestamp]
+        if config and config.num_recent_events is not None:
+            events = (
+                events[-config.num_recent_events :] if config.num_recent_events else []
+            )
+        SESSION_LOAD_LATENCY.observe(time.perf_counter() - start)
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=merged,
+            events=events,
+            last_update_time=row[1],
+        )
+
+    async def get_session(self, *, app_name, user_id, session_id, config=None):
+        return await asyncio.to_thread(
+            self._get_sync, app_name, user_id, session_id, config
+        )
+
+    def _list_sync(self, app_name, user_id):
+        with self._lock:
+            self._flush_locked()
+            if user_id:
+                rows = self._conn.execute(
+                    "SELECT id, user_id, state, update_time FROM sessions"
+                    " WHERE app_name=? AND user_id=?",
+                    (app_name, user_id),
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT id, user_id, state, update_time FROM sessions WHERE app_name=?",
+                    (app_name,),
+                ).fetchall()
+            app_state = self._app_state(app_name)
+            user_states = {
+                uid: self._user_state(app_name, uid) for uid in {r[1] for r in rows}
+            }
+        return ListSessionsResponse(
+            sessions=[
+                Session(
+                    app_name=app_name,
+                    user_id=uid,
+                    id=sid,
+                    state=_merge_state(app_state, user_states[uid], json.loads(state)),
+                    events=[],
+                    last_update_time=updated,
+                )
+                for sid, uid, state, updated in rows
+            ]
+        )
+
+    async def list_sessions(self, *, app_name, user_id=None):
+        return await asyncio.to_thread(self._list_sync, app_name, user_id)
+
+    def _delete_sync(self, app_name, user_id, session_id):
+        key = (app_name, user_id, session_id)
+        with self._lock:
+            self._pending = [(k, e) for k, e in self._pending if k != key]
+            self._conn.execute(
+                "DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=?",
+                key,
+            )
+            self._conn.execute(
+                "DELETE FROM sessions WHERE app_name=? AND user_id=? AND id=?", key
+            )
+            self._conn.commit()
+
+    async def delete_session(self, *, app_name, user_id, session_id):
+        await asyncio.to_thread(self._delete_sync, app_name, user_id, session_id)
+
+    async def append_event(self, session, event):
+        # The base class updates the in-memory session and drops temp: state
+        event = await super().append_event(session, event)
+        if event.partial:
+            return event
+        session.last_update_time = event.timestamp
+
+        with self._lock:
+            self._pending.append(
+                ((session.app_name, session.user_id, session.id), event)
+            )
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            await self.flush()
+        return event
@@ -0,0 +1,447 @@
+"""
+Columnar snapshot of the listing corpus.
+
+Parsing mock_listings.json costs time and memory in proportion to the corpus
+on every startup. A snapshot holds the same listings, already parsed,
+price-normalized and dedup-annotated, as an uncompressed Arrow IPC file.
+Opening it memory-maps the file: columns are read in place, nothing is
+parsed, and every worker process opening the same file shares the same
+page-cache pages. Low-cardinality text columns are dictionary-encoded.
+
+Filters run on the mapped columns (see filter_mask) and listing dicts are
+built only for the rows a search returns. Rows are stored canonical
+listings first, so the repost-free view used by searches is a zero-copy
+slice. A stored permutation that sorts the id column finds a listing by ID
+with a binary search.
+
+The snapshot records the file it was built from and that file's
+modification time; load_mock_listings uses it only while it was built from
+the mock file and that file is unchanged.
+
+Usage (from backend/):
+    python -m my_agent.snapshot
+    python -m my_agent.snapshot --input .cache/listings_1m.jsonl --out .cache/listings_1m.arrow
+"""
+
+import json
+import os
+import pathlib
+from collections.abc import Sequence
+from functools import reduce
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+BACKEND_DIR = pathlib.Path(__file__).parent.parent
+SOURCE_PATH = BACKEND_DIR / "mock_listings.json"
+SNAPSHOT_PATH = pathlib.Path(
+    os.getenv("MOCK_SNAPSHOT_PATH", BACKEND_DIR / ".cache" / "mock_listings.arrow")
+)
+BATCH_ROWS = 65_536
+
+_TEXT = pa.string()
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+_INTEGER = pa.int64()
+
+SCHEMA = pa.schema(
+    [
+        ("idx", _INTEGER),
+        ("id", _TEXT),
+        ("source_raw_message_id", _TEXT),
+        ("message_date", _TEXT),
+        ("created_at", _TEXT),
+        ("agent_contact", _TEXT),
+        ("agent_name", _CATEGORY),
+        ("company_name", _CATEGORY),
+        ("raw_message", _TEXT),
+        ("message_type", _CATEGORY),
+        ("property_type", _CATEGORY),
+        ("area_sqft", _INTEGER),
+        ("price", _INTEGER),
+        ("price_text", _TEXT),
+        ("price_per_sqft", _INTEGER),
+        ("monthly_rent", _INTEGER),
+        ("location", _CATEGORY),
+        ("project_name", _CATEGORY),
+        ("furnishing_status", _CATEGORY),
+        ("parking_count", _INTEGER),
+        ("parking_text", _TEXT),
+        ("facing_direction", _CATEGORY),
+        ("special_features", pa.list_(_TEXT)),
+        ("llm_json", _TEXT),
+        ("bedroom_count", _INTEGER),
+        ("canonical_id", _TEXT),
+        ("is_duplicate", pa.bool_()),
+        ("duplicate_count", _INTEGER),
+    ]
+)
+INTEGER_COLUMNS = [f.name for f in SCHEMA if f.type == _INTEGER]
+# Row numbers in id order, stored alongside the listing columns
+ID_ORDER_COLUMN = "_id_order"
+
+# Columns each filter field reads (see filters.get_listing_value)
+FILTER_COLUMNS = {
+    "price_cr": ("price",),
+    "bhk": ("bedroom_count",),
+    "area_sqft": ("area_sqft",),
+    "locality": ("location",),
+    "near_landmark": ("location",),
+    "status": ("special_features",),
+    "property_type": ("property_type",),
+    "investment_grade": ("price", "location"),
+    "message_type": ("message_type",),
+    "message_date": ("message_date",),
+}
+_COMPARISONS = {
+    "eq": pc.equal,
+    "gt": pc.greater,
+    "lt": pc.less,
+    "gte": pc.greater_equal,
+    "lte": pc.less_equal,
+}
+
+
+def _values(column):
+    """Python values of a column chunk."""
+    if not pa.types.is_dictionary(column.type):
+        return column.to_pylist()
+    # Decode each distinct value once rather than once per row
+    labels = column.dictionary.to_pylist()
+    return [None if i is None else labels[i] for i in column.indices.to_pylist()]
+
+
+def _rows(data):
+    """Listing dicts of a record batch or table."""
+    if isinstance(data, pa.Table):
+        return [row for batch in data.to_batches() for row in _rows(batch)]
+    names = data.schema.names
+    columns = [_values(data.column(i)) for i in range(len(names))]
+    return [
+        dict(zip(names, values, strict=True)) for values in zip(*columns, strict=True)
+    ]
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _mask_by_value(column, name, filter_obj):
+    """
+    Mask of a filter on one column, evaluated once per distinct value with
+    apply_filter, so it matches the in-memory search exactly.
+    """
+    from .filters import apply_filter
+
+    null_passes = apply_filter({name: None}, filter_obj)
+    masks = []
+    for chunk in column.chunks:
+        if pa.types.is_dictionary(chunk.type):
+            labels = chunk.dictionary.to_pylist()
+            passes = pa.array(
+                [apply_filter({name: label}, filter_obj) for label in labels],
+                pa.bool_(),
+            )
+            mask = pc.take(passes, chunk.indices)
+        else:
+            values = pc.unique(chunk).to_pylist()
+            matching = [
+                v
+                for v in values
+                if v is not None and apply_filter({name: v}, filter_obj)
+            ]
+            mask = pc.is_in(chunk, value_set=pa.array(matching, chunk.type))
+        masks.append(pc.fill_null(mask, null_passes))
+    return pa.chunked_array(masks, pa.bool_())
+
+
+def filter_mask(table, filter_obj):
+    """
+    Boolean mask of the rows of a snapshot table that pass a ListingFilter,
+    with the same result as filters.apply_filter on each row.
+
+    Numeric and date comparisons run as Arrow kernels; other filters on one
+    column are evaluated once per distinct value; the rest (derived fields
+    on several columns) fall back to apply_filter on the columns they read.
+    """
+    from .filters import apply_filter, is_geo_filter
+
+    field, op, value = filter_obj.field, filter_obj.op, filter_obj.value
+    if is_geo_filter(field, op):
+        return _mask_by_value(table.column("location"), "location", filter_obj)
+
+    columns = FILTER_COLUMNS[field]
+    compare = _COMPARISONS.get(op)
+    if field == "price_cr" and compare and _is_number(value):
+        # A missing price counts as 0 Cr, as in get_listing_value
+        price_cr = pc.divide(
+            pc.cast(pc.fill_null(table.column("price"), 0), pa.float64()), 10_000_000
+        )
+        return compare(price_cr, value)
+    if compare and (
+        (field in ("bhk", "area_sqft") and _is_number(value))
+        or (field == "message_date" and isinstance(value, str))
+    ):
+        return pc.fill_null(compare(table.column(columns[0]), value), False)
+    if len(columns) == 1 and not pa.types.is_list(table.schema.field(columns[0]).type):
+        return _mask_by_value(table.column(columns[0]), columns[0], filter_obj)
+
+    values = [table.column(name).to_pylist() for name in columns]
+    return pa.chunked_array(
+        [
+            pa.array(
+                [
+                    apply_filter(dict(zip(columns, row, strict=True)), filter_obj)
+                    for row in zip(*values, strict=True)
+                ],
+                pa.bool_(),
+            )
+        ]
+    )
+
+
+class _Selection(Sequence):
+    """
+    Rows of a table picked by a filter. Listing dicts are built only for the
+    rows read, so slicing the first page of a large match is cheap.
+    """
+
+    def __init__(self, table, indices):
+        self.table = table
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return _rows(
+                self.table.take(self.indices.slice(start, max(stop - start, 0)))
+            )
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("listing index out of range")
+        return self[index : index + 1][0]
+
+    def __iter__(self):
+        for start in range(0, len(self), BATCH_ROWS):
+            yield from self[start : start + BATCH_ROWS]
+
+
+class ListingSnapshot(Sequence):
+    """
+    Read-only sequence of listing dicts backed by an Arrow table.
+
+    Each access builds fresh dicts, so changes to a returned listing are not
+    kept. filter, filter_batch and get work on the columns and build dicts
+    only for the rows they return.
+    """
+
+    def __init__(self, table, canonical_rows=None, id_order=None):
+        if ID_ORDER_COLUMN in table.column_names:
+            table = table.drop_columns([ID_ORDER_COLUMN])
+        self.table = table
+        self.canonical_rows = (
+            table.num_rows if canonical_rows is None else canonical_rows
+        )
+        self._id_order = id_order
+
+    @classmethod
+    def open(cls, path=SNAPSHOT_PATH):
+        """Memory-map a snapshot file."""
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+        table = reader.read_all()
+        metadata = table.schema.metadata or {}
+        id_order = (
+            table.column(ID_ORDER_COLUMN)
+            if ID_ORDER_COLUMN in table.column_names
+            else None
+        )
+        return cls(
+            table, int(metadata.get(b"canonical_rows", table.num_rows)), id_order
+        )
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return _rows(self.table.slice(start, max(stop - start, 0)))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("listing index out of range")
+        return _rows(self.table.slice(index, 1))[0]
+
+    def __iter__(self):
+        for batch in self.table.to_batches(max_chunksize=BATCH_ROWS):
+            yield from _rows(batch)
+
+    def canonical(self):
+        """Listings that are not reposts, as a zero-copy view."""
+        return ListingSnapshot(self.table.slice(0, self.canonical_rows))
+
+    def filter(self, filters):
+        """
+        Listings passing every ListingFilter, in row order, as a read-only
+        sequence that builds listing dicts only as they are read.
+        """
+        return self.filter_batch([filters])[0]
+
+    def filter_batch(self, filter_sets):
+        """
+        Listings passing each list of ListingFilters, as for filter. A filter
+        shared by several sets is evaluated once.
+        """
+        from .filters import filter_key
+
+        masks = {}
+        results = []
+        for filters in filter_sets:
+            set_masks = []
+            for filter_obj in filters:
+                key = filter_key(filter_obj)
+                if key not in masks:
+                    masks[key] = filter_mask(self.table, filter_obj)
+                set_masks.append(masks[key])
+            if not set_masks:
+                results.append(self)
+                continue
+            indices = pc.indices_nonzero(reduce(pc.and_, set_masks))
+            results.append(_Selection(self.table, indices))
+        return results
+
+    def column(self, name):
+        """Python values of one column, without building listing dicts."""
+        return [
+            value
+            for chunk in self.table.column(name).chunks
+            for value in _values(chunk)
+        ]
+
+    def select(self, columns):
+        """Listing dicts with only the given columns."""
+        return _rows(self.table.select(columns))
+
+    def get_many(self, listing_ids):
+        """Listings with any of the IDs, in row order."""
+        value_set = pa.array([str(i) for i in listing_ids], pa.string())
+        return _rows(
+            self.table.filter(pc.is_in(self.table.column("id"), value_set=value_set))
+        )
+
+    def get(self, listing_id, default=None):
+        """Listing with an ID, or default."""
+        if self._id_order is None:
+            # Snapshots written before the id order was stored
+            self._id_order = pc.sort_indices(self.table.column("id"))
+        ids, order = self.table.column("id"), self._id_order
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if ids[order[middle].as_py()].as_py() < listing_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order):
+            row = order[low].as_py()
+            if ids[row].as_py() == listing_id:
+                return self[row]
+        return default
+
+
+def _column_value(name, value):
+    if name in INTEGER_COLUMNS:
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
+    if name == "llm_json" and value is not None and not isinstance(value, str):
+        return json.dumps(value)
+    return value
+
+
+def write_snapshot(listings, path=SNAPSHOT_PATH, source=None):
+    """
+    Write prepared listings (see mock_data.prepare_listings) as a snapshot.
+
+    Args:
+        listings: Listing dicts; fields outside SCHEMA are not stored
+        path: Snapshot file
+        source: File the listings came from, for the freshness check
+
+    Returns:
+        Number of rows written
+    """
+    rows = sorted(listings, key=lambda listing: bool(listing.get("is_duplicate")))
+    canonical_rows = sum(1 for listing in rows if not listing.get("is_duplicate"))
+    columns = {
+        name: [_column_value(name, listing.get(name)) for listing in rows]
+        for name in SCHEMA.names
+    }
+    ids = columns["id"]
+    columns[ID_ORDER_COLUMN] = sorted(range(len(ids)), key=lambda i: str(ids[i]))
+    metadata = {"canonical_rows": str(canonical_rows)}
+    if source is not None:
+        source = pathlib.Path(source).resolve()
+        metadata.update(
+            source=str(source), source_mtime_ns=str(source.stat().st_mtime_ns)
+        )
+    schema = SCHEMA.append(pa.field(ID_ORDER_COLUMN, _INTEGER))
+    table = pa.table(columns, schema=schema.with_metadata(metadata))
+
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=BATCH_ROWS)
+    # Workers that already mapped the old file keep reading it
+    tmp.replace(path)
+    return table.num_rows
+
+
+def is_fresh(path=SNAPSHOT_PATH, source=SOURCE_PATH):
+    """Whether a snapshot exists and was built from the current source file."""
+    path = pathlib.Path(path)
+    if not path.exists():
+        return False
+    metadata = pa.ipc.open_file(pa.memory_map(str(path))).schema.metadata or {}
+    if b"source" not in metadata or b"source_mtime_ns" not in metadata:
+        # Built from a corpus that was not recorded, e.g. a benchmark corpus
+        return False
+    source = pathlib.Path(source).resolve()
+    return (
+        metadata[b"source"].decode() == str(source)
+        and source.exists()
+        and int(metadata[b"source_mtime_ns"]) == source.stat().st_mtime_ns
+    )
+
+
+def main():
+    import argparse
+
+    from .loader import read_rows
+    from .mock_data import prepare_listings
+
+    parser = argparse.ArgumentParser(description="Build a columnar listing snapshot")
+    parser.add_argument(
+        "--input", default=str(SOURCE_PATH), help="JSON, JSONL or CSV listings"
+    )
+    parser.add_argument("--out", default=str(SNAPSHOT_PATH))
+    cli = parser.parse_args()
+
+    listings = prepare_listings(read_rows(cli.input))
+    # A snapshot of any other corpus is never taken for the mock file's
+    rows = write_snapshot(listings, cli.out, source=cli.input)
+    print(f"✅ Wrote {rows} listings to {cli.out}")
+
+
+if __name__ == "__main__":
+    main()
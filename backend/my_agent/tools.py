@@ -2,10 +2,45 @@
 Main tool functions for the real estate agent.
 Imports from modular components for clean organization.
 """
-from .database import supabase, USE_SUPABASE, query_listings, get_listing_by_id, count_listings_by_location
-from .filters import ListingFilter, apply_filter, apply_filters_to_supabase_query
-from .locality_data import LANDMARK_TO_LOCALITIES, LOCALITY_STATS
-from .mock_data import load_mock_listings, load_mock_agents, apply_mock_filters
+import os
+import threading
+import time
+
+from google.adk.tools import ToolContext
+
+from . import session_cache
+from .brokers import BrokerIndex
+from .database import (
+    USE_SUPABASE,
+    count_listings_by_location,
+    get_listing_by_id,
+    get_listings_by_ids,
+    iter_listings,
+    query_all_listings,
+    query_listings,
+    supabase,
+)
+from .dedup import canonical_listings
+from .filters import (
+    ListingFilter,
+    apply_filter,
+    apply_filters_to_supabase_query,
+    filter_key,
+    has_date_filter,
+    recent_date_filter,
+)
+from .geo import localities_within, nearby_localities
+from .locality_data import LOCALITY_STATS
+from .metrics import record_search, timed_tool
+from .mock_data import (
+    apply_mock_filters,
+    apply_mock_filters_batch,
+    load_mock_agents,
+    load_mock_listings,
+)
+
+# Maximum number of listings returned to the agent per search
+MAX_RESULTS = 50
 
 # Load mock data if not using Supabase
 MOCK_LISTINGS = []
@@ -14,85 +49,221 @@ if not USE_SUPABASE:
     MOCK_LISTINGS = load_mock_listings()
     MOCK_AGENTS = load_mock_agents()
 
+# Rebuild interval of the Supabase broker index; the mock index is rebuilt
+# whenever MOCK_LISTINGS changes
+BROKER_INDEX_TTL_SECONDS = float(os.getenv("BROKER_INDEX_TTL_SECONDS", "600"))
+_broker_index_cache = {"key": None, "index": None}
+_mock_by_id_cache = {"key": None, "by_id": {}}
+# Tools run on a thread pool (see parallel.py)
+_broker_index_lock = threading.Lock()
+_mock_by_id_lock = threading.Lock()
+
 
-def search_listings(filters):
+@timed_tool
+def search_listings(filters, tool_context: ToolContext = None):
     """
     Search listings using a filter language.
     
     Uses Supabase dynamic queries if USE_SUPABASE=true, otherwise filters mock data in-memory.
+    Within a chat session, matches are memoized in session state, so repeating or
+    narrowing an earlier search doesn't go back to the data source.
+    """
+    cached = session_cache.lookup(tool_context, filters) if tool_context else None
+    
+    if cached is not None:
+        source = "session_cache"
+        fetched, results = len(cached), cached
+    elif USE_SUPABASE and supabase:
+        source = "supabase"
+        fetched, results = _search_supabase(filters)
+    else:
+        source = "mock"
+        results = _search_mock(filters)
+        fetched = len(results)
+
+    if tool_context and cached is None and fetched is not None:
+        session_cache.store(tool_context, filters, results)
+
+    # Limit results to prevent overwhelming the agent
+    matched = len(results)
+    if matched > MAX_RESULTS:
+        print("\n" + "⚠️ "*40)
+        print(f"   WARNING: Too many results ({matched}), limiting to {MAX_RESULTS}")
+        print("⚠️ "*40 + "\n")
+    # Slicing also builds the listings of a lazy ListingSnapshot match
+    results = results[:MAX_RESULTS]
+
+    record_search(source, fetched or 0, len(results), matched > MAX_RESULTS)
+    return results
+
+
+def search_all_listings(filters):
+    """
+    All listings matching filters, without the MAX_RESULTS limit or the
+    session cache. For aggregates that must cover every match rather than
+    the rows shown to the agent.
     """
     if USE_SUPABASE and supabase:
-        # Dynamic Supabase query approach
-        try:
+        return _search_supabase(filters, paged=True)[1]
+    return list(_search_mock(filters))
+
+
+def _search_supabase(filters, paged=False):
+    """
+    Run a search against Supabase.
+
+    Args:
+    - paged: Read every page of the result instead of the first page
+      PostgREST returns
+
+    Returns:
+    - (rows fetched from the database, all matching listings); rows fetched is
+      None if the query failed
+    """
+    # Dynamic Supabase query approach
+    try:
+        def build_query():
             query = supabase.table('whatsapp_listings_relevant').select('*')
-            
             # Apply filters to query
-            query = apply_filters_to_supabase_query(query, filters)
-            
-            # Execute query
-            results = query_listings(query)
-            
-            # Post-process for derived fields (status, investment_grade)
-            filtered_results = []
-            for listing in results:
-                passes_all = True
-                for filter_obj in filters:
-                    field = filter_obj.get("field")
-                    
-                    # Handle derived fields that weren't in DB query
-                    if field in ["status", "investment_grade"]:
-                        validated_filter = ListingFilter(**filter_obj)
-                        if not apply_filter(listing, validated_filter):
-                            passes_all = False
-                            break
-                
-                if passes_all:
-                    filtered_results.append(listing)
-            
-            # Log results with visual separation
+            return apply_filters_to_supabase_query(query, filters)
+
+        # Execute query
+        results = query_all_listings(build_query) if paged else query_listings(build_query())
+        
+        # Post-process for derived fields (status, investment_grade)
+        filtered_results = []
+        for listing in results:
+            passes_all = True
+            for filter_obj in filters:
+                field = filter_obj.get("field")
+
+                # Handle derived fields that weren't in DB query
+                if field in ["status", "investment_grade"]:
+                    validated_filter = ListingFilter(**filter_obj)
+                    if not apply_filter(listing, validated_filter):
+                        passes_all = False
+                        break
+
+            if passes_all:
+                filtered_results.append(listing)
+
+        # Log results with visual separation
+        print("\n" + "="*80)
+        print(f"🔍 SUPABASE QUERY RESULTS: {len(filtered_results)} listings found")
+        print("="*80 + "\n")
+
+        return len(results), filtered_results
+
+    except Exception as e:
+        print(f"❌ Supabase query error: {e}")
+        return None, []
+
+
+def _search_mock(filters):
+    """Filter the mock listings in-memory and return all matches."""
+    # Validate filters using Pydantic
+    validated_filters = _validate_filters(filters)
+
+    results = apply_mock_filters(canonical_listings(MOCK_LISTINGS), validated_filters)
+
+    print(f"📁 Mock data filtering returned {len(results)} results")
+    return results
+
+
+def _validate_filters(filters):
+    """Validate filter dicts into ListingFilter objects, skipping invalid ones."""
+    validated_filters = []
+    for f in filters:
+        if isinstance(f, dict):
+            try:
+                validated_filters.append(ListingFilter(**f))
+            except Exception as e:
+                print(f"Skipping invalid filter: {f} - {e}")
+                continue
+        elif isinstance(f, ListingFilter):
+            validated_filters.append(f)
+    return validated_filters
+
+
+@timed_tool
+def search_listings_batch(filter_sets, count_only=False):
+    """
+    Answer many filter sets with one shared scan of the listing store.
+
+    Uses one shared Supabase query, read page by page, when USE_SUPABASE=true:
+    filters common to every set are pushed down to the database and the rest
+    are evaluated locally on the shared result. In mock mode all sets are evaluated in one pass over
+    the mock data. Either way, predicates shared between sets are evaluated
+    once per listing.
+
+    Args:
+    - filter_sets: List of filter lists (same format as search_listings)
+    - count_only: If True, omit the listings and return only counts
+
+    Returns:
+    - List of {"count": int, "results": [listings]} in the same order as
+      filter_sets. count is the full match count; results are limited to
+      MAX_RESULTS per set.
+    """
+    if not filter_sets:
+        return []
+
+    if USE_SUPABASE and supabase:
+        try:
+            # Make the default date window explicit so every set is
+            # self-contained and the window can be shared like any other
+            # filter. It is built once: sets only share identical filters
+            recent = recent_date_filter()
+            filter_sets = [
+                list(filters) if has_date_filter(filters) else [*filters, recent]
+                for filters in filter_sets
+            ]
+
+            # Push down the filters every set has in common (derived fields
+            # can't be evaluated by the database)
+            common_keys = set.intersection(*[
+                {filter_key(f) for f in filters if f.get("field") not in ["status", "investment_grade"]}
+                for filters in filter_sets
+            ])
+            common_filters = list({
+                filter_key(f): f for f in filter_sets[0] if filter_key(f) in common_keys
+            }.values())
+
+            def shared_query():
+                query = supabase.table('whatsapp_listings_relevant').select('*')
+                return apply_filters_to_supabase_query(query, common_filters, default_recent=False)
+
+            # Paged, so counts cover every match and not just the first
+            # page PostgREST returns
+            rows = query_all_listings(shared_query)
+
+            remaining_sets = [
+                _validate_filters([f for f in filters if filter_key(f) not in common_keys])
+                for filters in filter_sets
+            ]
+            matches = apply_mock_filters_batch(rows, remaining_sets)
+
             print("\n" + "="*80)
-            print(f"🔍 SUPABASE QUERY RESULTS: {len(filtered_results)} listings found")
+            print(f"🔍 SUPABASE BATCH RESULTS: {len(filter_sets)} queries answered from {len(rows)} rows")
             print("="*80 + "\n")
-            
-            # Limit results to prevent overwhelming the agent
-            if len(filtered_results) > 50:
-                print("\n" + "⚠️ "*40)
-                print(f"   WARNING: Too many results ({len(filtered_results)}), limiting to 50")
-                print("⚠️ "*40 + "\n")
-                filtered_results = filtered_results[:50]
-            
-            return filtered_results
-            
+
         except Exception as e:
-            print(f"❌ Supabase query error: {e}")
-            return []
-    
+            print(f"❌ Supabase batch query error: {e}")
+            matches = [[] for _ in filter_sets]
+
     else:
-        # Mock data in-memory filtering
-        # Validate filters using Pydantic
-        validated_filters = []
-        for f in filters:
-            if isinstance(f, dict):
-                try:
-                    validated_filters.append(ListingFilter(**f))
-                except Exception as e:
-                    print(f"Skipping invalid filter: {f} - {e}")
-                    continue
-            elif isinstance(f, ListingFilter):
-                validated_filters.append(f)
-
-        results = apply_mock_filters(MOCK_LISTINGS, validated_filters)
-        
-        print(f"📁 Mock data filtering returned {len(results)} results")
-        
-        # Limit results to prevent overwhelming the agent
-        if len(results) > 50:
-            print(f"⚠️  Too many results ({len(results)}), limiting to 50")
-            results = results[:50]
-        
-        return results
+        validated_sets = [_validate_filters(filters) for filters in filter_sets]
+        matches = apply_mock_filters_batch(canonical_listings(MOCK_LISTINGS), validated_sets)
 
+        print(f"📁 Mock batch filtering answered {len(filter_sets)} queries in one pass")
 
+    return [
+        {"count": len(results), "results": [] if count_only else results[:MAX_RESULTS]}
+        for results in matches
+    ]
+
+
+@timed_tool
 def get_locality_stats(locality: str):
     """
     Returns statistics for a locality.
@@ -114,7 +285,12 @@ def get_locality_stats(locality: str):
     if USE_SUPABASE and supabase:
         inventory_count = count_listings_by_location(locality)
     else:
-        inventory_count = sum(1 for l in MOCK_LISTINGS if l.get("location") == locality)
+        listings = canonical_listings(MOCK_LISTINGS)
+        if hasattr(listings, "column"):
+            # Count a ListingSnapshot's location column without building listings
+            inventory_count = listings.column("location").count(locality)
+        else:
+            inventory_count = sum(1 for listing in listings if listing.get("location") == locality)
     
     return {
         "locality": locality,
@@ -125,19 +301,24 @@ def get_locality_stats(locality: str):
     }
 
 
-def get_nearby_localities(landmark: str):
+@timed_tool
+def get_nearby_localities(landmark: str, radius_km: float = None):  # noqa: RUF013 (ADK declares X | None as anyOf)
     """
-    Returns localities near a landmark.
+    Returns localities near a landmark or locality.
     
     Args:
-    - landmark: Name of landmark (e.g., "Manyata Tech Park")
+    - landmark: Name of landmark or locality (e.g., "Manyata Tech Park", "ITPL", "Hebbal")
+    - radius_km: Search radius in km (default 5)
     
     Returns:
-    - List of locality names
+    - List of locality names, nearest first
     """
-    return LANDMARK_TO_LOCALITIES.get(landmark, [])
+    if radius_km is None:
+        return list(nearby_localities(landmark))
+    return list(localities_within(landmark, radius_km))
 
 
+@timed_tool
 def get_listing_details(listing_id: str):
     """Returns the full details of a specific listing by its ID."""
     if USE_SUPABASE and supabase:
@@ -145,31 +326,168 @@ def get_listing_details(listing_id: str):
         if listing:
             return listing
     else:
-        for l in MOCK_LISTINGS:
-            if l.get("id") == listing_id:
-                return l
+        listing = _mock_listing(listing_id)
+        if listing:
+            return listing
     
     return {"error": "Listing not found"}
 
 
-def get_agent_details(query: str):
+def _mock_listing(listing_id):
+    """Mock listing with an ID, or None. A ListingSnapshot looks it up itself."""
+    if hasattr(MOCK_LISTINGS, "get"):
+        return MOCK_LISTINGS.get(listing_id)
+    return _mock_listings_by_id().get(listing_id)
+
+
+def _mock_listings(listing_ids):
+    """Mock listings with the IDs, in MOCK_LISTINGS order."""
+    if hasattr(MOCK_LISTINGS, "get_many"):
+        return MOCK_LISTINGS.get_many(listing_ids)
+    by_id = _mock_listings_by_id()
+    return [by_id[i] for i in listing_ids]
+
+
+def _mock_listings_by_id():
+    """Dict of listing ID to mock listing, rebuilt whenever MOCK_LISTINGS changes."""
+    cache = _mock_by_id_cache
+    with _mock_by_id_lock:
+        key = (id(MOCK_LISTINGS), len(MOCK_LISTINGS))
+        if cache["key"] != key:
+            cache.update(key=key, by_id={listing["id"]: listing for listing in MOCK_LISTINGS})
+        return cache["by_id"]
+
+
+def _broker_index():
     """
-    Returns details of an internal agent by name or ID.
-    
-    Args:
-    - query: Agent name or ID (e.g., "Rahul", "agent_1")
-    
+    Broker index over the current listings.
+
+    The index covers the listings searches return, so a broker's listings
+    are the same on both paths. On Supabase it is built off the request path
+    by a background thread (see refresh_broker_index); the mock index is
+    rebuilt whenever MOCK_LISTINGS changes.
+
     Returns:
-    - Agent profile dict or error
+    - BrokerIndex, or None until the first Supabase build finishes
     """
+    cache = _broker_index_cache
+    with _broker_index_lock:
+        if USE_SUPABASE and supabase:
+            return cache["index"]
+        key = (id(MOCK_LISTINGS), len(MOCK_LISTINGS))
+        if cache["key"] != key:
+            listings = canonical_listings(MOCK_LISTINGS)
+            if hasattr(listings, "select"):
+                # Only the contact columns of a ListingSnapshot are decoded
+                listings = listings.select(["id", "agent_name", "agent_contact", "company_name"])
+            cache.update(key=key, index=BrokerIndex(listings))
+        return cache["index"]
+
+
+def refresh_broker_index():
+    """Rebuild the Supabase broker index from the listings searches read."""
+    listings = list(iter_listings(["id", "agent_name", "agent_contact", "company_name"], searchable=True))
+    index = BrokerIndex(listings)
+    with _broker_index_lock:
+        _broker_index_cache.update(key="supabase", index=index)
+    print(f"✅ Broker index rebuilt: {len(index)} brokers from {len(listings)} listings")
+
+
+def _refresh_broker_index_periodically():
+    while True:
+        try:
+            refresh_broker_index()
+        except Exception as e:
+            print(f"❌ Broker index rebuild failed: {e}")
+        time.sleep(BROKER_INDEX_TTL_SECONDS)
+
+
+if USE_SUPABASE and supabase:
+    threading.Thread(target=_refresh_broker_index_periodically, name="broker-index", daemon=True).start()
+
+
+def _internal_agent(query):
+    """Internal agent profile matching an ID or (part of a) name, or None."""
     query_str = str(query).lower()
     for agent in MOCK_AGENTS:
         if query_str in agent["id"].lower() or query_str in agent["name"].lower():
             return agent
+    return None
+
+
+@timed_tool
+def get_agent_details(query: str):
+    """
+    Returns details of an agent or broker by name, phone number or ID.
+    
+    Args:
+    - query: Agent name, phone number, agent ID or broker ID
+      (e.g., "Rahul", "agent_1", "+91 74110 06000")
+    
+    Returns:
+    - Agent profile dict (with broker_id, phones and listing_count when the
+      agent posts listings) or error
+    """
+    index = _broker_index()
+    broker = index.lookup(query) if index else None
+    agent = _internal_agent(query)
+    if agent is None and broker and broker["name"]:
+        agent = _internal_agent(broker["name"])
+
+    if agent and broker:
+        return {**agent, **broker}
+    if agent or broker:
+        return agent or broker
     return {"error": "Agent not found"}
 
 
-def get_listings_by_type(property_type: str, group_by_agent: bool = False):
+@timed_tool
+def get_broker_listings(broker: str):
+    """
+    Returns a broker's listings.
+
+    Args:
+    - broker: Broker ID, phone number or full name, in any format
+      (e.g., "7026070800", "+91 70260 70800", "Tashi Properties")
+
+    Returns:
+    - {"broker": profile, "count": int, "results": [listings]}; results are
+      limited to MAX_RESULTS, and reposts of the same listing appear once
+    - {"error": ..., "brokers": [profiles]} if several brokers share the
+      name; ask which one is meant, or for a phone number
+    """
+    index = _broker_index()
+    if index is None:
+        return {"error": "Broker index is still loading; try again shortly"}
+    broker_id = index.resolve(broker)
+    if broker_id is None:
+        candidates = index.matches(broker)
+        if candidates:
+            return {
+                "error": "Several brokers have this name",
+                "brokers": [index.brokers[b] for b in candidates[:MAX_RESULTS]],
+            }
+        return {"error": "Broker not found"}
+
+    listing_ids = index.listing_ids(broker_id)
+    if USE_SUPABASE and supabase:
+        listings = get_listings_by_ids(listing_ids)
+    else:
+        listings = _mock_listings(listing_ids)
+
+    reposts = {}
+    for listing in listings:
+        reposts.setdefault(listing.get("canonical_id") or listing.get("id"), listing)
+    unique = list(reposts.values())
+    return {
+        "broker": index.brokers[broker_id],
+        "count": len(unique),
+        "results": unique[:MAX_RESULTS],
+    }
+
+
+@timed_tool
+def get_listings_by_type(property_type: str, group_by_agent: bool = False, tool_context: ToolContext = None):
     """
     Search all listings by a specific property type.
     
@@ -181,12 +499,15 @@ def get_listings_by_type(property_type: str, group_by_agent: bool = False):
     - List of matching listings OR Dict of listings keyed by agent name
     """
     # Reuse search_listings with a single filter
-    listings = search_listings([{"field": "property_type", "op": "eq", "value": property_type}])
+    listings = search_listings(
+        [{"field": "property_type", "op": "eq", "value": property_type}],
+        tool_context=tool_context,
+    )
     
     if group_by_agent:
         grouped = {}
         for l in listings:
-            agent_name = l.get("agent_name", "Unknown Agent")
+            agent_name = l.get("agent_name") or "Unknown Agent"
             if agent_name not in grouped:
                 grouped[agent_name] = []
             grouped[agent_name].append(l)
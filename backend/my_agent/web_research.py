@@ -1,9 +1,30 @@
 """
 Web research tool for real estate market information.
-Wraps Google Search functionality for the agent.
+Wraps Google Search functionality for the agent, with a persistent cache so
+repeated research questions don't trigger a fresh search and model call.
 """
+import asyncio
+import json
+import os
+import pathlib
+import re
+import threading
+import time
+
+from google.adk.tools import AgentTool
 from google.adk.tools import google_search as _google_search
 
+from .metrics import record_cache
+
+CACHE_PATH = pathlib.Path(os.getenv(
+    "WEB_RESEARCH_CACHE_PATH",
+    pathlib.Path(__file__).parent.parent / '.cache' / 'web_research.json',
+))
+# Market news and developer reviews change slowly
+CACHE_TTL_SECONDS = int(os.getenv("WEB_RESEARCH_CACHE_TTL_SECONDS", str(24 * 3600)))
+# Bounds memory and the size of the file rewritten on every new result
+CACHE_MAX_ENTRIES = int(os.getenv("WEB_RESEARCH_CACHE_MAX_ENTRIES", "1000"))
+
 
 def search_web(query: str) -> str:
     """
@@ -28,3 +49,142 @@ def search_web(query: str) -> str:
         return results
     except Exception as e:
         return f"Error performing web search: {str(e)}"
+
+
+def normalize_query(query):
+    """
+    Cache key for a research query.
+
+    Case, punctuation, whitespace and word order are ignored, so
+    "Prestige Group reviews?" and "reviews prestige group" share an entry.
+    """
+    words = re.findall(r"[a-z0-9]+", str(query).lower())
+    return " ".join(sorted(set(words)))
+
+
+class ResearchCache:
+    """
+    TTL cache for web research results, persisted to a JSON file.
+
+    Concurrent lookups of the same normalized query share one upstream call
+    (single-flight): the first caller fetches, the rest await its result.
+    Expired entries are dropped on load and on every write, and beyond
+    max_entries the oldest entries are evicted.
+
+    Args:
+        path: JSON file the cache is loaded from and saved to (None = memory only)
+        ttl: Seconds an entry stays fresh
+        max_entries: Most entries kept
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.path = pathlib.Path(path) if path else None
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = self._load()  # Oldest first
+        self._inflight = {}
+        self._file_lock = threading.Lock()
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return {}
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except Exception as e:
+            print(f"❌ Error loading web research cache: {e}")
+            return {}
+        self._entries = dict(sorted(entries.items(), key=lambda kv: kv[1]["cached_at"]))
+        self._prune()
+        return self._entries
+
+    def _prune(self):
+        """Drop expired entries, then the oldest ones beyond max_entries."""
+        now = time.time()
+        for key in [k for k, v in self._entries.items() if now - v["cached_at"] > self.ttl]:
+            del self._entries[key]
+        for key in list(self._entries)[:max(0, len(self._entries) - self.max_entries)]:
+            del self._entries[key]
+
+    def _save(self, entries):
+        if not self.path:
+            return
+        with self._file_lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix('.tmp')
+                with open(tmp_path, 'w') as f:
+                    json.dump(entries, f)
+                # Atomic swap so a crash never leaves a half-written cache
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"❌ Error saving web research cache: {e}")
+
+    def get(self, query):
+        """Return the fresh cached result for query, or None."""
+        entry = self._entries.get(normalize_query(query))
+        if entry and time.time() - entry["cached_at"] <= self.ttl:
+            return entry["result"]
+        return None
+
+    async def get_or_fetch(self, query, fetch):
+        """
+        Return the cached result for query, calling fetch(query) on a miss.
+
+        Args:
+            query: Research query text
+            fetch: Async callable performing the real search
+
+        Returns:
+            The (possibly cached) search result
+        """
+        key = normalize_query(query)
+        cached = self.get(query)
+        if cached is not None:
+            record_cache("web_research", hit=True)
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # Someone is already fetching this query; share their result
+            record_cache("web_research", hit=True)
+            return await asyncio.shield(inflight)
+
+        record_cache("web_research", hit=False)
+        future = asyncio.get_running_loop().create_future()
+        # Mark the exception as retrieved when nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await fetch(query)
+            self._entries.pop(key, None)
+            self._entries[key] = {"query": query, "result": result, "cached_at": time.time()}
+            self._prune()
+            # Save a copy: entries may change while the file is written
+            await asyncio.to_thread(self._save, dict(self._entries))
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+
+class CachedAgentTool(AgentTool):
+    """AgentTool whose results are served from a ResearchCache when possible."""
+
+    def __init__(self, agent, cache=None, **kwargs):
+        super().__init__(agent=agent, **kwargs)
+        self.cache = cache or ResearchCache()
+
+    async def run_async(self, *, args, tool_context):
+        query = args.get("request") or json.dumps(args, sort_keys=True)
+
+        async def fetch(_query):
+            return await AgentTool.run_async(self, args=args, tool_context=tool_context)
+
+        return await self.cache.get_or_fetch(query, fetch)
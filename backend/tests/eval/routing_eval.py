@@ -0,0 +1,196 @@
+"""
+Offline comparison of model routing policies.
+
+Runs every case in routing_cases.json through the real root agent (tools on
+mock data) once per policy and reports planning accuracy (right tool, right
+arguments; for a case without a tool, no tool call and an answer from the
+large model), turn latency and model calls per tier. By default the model is
+the stub Gemini server in stub_gemini.py; pass --live to use the real API
+(GOOGLE_API_KEY must be set) for real accuracy numbers.
+
+Usage (from backend/):
+    python -m tests.eval.routing_eval
+    python -m tests.eval.routing_eval --policies single,tiered --time-scale 0.2
+    python -m tests.eval.routing_eval --live --json tests/eval/.results/routing.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import pathlib
+import statistics
+import time
+import uuid
+
+CASES_PATH = pathlib.Path(__file__).parent / "routing_cases.json"
+
+
+def _canonical_args(args):
+    """Arguments with filters compared as an unordered set of canonical keys."""
+    from my_agent.filters import filter_key
+
+    args = dict(args or {})
+    if isinstance(args.get("filters"), list):
+        args["filters"] = sorted(json.dumps(filter_key(f)) for f in args["filters"])
+    return json.dumps(args, sort_keys=True, default=str)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def _model_calls():
+    from prometheus_client import REGISTRY
+
+    calls = {}
+    for metric in REGISTRY.collect():
+        if metric.name != "propalyst_model_calls":
+            continue
+        for sample in metric.samples:
+            if sample.name.endswith("_total"):
+                key = (sample.labels["model"], sample.labels["step"])
+                calls[key] = calls.get(key, 0) + sample.value
+    return calls
+
+
+async def _run_case(runner, case):
+    from google.genai import types
+
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="eval", session_id=str(uuid.uuid4())
+    )
+    message = types.Content(role="user", parts=[types.Part(text=case["question"])])
+    first_call = None
+    answer_model = None
+    error = None
+    start = time.perf_counter()
+    try:
+        async for event in runner.run_async(
+            user_id="eval", session_id=session.id, new_message=message
+        ):
+            calls = event.get_function_calls()
+            if calls and first_call is None:
+                first_call = calls[0]
+            if event.content and any(p.text for p in event.content.parts or []):
+                answer_model = event.model_version
+    except Exception as e:
+        # A failing tool still lets us score the model's planning step
+        error = f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - start
+
+    if case["tool"] is None:
+        # Answered without tools, so the reply must come from the large model
+        from my_agent.routing import LARGE_MODEL
+
+        correct = first_call is None and answer_model == LARGE_MODEL
+    else:
+        correct = (
+            first_call is not None
+            and first_call.name == case["tool"]
+            and _canonical_args(first_call.args) == _canonical_args(case["args"])
+        )
+    return {
+        "question": case["question"],
+        "correct": correct,
+        "seconds": elapsed,
+        "error": error,
+    }
+
+
+async def evaluate(policy, cases):
+    """Run all cases under one routing policy and summarize the results."""
+    from google.adk.runners import InMemoryRunner
+
+    from my_agent import routing
+    from my_agent.agent import root_agent
+
+    routing.set_policy(policy)
+    runner = InMemoryRunner(agent=root_agent, app_name="my_agent")
+    calls_before = _model_calls()
+
+    results = [await _run_case(runner, case) for case in cases]
+
+    calls_after = _model_calls()
+    model_calls = {}
+    for (model, step), count in calls_after.items():
+        delta = count - calls_before.get((model, step), 0)
+        if delta:
+            model_calls[f"{model}:{step}"] = int(delta)
+
+    latencies = [r["seconds"] for r in results]
+    return {
+        "policy": policy,
+        "cases": len(results),
+        "accuracy": sum(r["correct"] for r in results) / len(results),
+        "latency_mean": statistics.mean(latencies),
+        "latency_p50": _percentile(latencies, 50),
+        "latency_p95": _percentile(latencies, 95),
+        "model_calls": model_calls,
+        "failures": [r["question"] for r in results if not r["correct"]],
+        "errors": {r["question"]: r["error"] for r in results if r["error"]},
+    }
+
+
+def _print_report(reports):
+    print(
+        f"\n{'policy':<10}{'accuracy':>10}{'mean s':>9}{'p50 s':>9}{'p95 s':>9}  model calls"
+    )
+    for r in reports:
+        calls = ", ".join(f"{k}={v}" for k, v in sorted(r["model_calls"].items()))
+        print(
+            f"{r['policy']:<10}{r['accuracy']:>10.0%}{r['latency_mean']:>9.2f}"
+            f"{r['latency_p50']:>9.2f}{r['latency_p95']:>9.2f}  {calls}"
+        )
+    for r in reports:
+        for question in r["failures"]:
+            print(f"  ✗ [{r['policy']}] {question}")
+        for question, error in r["errors"].items():
+            print(f"  ! [{r['policy']}] {question}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model routing policies")
+    parser.add_argument("--policies", default="single,tiered")
+    parser.add_argument("--cases", default=str(CASES_PATH))
+    parser.add_argument("--live", action="store_true", help="Use the real Gemini API")
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier on the stub's simulated latencies",
+    )
+    parser.add_argument("--json", help="Also write the report to this file")
+    cli = parser.parse_args()
+
+    cases = json.loads(pathlib.Path(cli.cases).read_text())
+    # The agent must use mock data, and the model client must see the stub
+    # URL before it is first created
+    os.environ["USE_SUPABASE"] = "false"
+
+    with contextlib.ExitStack() as stack:
+        if not cli.live:
+            from tests.eval.stub_gemini import StubGemini, StubGeminiServer
+
+            server = stack.enter_context(
+                StubGeminiServer(StubGemini(cases, time_scale=cli.time_scale))
+            )
+            os.environ["GOOGLE_GEMINI_BASE_URL"] = server.url
+            os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "false"
+            os.environ.setdefault("GOOGLE_API_KEY", "stub")
+
+        reports = [
+            asyncio.run(evaluate(p.strip(), cases)) for p in cli.policies.split(",")
+        ]
+
+    _print_report(reports)
+    if cli.json:
+        path = pathlib.Path(cli.json)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Stub Gemini API server for offline evaluation and load tests.
+
+Speaks the subset of the Gemini REST API the agent uses (generateContent and
+streamGenerateContent with alt=sse). Point google-genai at it with
+GOOGLE_GEMINI_BASE_URL. Answers are scripted:
+
+- A request whose last message is user text is a planning step. If the text
+  matches a known case with a tool, the stub replies with that case's tool
+  call; otherwise it replies with a short text answer.
+- A request whose last message carries tool results is a synthesis step and
+  gets a short text answer.
+
+Each model has a profile with a simulated latency and error rate. On an
+error, a planning reply drops its last filter, the typical mistake of a
+weaker model. Errors are seeded from (model, question), so runs repeat
+exactly.
+"""
+
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+import zlib
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Assumed relative behaviour of the two tiers; override per run as needed
+DEFAULT_PROFILES = {
+    "gemini-2.5-flash-lite": {
+        "planning_latency": 0.15,
+        "synthesis_latency": 0.35,
+        "error_rate": 0.15,
+    },
+    "gemini-2.5-flash": {
+        "planning_latency": 0.45,
+        "synthesis_latency": 0.9,
+        "error_rate": 0.03,
+    },
+}
+FALLBACK_PROFILE = {
+    "planning_latency": 0.3,
+    "synthesis_latency": 0.6,
+    "error_rate": 0.0,
+}
+
+
+def _text_of(content):
+    return " ".join(p["text"] for p in content.get("parts", []) if "text" in p).strip()
+
+
+def _is_error(model, question, rate):
+    return zlib.crc32(f"{model}|{question}".encode()) % 1000 < rate * 1000
+
+
+def _degrade(args):
+    filters = args.get("filters")
+    if filters:
+        return {**args, "filters": filters[:-1]}
+    return args
+
+
+class StubGemini:
+    """
+    Scripted model backend.
+
+    Args:
+        cases: Dicts with question, tool and args (see routing_cases.json)
+        profiles: Model name -> planning_latency, synthesis_latency, error_rate
+                  and optionally jitter (random +/- fraction of each latency)
+        time_scale: Multiplier on simulated latencies (0 for no delay)
+        seed: Seed of the latency jitter
+    """
+
+    def __init__(self, cases=(), profiles=None, time_scale=1.0, seed=0):
+        self.cases = {c["question"].lower(): c for c in cases}
+        self.profiles = profiles or DEFAULT_PROFILES
+        self.time_scale = time_scale
+        self.calls = []
+        self._rng = random.Random(seed)
+
+    async def respond(self, model, body):
+        contents = body.get("contents", [])
+        last = contents[-1] if contents else {}
+        is_synthesis = any("functionResponse" in p for p in last.get("parts", []))
+        profile = self.profiles.get(model, FALLBACK_PROFILE)
+
+        step = "synthesis" if is_synthesis else "planning"
+        latency = profile[f"{step}_latency"]
+        if profile.get("jitter"):
+            latency *= 1 + self._rng.uniform(-profile["jitter"], profile["jitter"])
+        await asyncio.sleep(latency * self.time_scale)
+        self.calls.append({"model": model, "step": step, "time": time.time()})
+
+        if is_synthesis:
+            return {"text": "Here is what I found in the current listings."}
+
+        question = _text_of(last)
+        case = self.cases.get(question.lower())
+        if not case or case["tool"] is None:
+            return {"text": "I can help you search Bangalore property listings."}
+        args = case["args"]
+        if _is_error(model, question, profile["error_rate"]):
+            args = _degrade(args)
+        return {"functionCall": {"name": case["tool"], "args": args}}
+
+
+def _payload(part, model):
+    return {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [part]},
+                "finishReason": "STOP",
+                "index": 0,
+            }
+        ],
+        "usageMetadata": {
+            "promptTokenCount": 0,
+            "candidatesTokenCount": 0,
+            "totalTokenCount": 0,
+        },
+        "modelVersion": model,
+    }
+
+
+def create_app(stub):
+    """FastAPI app serving the Gemini endpoints backed by stub."""
+    app = FastAPI(title="Stub Gemini")
+
+    @app.post("/{version}/models/{target}")
+    async def generate(version: str, target: str, request: Request):
+        model, _, method = target.partition(":")
+        part = await stub.respond(model, await request.json())
+        if method == "streamGenerateContent":
+
+            async def stream():
+                yield f"data: {json.dumps(_payload(part, model))}\n\n"
+
+            return StreamingResponse(stream(), media_type="text/event-stream")
+        return JSONResponse(_payload(part, model))
+
+    return app
+
+
+class StubGeminiServer:
+    """
+    Run a StubGemini on a free local port in a background thread.
+
+    Usage:
+        with StubGeminiServer(StubGemini(cases)) as server:
+            os.environ["GOOGLE_GEMINI_BASE_URL"] = server.url
+    """
+
+    def __init__(self, stub, host="127.0.0.1", port=0):
+        self.stub = stub
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self.url = f"http://{host}:{self._sock.getsockname()[1]}"
+        config = uvicorn.Config(create_app(stub), log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [self._sock]}, daemon=True
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+        self._sock.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import pathlib
+
+    parser = argparse.ArgumentParser(description="Serve a stub Gemini API")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument(
+        "--cases",
+        default=str(pathlib.Path(__file__).parent / "routing_cases.json"),
+    )
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    cli = parser.parse_args()
+
+    cases = json.loads(pathlib.Path(cli.cases).read_text())
+    uvicorn.run(create_app(StubGemini(cases, time_scale=cli.time_scale)), port=cli.port)
@@ -0,0 +1,37 @@
+"""
+Integration test for the local SSE chat endpoint.
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+def _parse_frames(body: str) -> list[tuple[str, dict]]:
+    frames = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        frames.append((lines["event"], json.loads(lines["data"])))
+    return frames
+
+
+def test_chat_stream_reuses_session() -> None:
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/chat/stream", json={"message": "Hi!", "user_id": "test_user"}
+    )
+    assert response.status_code == 200
+    session_id = response.headers["x-session-id"]
+
+    frames = _parse_frames(response.text)
+    assert frames[-1] == ("done", {"session_id": session_id})
+    assert any(event in ("token", "message") for event, _ in frames)
+
+    follow_up = client.post(
+        "/api/chat/stream",
+        json={"message": "Thanks", "user_id": "test_user", "session_id": session_id},
+    )
+    assert follow_up.headers["x-session-id"] == session_id
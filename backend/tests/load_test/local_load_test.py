@@ -0,0 +1,294 @@
+"""
+Locust scenarios for the offline load test (see local_server.py).
+
+Each simulated broker asks questions from the seeded pool in scenarios.py
+in the MIX proportions, keeps a chat session for a few turns and reads every
+reply to the end of its SSE stream. Requests are reported as:
+
+- "turn:<kind>": full turn latency, request to final frame
+- "first_frame": time to the first token or message frame
+- "/api/chat/stream": time to response headers
+
+At the end of the run the server's /metrics are compared with a snapshot
+taken at the start, and a report of turn latency percentiles, tool call
+throughput and model calls is printed and written to LOAD_REPORT_PATH.
+
+Usage (from backend/, with the server running):
+    locust -f tests/load_test/local_load_test.py --host http://127.0.0.1:8000 \\
+        --headless -t 60s -u 20 -r 5 --csv tests/load_test/.results/local
+"""
+
+import json
+import os
+import pathlib
+import random
+import re
+import sys
+import time
+import urllib.request
+import uuid
+from collections import defaultdict
+
+from locust import HttpUser, between, events, task
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[2]))
+from tests.load_test.scenarios import MIX, build_cases
+
+LOAD_SEED = int(os.getenv("LOAD_SEED", "0"))
+LOAD_REPORT_PATH = pathlib.Path(
+    os.getenv(
+        "LOAD_REPORT_PATH",
+        pathlib.Path(__file__).parent / ".results" / "local_report.json",
+    )
+)
+# Turns a user keeps one chat session for
+SESSION_TURNS = (3, 8)
+
+CASES = defaultdict(list)
+for _case in build_cases(LOAD_SEED):
+    CASES[_case["kind"]].append(_case)
+BY_QUESTION = {c["question"]: c for cases in CASES.values() for c in cases}
+
+METRIC_PATTERN = re.compile(
+    r"^(?P<name>[a-zA-Z_:][\w:]*)(?:\{(?P<labels>[^}]*)\})? (?P<value>\S+)$"
+)
+LABEL_PATTERN = re.compile(r'(\w+)="([^"]*)"')
+
+
+class BrokerUser(HttpUser):
+    """A broker chatting with the assistant."""
+
+    wait_time = between(1, 3)
+
+    def on_start(self):
+        self.rng = random.Random()
+        self._new_session()
+
+    def _new_session(self):
+        self.user_id = f"load-{uuid.uuid4().hex[:8]}"
+        self.session_id = None
+        self.last_question = None
+        self.turns_left = self.rng.randint(*SESSION_TURNS)
+
+    def _turn(self, case):
+        """Send one chat message and read the SSE stream to the end."""
+        if self.turns_left <= 0:
+            self._new_session()
+        self.turns_left -= 1
+
+        payload = {
+            "message": case["question"],
+            "user_id": self.user_id,
+            "session_id": self.session_id,
+        }
+        start = time.perf_counter()
+        first_frame = None
+        failure = None
+        tool_calls = 0
+        with self.client.post(
+            "/api/chat/stream",
+            json=payload,
+            stream=True,
+            catch_response=True,
+            name="/api/chat/stream",
+        ) as response:
+            if response.status_code == 429:
+                response.failure("rate limited (429)")
+                return
+            if response.status_code != 200:
+                response.failure(f"HTTP {response.status_code}")
+                return
+            self.session_id = response.headers.get("X-Session-Id", self.session_id)
+            event = None
+            for line in response.iter_lines():
+                line = line.decode("utf-8") if isinstance(line, bytes) else line
+                if line.startswith("event: "):
+                    event = line[7:]
+                    if event in ("token", "message") and first_frame is None:
+                        first_frame = time.perf_counter() - start
+                    elif event == "tool_call":
+                        tool_calls += 1
+                    elif event == "error":
+                        failure = "agent error"
+            if failure:
+                response.failure(failure)
+            else:
+                response.success()
+
+        elapsed = time.perf_counter() - start
+        self.last_question = case["question"]
+        fire = self.environment.events.request.fire
+        fire(
+            request_type="TURN",
+            name=f"turn:{case['kind']}",
+            response_time=elapsed * 1000,
+            response_length=tool_calls,
+            exception=failure and RuntimeError(failure),
+            context={},
+        )
+        if first_frame is not None:
+            fire(
+                request_type="TURN",
+                name="first_frame",
+                response_time=first_frame * 1000,
+                response_length=0,
+                exception=None,
+                context={},
+            )
+
+    def _ask(self, kind):
+        case = self.rng.choice(CASES[kind])
+        if kind == "follow_up" and self.last_question != case["after"]:
+            # Narrowing only makes sense right after its search
+            self._turn(BY_QUESTION[case["after"]])
+        self._turn(case)
+
+    @task(MIX["search"])
+    def search(self):
+        self._ask("search")
+
+    @task(MIX["follow_up"])
+    def follow_up(self):
+        self._ask("follow_up")
+
+    @task(MIX["analytics"])
+    def analytics(self):
+        self._ask("analytics")
+
+    @task(MIX["locality_stats"])
+    def locality_stats(self):
+        self._ask("locality_stats")
+
+    @task(MIX["nearby"])
+    def nearby(self):
+        self._ask("nearby")
+
+    @task(MIX["fast_path"])
+    def fast_path(self):
+        self._ask("fast_path")
+
+
+def _scrape(host):
+    """Samples of the server's Prometheus metrics as {(name, labels): value}."""
+    with urllib.request.urlopen(f"{host.rstrip('/')}/metrics", timeout=10) as response:
+        text = response.read().decode()
+    samples = {}
+    for line in text.splitlines():
+        match = METRIC_PATTERN.match(line)
+        if match and not line.startswith("#"):
+            labels = tuple(sorted(LABEL_PATTERN.findall(match["labels"] or "")))
+            samples[(match["name"], labels)] = float(match["value"])
+    return samples
+
+
+def _delta(before, after, name, key):
+    """Increase of one metric over the run, keyed by key(labels)."""
+    return {
+        key(dict(labels)): value - before.get((metric, labels), 0.0)
+        for (metric, labels), value in after.items()
+        if metric == name
+    }
+
+
+def _histogram_quantile(before, after, name, tool, q):
+    """Upper bound of the bucket holding quantile q of a tool's latency."""
+    buckets = []
+    for (metric, labels), value in after.items():
+        labels_dict = dict(labels)
+        if metric == f"{name}_bucket" and labels_dict.get("tool") == tool:
+            le = (
+                float("inf")
+                if labels_dict["le"] == "+Inf"
+                else float(labels_dict["le"])
+            )
+            buckets.append((le, value - before.get((metric, labels), 0.0)))
+    buckets.sort()
+    if not buckets or buckets[-1][1] <= 0:
+        return None
+    for le, count in buckets:
+        if count >= q * buckets[-1][1]:
+            return le
+    return None
+
+
+_run = {}
+
+
+@events.test_start.add_listener
+def _on_start(environment, **kwargs):
+    _run["started"] = time.time()
+    try:
+        _run["metrics"] = _scrape(environment.host)
+    except OSError as e:
+        print(f"⚠️  Could not read {environment.host}/metrics: {e}")
+        _run["metrics"] = None
+
+
+def _percentiles(entry):
+    return {
+        f"p{p}": round(entry.get_response_time_percentile(p / 100) / 1000, 3)
+        for p in (50, 95, 99)
+    }
+
+
+@events.test_stop.add_listener
+def _on_stop(environment, **kwargs):
+    seconds = time.time() - _run.get("started", time.time())
+    stats = environment.stats
+    turns = {
+        name: {
+            "count": entry.num_requests,
+            "failures": entry.num_failures,
+            **_percentiles(entry),
+        }
+        for (name, method), entry in stats.entries.items()
+        if method == "TURN" and entry.num_requests
+    }
+    report = {"seconds": round(seconds, 1), "turns": turns}
+
+    before = _run.get("metrics")
+    if before is not None:
+        after = _scrape(environment.host)
+        calls = _delta(
+            before,
+            after,
+            "propalyst_tool_latency_seconds_count",
+            lambda labels: labels["tool"],
+        )
+        report["tools"] = {
+            tool: {
+                "calls": int(count),
+                "calls_per_sec": round(count / seconds, 2) if seconds else 0.0,
+                "p95_bucket_s": _histogram_quantile(
+                    before, after, "propalyst_tool_latency_seconds", tool, 0.95
+                ),
+            }
+            for tool, count in sorted(calls.items())
+            if count
+        }
+        report["model_calls"] = {
+            key: int(count)
+            for key, count in _delta(
+                before,
+                after,
+                "propalyst_model_calls_total",
+                lambda labels: f"{labels['model']}:{labels['step']}",
+            ).items()
+            if count
+        }
+
+    print(f"\n{'turn':<22}{'count':>7}{'fail':>6}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}")
+    for name, row in sorted(turns.items()):
+        print(
+            f"{name:<22}{row['count']:>7}{row['failures']:>6}{row['p50']:>8}{row['p95']:>8}{row['p99']:>8}"
+        )
+    if report.get("tools"):
+        print(f"\n{'tool':<26}{'calls':>7}{'per s':>8}{'p95 s':>8}")
+        for tool, row in report["tools"].items():
+            print(
+                f"{tool:<26}{row['calls']:>7}{row['calls_per_sec']:>8}{row['p95_bucket_s']!s:>8}"
+            )
+
+    LOAD_REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    LOAD_REPORT_PATH.write_text(json.dumps(report, indent=2))
+    print(f"\n📄 Report written to {LOAD_REPORT_PATH}")
@@ -0,0 +1,94 @@
+"""
+Self-contained server for offline load tests.
+
+Starts the stub Gemini server (tests/eval/stub_gemini.py) scripted with the
+load-test question pool, then serves the real API (main.py, root_agent on
+mock data) pointed at it. No API key, network or deployment is needed. Model
+latency is simulated by the stub and can be tuned per run.
+
+Usage (from backend/):
+    python -m tests.load_test.local_server --port 8000
+    python -m tests.load_test.local_server --planning-latency 0.8 --synthesis-latency 1.5 --jitter 0.3
+"""
+
+import argparse
+import os
+
+import uvicorn
+
+from tests.eval.stub_gemini import DEFAULT_PROFILES, StubGemini, StubGeminiServer
+from tests.load_test.scenarios import build_cases
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve the agent API against a stub Gemini"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=int(os.getenv("LOAD_SEED", "0")),
+        help="Question pool and latency jitter seed; must match the Locust run",
+    )
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier on all simulated model latencies",
+    )
+    parser.add_argument(
+        "--planning-latency",
+        type=float,
+        help="Seconds per planning call, for every model (default: per-model profiles)",
+    )
+    parser.add_argument(
+        "--synthesis-latency",
+        type=float,
+        help="Seconds per synthesis call, for every model",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Random +/- fraction applied to each simulated latency",
+    )
+    parser.add_argument(
+        "--no-answer-cache",
+        action="store_true",
+        help="Send repeated questions to the agent instead of the answer cache",
+    )
+    cli = parser.parse_args()
+
+    profiles = {}
+    for model, profile in DEFAULT_PROFILES.items():
+        profile = dict(profile, jitter=cli.jitter)
+        if cli.planning_latency is not None:
+            profile["planning_latency"] = cli.planning_latency
+        if cli.synthesis_latency is not None:
+            profile["synthesis_latency"] = cli.synthesis_latency
+        profiles[model] = profile
+
+    # The agent must use mock data, and the model client must see the stub
+    # URL before main is imported
+    os.environ["USE_SUPABASE"] = "false"
+    os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "false"
+    os.environ.setdefault("GOOGLE_API_KEY", "stub")
+    if cli.no_answer_cache:
+        os.environ["ANSWER_CACHE_TTL_SECONDS"] = "0"
+
+    cases = [c for c in build_cases(cli.seed) if c["tool"]]
+    stub = StubGemini(
+        cases, profiles=profiles, time_scale=cli.time_scale, seed=cli.seed
+    )
+    with StubGeminiServer(stub) as server:
+        os.environ["GOOGLE_GEMINI_BASE_URL"] = server.url
+        import main as api
+
+        print(f"🧪 Stub Gemini at {server.url} with {len(cases)} scripted questions")
+        uvicorn.run(api.app, host=cli.host, port=cli.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Broker query mix for the offline load test.
+
+build_cases() generates a seeded pool of broker questions, each with the
+tool call a correct planning step makes for it. The stub Gemini server
+scripts its replies from the pool and the Locust users ask questions from
+it, so both sides must build it with the same seed.
+
+Kinds of question and their share of turns (MIX):
+- search: filtered listing search ("3BHK apartments for sale in Hebbal")
+- follow_up: narrows the previous search in the same session
+- analytics: price / BHK / locality summaries
+- locality_stats: investment questions about one locality
+- nearby: radius search around a landmark
+- fast_path: formulaic counts answered without the model
+"""
+
+import random
+
+MIX = {
+    "search": 45,
+    "follow_up": 15,
+    "analytics": 12,
+    "locality_stats": 8,
+    "nearby": 8,
+    "fast_path": 12,
+}
+
+# Most asked first; demand follows the listing volume
+LOCALITIES = [
+    "Whitefield",
+    "Sarjapur Road",
+    "Hebbal",
+    "HSR Layout",
+    "Koramangala",
+    "Indiranagar",
+    "Electronic City",
+    "Yelahanka",
+    "Marathahalli",
+    "Thanisandra",
+    "JP Nagar",
+    "Devanahalli",
+]
+LANDMARKS = ["Manyata Tech Park", "ITPL", "Ecospace", "Airport", "Embassy Tech Village"]
+PROPERTY_TYPES = {
+    "apartments": "apartment",
+    "villas": "villa",
+    "plots": "plot",
+    "independent houses": "independent_house",
+    "offices": "office",
+}
+PURPOSES = {"for sale": "supply_sale", "for rent": "supply_rent"}
+ANALYTICS_TOOLS = {
+    "price distribution": "get_price_distribution",
+    "BHK mix": "get_bhk_distribution",
+    "summary stats": "get_summary_stats",
+}
+
+
+def _locality(rng):
+    # Zipf-like popularity
+    weights = [1 / (rank + 1) for rank in range(len(LOCALITIES))]
+    return rng.choices(LOCALITIES, weights)[0]
+
+
+def _search(rng):
+    locality = _locality(rng)
+    type_word, property_type = rng.choice(list(PROPERTY_TYPES.items()))
+    purpose, message_type = rng.choice(list(PURPOSES.items()))
+    filters = []
+    bhk = None
+    if (
+        property_type in ("apartment", "villa", "independent_house")
+        and rng.random() < 0.7
+    ):
+        bhk = rng.choice([1, 2, 3, 3, 4])
+        filters.append({"field": "bhk", "op": "eq", "value": bhk})
+    filters += [
+        {"field": "property_type", "op": "eq", "value": property_type},
+        {"field": "message_type", "op": "eq", "value": message_type},
+        {"field": "locality", "op": "eq", "value": locality},
+    ]
+    question = f"{f'{bhk}BHK ' if bhk else ''}{type_word} {purpose} in {locality}"
+    return {
+        "kind": "search",
+        "question": question,
+        "tool": "search_listings",
+        "args": {"filters": filters},
+    }
+
+
+def _follow_up(rng, base):
+    budget = rng.choice([1, 1.5, 2, 3, 5])
+    filters = base["args"]["filters"] + [
+        {"field": "price_cr", "op": "lte", "value": budget}
+    ]
+    locality = base["args"]["filters"][-1]["value"]
+    return {
+        "kind": "follow_up",
+        "question": f"Of those in {locality}, only the ones under {budget} crore",
+        "tool": "search_listings",
+        "args": {"filters": filters},
+        "after": base["question"],
+    }
+
+
+def _analytics(rng):
+    locality = _locality(rng)
+    name, tool = rng.choice(list(ANALYTICS_TOOLS.items()))
+    filters = [{"field": "locality", "op": "eq", "value": locality}]
+    return {
+        "kind": "analytics",
+        "question": f"Give me the {name} for {locality}",
+        "tool": tool,
+        "args": {"filters": filters},
+    }
+
+
+def _locality_stats(rng):
+    locality = _locality(rng)
+    return {
+        "kind": "locality_stats",
+        "question": f"Is {locality} good for investment?",
+        "tool": "get_locality_stats",
+        "args": {"locality": locality},
+    }
+
+
+def _nearby(rng):
+    landmark = rng.choice(LANDMARKS)
+    km = rng.choice([2, 3, 5])
+    filters = [
+        {"field": "near_landmark", "op": "within_km", "value": landmark, "km": km}
+    ]
+    return {
+        "kind": "nearby",
+        "question": f"Listings within {km} km of {landmark}",
+        "tool": "search_listings",
+        "args": {"filters": filters},
+    }
+
+
+def _fast_path(rng):
+    type_word = rng.choice(["villas", "apartments", "plots", "listings"])
+    return {
+        "kind": "fast_path",
+        "question": f"How many {type_word} in {_locality(rng)}?",
+        "tool": None,
+        "args": None,
+    }
+
+
+def build_cases(seed=0, per_kind=100):
+    """
+    Question pool: dicts with kind, question, tool and args (tool is None
+    for fast-path questions; follow-ups name the question they follow).
+    """
+    rng = random.Random(seed)
+    cases = {}
+    for make in (_search, _analytics, _locality_stats, _nearby, _fast_path):
+        for _ in range(per_kind):
+            case = make(rng)
+            cases.setdefault(case["question"], case)
+    searches = [c for c in cases.values() if c["kind"] == "search"]
+    for _ in range(per_kind):
+        case = _follow_up(rng, rng.choice(searches))
+        cases.setdefault(case["question"], case)
+    return list(cases.values())
@@ -0,0 +1,65 @@
+"""
+Fixtures for the benchmark suite.
+
+Each corpus size is generated once with the seeded generator, prepared the
+way the mock loader prepares listings (parsed and price-normalized; dedup is
+skipped, it would dominate setup at 1M rows) and cached as an Arrow snapshot
+under .cache/bench, so later runs only read it back.
+"""
+
+import os
+import pathlib
+
+import pytest
+
+from my_agent import tools
+from my_agent.database import parse_listing_data
+from my_agent.prices import normalize_rows
+from my_agent.snapshot import ListingSnapshot, write_snapshot
+from tests.perf.synthetic_listings import generate
+
+BENCH_SIZES = [
+    int(n) for n in os.getenv("BENCH_SIZES", "1000,100000,1000000").split(",")
+]
+BENCH_SEED = int(os.getenv("BENCH_SEED", "0"))
+CACHE_DIR = pathlib.Path(__file__).parents[2] / ".cache" / "bench"
+
+
+def _label(size):
+    return f"{size // 1_000_000}m" if size >= 1_000_000 else f"{size // 1000}k"
+
+
+def corpus_path(size, seed=BENCH_SEED):
+    """Snapshot of the prepared benchmark corpus, built on first use."""
+    path = CACHE_DIR / f"listings_{_label(size)}_seed{seed}.arrow"
+    if not path.exists():
+        listings = [parse_listing_data(listing) for listing in generate(size, seed)]
+        normalize_rows(listings)
+        write_snapshot(listings, path)
+    return path
+
+
+@pytest.fixture(scope="session", params=BENCH_SIZES, ids=_label)
+def snapshot(request):
+    """The prepared corpus as a ListingSnapshot, one size per parameter."""
+    return ListingSnapshot.open(corpus_path(request.param))
+
+
+@pytest.fixture(scope="session")
+def listings(snapshot):
+    """Prepared listing dicts, decoded from the snapshot into a plain list."""
+    return list(snapshot)
+
+
+@pytest.fixture
+def mock_listings(listings, monkeypatch):
+    """The corpus installed as the mock data source."""
+    monkeypatch.setattr(tools, "MOCK_LISTINGS", listings)
+    return listings
+
+
+@pytest.fixture
+def mock_snapshot(snapshot, monkeypatch):
+    """The ListingSnapshot itself installed as the mock data source, as at startup."""
+    monkeypatch.setattr(tools, "MOCK_LISTINGS", snapshot)
+    return snapshot
@@ -0,0 +1,443 @@
+"""
+Seeded synthetic listing corpus for benchmarks.
+
+Streams any number of listing rows shaped like the WhatsApp data: Zipf-skewed
+locality and broker popularity, log-normal areas per property type, prices
+from per-locality rates, broker-style price text ("₹ 1.28 Cr", "85k plus
+maintenance", "Rs.3.5 cr per acre"), realistic null rates and reposts of
+recent listings by other brokers. The same seed always produces the same
+rows, and rows are generated and written in chunks, so memory stays flat
+however large the corpus.
+
+Usage (from backend/):
+    python -m tests.perf.synthetic_listings --rows 1000000 --out .cache/listings_1m.jsonl
+    python -m tests.perf.synthetic_listings --rows 100000 --seed 7 --out .cache/listings.parquet
+"""
+
+import argparse
+import bisect
+import datetime
+import itertools
+import json
+import math
+import pathlib
+import random
+import uuid
+from collections import deque
+
+# (locality, price per sqft in rupees), most popular first
+LOCALITIES = [
+    ("Whitefield", 8_500),
+    ("Sarjapur Road", 7_800),
+    ("Hebbal", 9_500),
+    ("HSR Layout", 11_000),
+    ("Koramangala", 14_000),
+    ("Indiranagar", 16_000),
+    ("Electronic City", 5_800),
+    ("Yelahanka", 7_000),
+    ("Marathahalli", 8_800),
+    ("Thanisandra", 7_500),
+    ("Hennur Main Road", 8_000),
+    ("Devanahalli", 5_000),
+    ("BTM Layout", 9_000),
+    ("JP Nagar", 10_500),
+    ("Bannerghatta Road", 8_200),
+    ("Varthur", 6_800),
+    ("Nagawara", 7_900),
+    ("Jayanagar", 15_000),
+    ("Bommanahalli", 7_200),
+    ("Kogilu", 6_500),
+    ("Mysore Road", 5_500),
+    ("Commercial Street", 30_000),
+]
+LOCALITY_ZIPF_EXPONENT = 1.1
+
+# (property type, weight, median sqft, log-normal sigma, rate multiplier)
+PROPERTY_TYPES = [
+    ("apartment", 55, 1_500, 0.35, 1.0),
+    ("plot", 12, 1_800, 0.6, 0.6),
+    ("villa", 8, 3_200, 0.3, 1.2),
+    ("independent_house", 8, 2_400, 0.35, 1.1),
+    ("commercial", 7, 3_000, 0.8, 1.4),
+    ("office", 6, 2_500, 0.8, 1.2),
+    ("land", 4, 87_120, 0.9, 0.08),
+]
+MESSAGE_TYPES = [
+    ("supply_sale", 45),
+    ("supply_rent", 30),
+    ("demand_buy", 15),
+    ("demand_rent", 10),
+]
+RENTAL_YIELD = 0.03
+
+# Share of rows missing each field
+NULL_RATES = {
+    "agent_name": 0.35,
+    "company_name": 0.8,
+    "area_sqft": 0.12,
+    "price": 0.08,
+    "project_name": 0.5,
+    "furnishing_status": 0.5,
+    "facing_direction": 0.6,
+    "parking_count": 0.4,
+}
+DUPLICATE_RATE = 0.08
+# Reposts copy one of this many most recent listings
+REPOST_WINDOW = 2_000
+
+FIRST_NAMES = [
+    "Ravi",
+    "Suresh",
+    "Pallavi",
+    "Santosh",
+    "Chandresh",
+    "Rahul",
+    "Anita",
+    "Imran",
+    "Deepa",
+    "Kiran",
+    "Manjunath",
+    "Shamran",
+    "Tashi",
+    "Vinod",
+]
+FIRM_WORDS = [
+    "Properties",
+    "Estates",
+    "Realty",
+    "Homes",
+    "Associates",
+    "Shelters",
+    "Spaces",
+]
+PROJECTS = [
+    "Prestige Lakeside Habitat",
+    "Brigade Cosmopolis",
+    "Sobha City",
+    "Godrej Woodsman Estate",
+    "Purva Venezia",
+    "Embassy Lake Terraces",
+    "SJR Primecorp Vogue",
+    "Mantri Espana",
+]
+FEATURES = [
+    "corner_plot",
+    "gated_community",
+    "swimming_pool",
+    "gym",
+    "club_house",
+    "garden_facing",
+    "main_road_facing",
+    "ready_to_move",
+    "negotiable",
+    "east_facing",
+]
+FURNISHING = ["unfurnished", "semi_furnished", "fully_furnished"]
+FACING = ["east", "west", "north", "south", "north_east", "south_west"]
+
+SUPPLY_TEMPLATES = [
+    "{bhk}{ptype} for {deal} in {project}{location}\n{area}\n{price}\n{features}",
+    "*{deal_title}* - {location}\n{bhk}{ptype}{project_suffix}\nArea: {area}\n{price}",
+    "📍{bhk}{ptype} in {location} - {area} - {price}{features_suffix}",
+]
+DEMAND_TEMPLATES = [
+    "Requirement: {bhk}{ptype} in {location} for {deal}\nBudget {price}",
+    "Looking for {bhk}{ptype} on {deal} near {location}, {area}, budget upto {price}",
+]
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _zipf_cum_weights(n, exponent):
+    return list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(n)))
+
+
+def _pick(rng, items, cum_weights):
+    return items[bisect.bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+
+def _crore_text(rng, rupees):
+    if rupees >= 10_000_000:
+        value = rupees / 10_000_000
+        return rng.choice(
+            [
+                f"₹ {value:.2f} Cr",
+                f"{value:.2f} Cr negotiable",
+                f"Rs {value:.1f} Cr",
+                f"{value:.2f} crs nego",
+            ]
+        )
+    value = rupees / 100_000
+    return rng.choice(
+        [f"Rs {value:.0f} L", f"{value:.2f} Lakhs", f"₹ {value:.1f} Lakh"]
+    )
+
+
+def _rent_text(rng, rupees):
+    if rupees >= 100_000:
+        return rng.choice(
+            [f"Rent {rupees / 100_000:.2f} Lakhs", f"Rs {rupees / 100_000:.1f} Lakh pm"]
+        )
+    return rng.choice(
+        [
+            f"{rupees // 1000}k plus maintenance",
+            f"Rs {rupees:,} per month",
+            f"Rent {rupees // 1000}k",
+        ]
+    )
+
+
+class _Brokers:
+    """A fixed, seeded pool of brokers with Zipf-skewed activity."""
+
+    def __init__(self, rng, count):
+        self.pool = []
+        for _ in range(count):
+            first = rng.choice(FIRST_NAMES)
+            name = rng.choice(
+                [
+                    f"{first} {rng.choice(FIRM_WORDS)}",
+                    f"{first} {chr(65 + rng.randrange(26))}",
+                ]
+            )
+            phones = [
+                f"{rng.randint(6, 9)}{rng.randrange(10**9):09d}"
+                for _ in range(rng.choice([1, 1, 2]))
+            ]
+            contact = rng.choice(
+                ["/ ".join(phones), " ".join(f"+91 {p[:5]} {p[5:]}" for p in phones)]
+            )
+            company = f"{first} {rng.choice(FIRM_WORDS)}"
+            self.pool.append((name, contact, company))
+        self.cum_weights = _zipf_cum_weights(count, 0.9)
+
+    def pick(self, rng):
+        return _pick(rng, self.pool, self.cum_weights)
+
+
+def generate(
+    rows, seed=0, end_date="2025-12-31", days=180, duplicate_rate=DUPLICATE_RATE
+):
+    """
+    Yield synthetic listing dicts, deterministically for a given seed.
+
+    Args:
+        rows: Number of rows
+        seed: Random seed
+        end_date: Date of the newest message (ISO date)
+        days: Days covered, oldest first
+        duplicate_rate: Share of rows that repost a recent listing
+    """
+    rng = random.Random(seed)
+    brokers = _Brokers(rng, max(20, min(rows // 200, 10_000)))
+    locality_weights = _zipf_cum_weights(len(LOCALITIES), LOCALITY_ZIPF_EXPONENT)
+    type_weights = list(itertools.accumulate(t[1] for t in PROPERTY_TYPES))
+    message_weights = list(itertools.accumulate(m[1] for m in MESSAGE_TYPES))
+    end = datetime.datetime.fromisoformat(end_date).replace(
+        tzinfo=datetime.timezone.utc
+    )
+    start = end - datetime.timedelta(days=days)
+    span = (end - start).total_seconds()
+    recent = deque(maxlen=REPOST_WINDOW)
+
+    for idx in range(rows):
+        date = start + datetime.timedelta(seconds=span * (idx + rng.random()) / rows)
+        broker = brokers.pick(rng)
+        if recent and rng.random() < duplicate_rate:
+            listing = _repost(rng, rng.choice(recent), broker, date)
+        else:
+            listing = _listing(
+                rng, broker, date, locality_weights, type_weights, message_weights
+            )
+            recent.append(listing)
+        listing["idx"] = idx + 1
+        yield listing
+
+
+def _listing(rng, broker, date, locality_weights, type_weights, message_weights):
+    location, rate = _pick(rng, LOCALITIES, locality_weights)
+    ptype, _, median_area, sigma, rate_factor = _pick(rng, PROPERTY_TYPES, type_weights)
+    message_type = _pick(rng, MESSAGE_TYPES, message_weights)[0]
+    rent = message_type.endswith("rent")
+    area = max(200, round(median_area * math.exp(rng.gauss(0, sigma)), -1))
+
+    bedrooms = None
+    if ptype == "apartment":
+        bedrooms = min(5, max(1, round(area / 550)))
+    elif ptype in ("villa", "independent_house"):
+        bedrooms = rng.choice([3, 4, 4, 5])
+
+    rate = rate * rate_factor * math.exp(rng.gauss(0, 0.2))
+    price = round(area * rate, -4)
+    if rent:
+        price = max(5_000, round(price * RENTAL_YIELD / 12, -3))
+        price_text = _rent_text(rng, price)
+    elif ptype == "land" and rng.random() < 0.5:
+        price_text = f"Rs.{rate * 43_560 / 10_000_000:.1f} cr per acre"
+    elif ptype in ("plot", "commercial") and rng.random() < 0.3:
+        price_text = f"₹{round(rate, -2):,.0f}/sqft"
+    else:
+        price_text = _crore_text(rng, price)
+
+    name, contact, company = broker
+    listing = {
+        "id": _uuid(rng),
+        "source_raw_message_id": _uuid(rng),
+        "message_date": date.isoformat(),
+        "agent_contact": contact,
+        "agent_name": name,
+        "company_name": company,
+        "raw_message": None,
+        "message_type": message_type,
+        "property_type": ptype,
+        "area_sqft": int(area),
+        "price": int(price),
+        "price_text": price_text,
+        "location": location,
+        "project_name": rng.choice(PROJECTS) if ptype == "apartment" else None,
+        "furnishing_status": rng.choice(FURNISHING)
+        if ptype in ("apartment", "villa", "independent_house")
+        else None,
+        "parking_count": rng.choice([1, 1, 2, 2, 3]),
+        "parking_text": None,
+        "facing_direction": rng.choice(FACING),
+        "special_features": rng.sample(FEATURES, rng.randint(0, 4)),
+        "llm_json": json.dumps(
+            {
+                "split_index": None,
+                "message_type": message_type,
+                "split_from_original": False,
+            }
+        ),
+        "created_at": date.isoformat(),
+        "bedroom_count": bedrooms,
+    }
+    for field, rate in NULL_RATES.items():
+        if rng.random() < rate:
+            listing[field] = None
+    if listing["price"] is None:
+        listing["price_text"] = None
+    listing["raw_message"] = _message(rng, listing)
+    return listing
+
+
+def _message(rng, listing):
+    """Broker-style message text for a listing, with a signature."""
+    demand = listing["message_type"].startswith("demand")
+    deal = "rent" if listing["message_type"].endswith("rent") else "sale"
+    bhk = f"{listing['bedroom_count']}BHK " if listing["bedroom_count"] else ""
+    area = f"{listing['area_sqft']} sqft" if listing["area_sqft"] else ""
+    features = ", ".join(f.replace("_", " ") for f in listing["special_features"])
+    project = listing["project_name"]
+    text = rng.choice(DEMAND_TEMPLATES if demand else SUPPLY_TEMPLATES).format(
+        bhk=bhk,
+        ptype=listing["property_type"].replace("_", " "),
+        deal=deal,
+        deal_title=f"For {deal.title()}",
+        location=listing["location"],
+        project=f"{project}, " if project else "",
+        project_suffix=f" in {project}" if project else "",
+        area=area,
+        price=listing["price_text"] or "price on request",
+        features=features,
+        features_suffix=f" - {features}" if features else "",
+    )
+    signature = listing["agent_name"] or listing["company_name"] or ""
+    return f"{text}\n\nContact {signature} {listing['agent_contact']}".strip()
+
+
+def _repost(rng, original, broker, date):
+    """The same property posted again by another broker, reworded."""
+    listing = dict(original)
+    name, contact, company = broker
+    listing.update(
+        id=_uuid(rng),
+        source_raw_message_id=_uuid(rng),
+        message_date=date.isoformat(),
+        created_at=date.isoformat(),
+        agent_name=name if rng.random() >= NULL_RATES["agent_name"] else None,
+        agent_contact=contact,
+        company_name=company if rng.random() >= NULL_RATES["company_name"] else None,
+    )
+    listing["raw_message"] = _message(rng, listing)
+    return listing
+
+
+def write_jsonl(path, listings, chunk_size=10_000):
+    """Write listings as JSONL, one chunk of lines at a time."""
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in _chunks(listings, chunk_size):
+            f.write(
+                "".join(
+                    json.dumps(listing, ensure_ascii=False) + "\n" for listing in chunk
+                )
+            )
+
+
+def write_parquet(path, listings, chunk_size=50_000):
+    """Write listings as Parquet, one row group per chunk (needs pyarrow)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("idx", pa.int64()),
+            ("id", pa.string()),
+            ("source_raw_message_id", pa.string()),
+            ("message_date", pa.string()),
+            ("agent_contact", pa.string()),
+            ("agent_name", pa.string()),
+            ("company_name", pa.string()),
+            ("raw_message", pa.string()),
+            ("message_type", pa.string()),
+            ("property_type", pa.string()),
+            ("area_sqft", pa.int64()),
+            ("price", pa.int64()),
+            ("price_text", pa.string()),
+            ("location", pa.string()),
+            ("project_name", pa.string()),
+            ("furnishing_status", pa.string()),
+            ("parking_count", pa.int64()),
+            ("parking_text", pa.string()),
+            ("facing_direction", pa.string()),
+            ("special_features", pa.list_(pa.string())),
+            ("llm_json", pa.string()),
+            ("created_at", pa.string()),
+            ("bedroom_count", pa.int64()),
+        ]
+    )
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(listings, chunk_size):
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic listing corpus")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help=".jsonl or .parquet file")
+    parser.add_argument("--end-date", default="2025-12-31")
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--duplicate-rate", type=float, default=DUPLICATE_RATE)
+    cli = parser.parse_args()
+
+    path = pathlib.Path(cli.out)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    listings = generate(cli.rows, cli.seed, cli.end_date, cli.days, cli.duplicate_rate)
+    if path.suffix == ".parquet":
+        write_parquet(path, listings)
+    else:
+        write_jsonl(path, listings)
+    print(f"✅ Wrote {cli.rows} listings to {path}")
+
+
+if __name__ == "__main__":
+    main()
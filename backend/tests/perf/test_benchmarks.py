@@ -0,0 +1,132 @@
+"""
+Benchmarks of mock search, listing lookup, filtering, parsing and analytics.
+
+Every benchmark runs at each size in BENCH_SIZES (1k, 100k and 1M listings
+by default). The search and lookup tools are also run with the
+ListingSnapshot itself as MOCK_LISTINGS, the way load_mock_listings serves
+it. Save and compare JSON baselines with `make bench-baseline` and
+`make bench` (see tests/perf/README.md).
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from my_agent import analytics_tools
+from my_agent.database import parse_listing_data
+from my_agent.filters import ListingFilter, apply_filter
+from my_agent.mock_data import apply_mock_filters, apply_mock_filters_batch
+from my_agent.tools import get_listing_details, search_listings
+
+# Typical broker queries
+QUERIES = {
+    "locality": [{"field": "locality", "op": "eq", "value": "Whitefield"}],
+    "bhk_price": [
+        {"field": "bhk", "op": "eq", "value": 3},
+        {"field": "price_cr", "op": "lte", "value": 2.5},
+        {"field": "message_type", "op": "eq", "value": "supply_sale"},
+    ],
+    "near_landmark": [
+        {
+            "field": "near_landmark",
+            "op": "within_km",
+            "value": "Manyata Tech Park",
+            "km": 5,
+        },
+        {"field": "property_type", "op": "eq", "value": "apartment"},
+    ],
+    "rent_in": [
+        {"field": "message_type", "op": "eq", "value": "supply_rent"},
+        {
+            "field": "locality",
+            "op": "in",
+            "value": ["HSR Layout", "Koramangala", "BTM Layout"],
+        },
+    ],
+}
+ANALYTICS = [
+    "get_price_distribution",
+    "get_bhk_distribution",
+    "get_summary_stats",
+    "get_locality_breakdown",
+]
+
+
+@pytest.mark.benchmark(group="search_listings")
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_listings(benchmark, mock_listings, query) -> None:
+    results = benchmark(search_listings, QUERIES[query])
+    assert len(results) <= 50
+
+
+@pytest.mark.benchmark(group="search_listings")
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_listings_over_snapshot(benchmark, mock_snapshot, query) -> None:
+    results = benchmark(search_listings, QUERIES[query])
+    assert len(results) <= 50
+
+
+@pytest.mark.benchmark(group="get_listing_details")
+def test_get_listing_details(benchmark, mock_listings) -> None:
+    # The last row is the worst case for a scan
+    listing_id = mock_listings[-1]["id"]
+    assert benchmark(get_listing_details, listing_id)["id"] == listing_id
+
+
+@pytest.mark.benchmark(group="get_listing_details")
+def test_get_listing_details_over_snapshot(benchmark, mock_snapshot) -> None:
+    listing_id = mock_snapshot[-1]["id"]
+    assert benchmark(get_listing_details, listing_id)["id"] == listing_id
+
+
+@pytest.mark.benchmark(group="apply_filter")
+@pytest.mark.parametrize("query", ["locality", "near_landmark"])
+def test_apply_filter(benchmark, listings, query) -> None:
+    filter_obj = ListingFilter(**QUERIES[query][0])
+    benchmark(
+        lambda: sum(1 for listing in listings if apply_filter(listing, filter_obj))
+    )
+
+
+@pytest.mark.benchmark(group="apply_mock_filters")
+@pytest.mark.parametrize("query", QUERIES)
+def test_apply_mock_filters(benchmark, listings, query) -> None:
+    filters = [ListingFilter(**f) for f in QUERIES[query]]
+    benchmark(apply_mock_filters, listings, filters)
+
+
+@pytest.mark.benchmark(group="apply_mock_filters")
+def test_apply_mock_filters_batch(benchmark, listings) -> None:
+    filter_sets = [
+        [ListingFilter(**f) for f in filters] for filters in QUERIES.values()
+    ]
+    results = benchmark(apply_mock_filters_batch, listings, filter_sets)
+    assert len(results) == len(QUERIES)
+
+
+@pytest.mark.benchmark(group="parse_listing_data")
+def test_parse_listing_data(benchmark, listings) -> None:
+    def setup():
+        # Turn the rows back into what the database returns (numbers and
+        # features as text) in place; parsing restores them, and the 1M
+        # corpus has no room for a copy
+        for listing in listings:
+            for field in ("area_sqft", "price"):
+                if listing[field] is not None:
+                    listing[field] = str(listing[field])
+            listing["special_features"] = json.dumps(listing["special_features"])
+        return (listings,), {}
+
+    benchmark.pedantic(
+        lambda rows: [parse_listing_data(r) for r in rows], setup=setup, rounds=3
+    )
+    assert isinstance(listings[0]["special_features"], list)
+
+
+@pytest.mark.benchmark(group="analytics")
+@pytest.mark.parametrize("tool", ANALYTICS)
+def test_analytics(benchmark, mock_listings, tool) -> None:
+    result = benchmark(getattr(analytics_tools, tool), QUERIES["locality"])
+    assert result
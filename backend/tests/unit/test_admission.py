@@ -0,0 +1,69 @@
+"""
+Tests for agent admission control.
+"""
+
+import asyncio
+
+import pytest
+
+from my_agent.admission import AdmissionController, AdmissionRejected
+
+
+@pytest.mark.asyncio
+async def test_per_user_limit_rejects_fast() -> None:
+    controller = AdmissionController(max_concurrent=4, max_queue=4, max_per_user=1)
+    ticket = await controller.acquire("broker_a")
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await controller.acquire("broker_a")
+    assert excinfo.value.reason == "per_user_limit"
+    assert excinfo.value.retry_after >= 1
+
+    # Other users are unaffected
+    other = await controller.acquire("broker_b")
+    other.release()
+    ticket.release()
+
+
+@pytest.mark.asyncio
+async def test_queue_full_rejects_and_queued_request_is_admitted() -> None:
+    controller = AdmissionController(max_concurrent=1, max_queue=1, max_per_user=5)
+    running = await controller.acquire("a")
+
+    queued = asyncio.create_task(controller.acquire("b"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await controller.acquire("c")
+    assert excinfo.value.reason == "queue_full"
+
+    running.release()
+    ticket = await asyncio.wait_for(queued, timeout=1)
+    ticket.release()
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_and_double_release() -> None:
+    controller = AdmissionController(
+        max_concurrent=1, max_queue=1, max_per_user=5, queue_timeout=0.01
+    )
+    running = await controller.acquire("a")
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await controller.acquire("b")
+    assert excinfo.value.reason == "queue_timeout"
+
+    running.release()
+    running.release()
+    ticket = await controller.acquire("b")
+    ticket.release()
+
+
+@pytest.mark.asyncio
+async def test_requests_without_a_user_skip_the_per_user_cap() -> None:
+    controller = AdmissionController(max_concurrent=4, max_queue=4, max_per_user=1)
+    tickets = [await controller.acquire(None) for _ in range(3)]
+
+    for ticket in tickets:
+        ticket.release()
+    assert controller._per_user == {}
@@ -0,0 +1,52 @@
+"""
+Tests for the semantic answer cache.
+"""
+
+from my_agent.answer_cache import AnswerCache, intent_signature, is_self_contained
+
+QUESTION = "What is the average price of 3BHK flats in Whitefield?"
+
+
+def test_paraphrase_hits_and_different_intent_misses() -> None:
+    cache = AnswerCache()
+    cache.store(QUESTION, "About 2.1 Cr")
+
+    assert (
+        cache.lookup("what's the average price of 3 BHK flats in whitefield")
+        == "About 2.1 Cr"
+    )
+    assert (
+        cache.lookup("What is the average price of 4BHK flats in Whitefield?") is None
+    )
+    assert cache.lookup("How many 3BHK flats in Whitefield?") is None
+    assert cache.lookup("What is the average price of 3BHK flats in Hebbal?") is None
+
+
+def test_opposite_bounds_and_negation_miss() -> None:
+    cache = AnswerCache()
+    cache.store("3BHK flats in Whitefield under 2 cr", "12 listings under 2 Cr")
+
+    assert (
+        cache.lookup("3BHK flats in Whitefield below 2 cr") == "12 listings under 2 Cr"
+    )
+    assert cache.lookup("3BHK flats in Whitefield above 2 cr") is None
+    assert cache.lookup("3BHK flats not in Whitefield under 2 cr") is None
+    assert intent_signature("villas over 5 cr") != intent_signature("villas upto 5 cr")
+
+
+def test_entries_expire_with_ttl_and_data_version() -> None:
+    cache = AnswerCache(ttl=0)
+    cache.store(QUESTION, "stale")
+    assert cache.lookup(QUESTION) is None
+
+    cache = AnswerCache()
+    cache.store(QUESTION, "old data")
+    cache._data_version = "newer listings"
+    assert cache.lookup(QUESTION) is None
+
+
+def test_signature_and_follow_up_detection() -> None:
+    assert ("locality", "Whitefield") in intent_signature(QUESTION)
+    assert is_self_contained("and for 4 BHK?", has_history=False)
+    assert not is_self_contained("and for 4 BHK?", has_history=True)
+    assert is_self_contained(QUESTION, has_history=True)
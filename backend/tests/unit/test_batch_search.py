@@ -0,0 +1,102 @@
+"""
+Tests for the shared-scan batch search.
+"""
+
+from my_agent import database, tools
+from my_agent.tools import MAX_RESULTS, search_listings, search_listings_batch
+
+FILTER_SETS = [
+    [{"field": "property_type", "op": "eq", "value": "apartment"}],
+    [
+        {"field": "property_type", "op": "eq", "value": "apartment"},
+        {"field": "bhk", "op": "gte", "value": 3},
+    ],
+    [
+        {"field": "locality", "op": "in", "value": ["Whitefield", "HSR"]},
+        {"field": "price_cr", "op": "lt", "value": 10.0},
+    ],
+    [],
+]
+
+
+def test_batch_matches_individual_searches() -> None:
+    batch = search_listings_batch(FILTER_SETS)
+
+    assert len(batch) == len(FILTER_SETS)
+    for filters, answer in zip(FILTER_SETS, batch, strict=True):
+        expected = search_listings(filters)
+        assert [x["id"] for x in answer["results"]] == [x["id"] for x in expected]
+        assert answer["count"] >= len(answer["results"])
+        assert len(answer["results"]) <= MAX_RESULTS
+
+
+def test_batch_count_only_omits_listings() -> None:
+    batch = search_listings_batch(FILTER_SETS[:2], count_only=True)
+
+    assert all(answer["results"] == [] for answer in batch)
+    assert batch[0]["count"] >= batch[1]["count"]
+
+
+def test_batch_empty_input() -> None:
+    assert search_listings_batch([]) == []
+
+
+class _Query:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args):
+            self.calls.append((name, *args))
+            return self
+
+        return call
+
+
+class _Supabase:
+    def __init__(self):
+        self.query = _Query()
+
+    def table(self, name):
+        return self.query
+
+
+def test_supabase_batch_pushes_default_date_window_down_once(monkeypatch) -> None:
+    client = _Supabase()
+    monkeypatch.setattr(tools, "USE_SUPABASE", True)
+    monkeypatch.setattr(tools, "supabase", client)
+    monkeypatch.setattr(
+        database,
+        "query_listings",
+        lambda query: [
+            {"id": "a", "property_type": "apartment", "bedroom_count": 3},
+            {"id": "b", "property_type": "apartment", "bedroom_count": 2},
+        ],
+    )
+
+    batch = search_listings_batch(FILTER_SETS[:2])
+
+    date_calls = [c for c in client.query.calls if c[1] == "message_date"]
+    assert len(date_calls) == 1 and date_calls[0][0] == "gte"
+    assert ("eq", "property_type", "apartment") in client.query.calls
+    assert [answer["count"] for answer in batch] == [2, 1]
+
+
+def test_supabase_batch_counts_every_page(monkeypatch) -> None:
+    client = _Supabase()
+    rows = [
+        {"id": f"l{i:04d}", "property_type": "apartment", "bedroom_count": i % 4}
+        for i in range(2500)
+    ]
+
+    def query_listings(query):
+        start, end = next(c[1:] for c in reversed(query.calls) if c[0] == "range")
+        return rows[start : end + 1]
+
+    monkeypatch.setattr(tools, "USE_SUPABASE", True)
+    monkeypatch.setattr(tools, "supabase", client)
+    monkeypatch.setattr(database, "query_listings", query_listings)
+
+    batch = search_listings_batch(FILTER_SETS[:2], count_only=True)
+
+    assert [answer["count"] for answer in batch] == [2500, 625]
@@ -0,0 +1,169 @@
+"""
+Tests for incremental agent profile maintenance.
+"""
+
+import random
+
+from my_agent.broker_profiles import MIN_LISTINGS, ProfileBuilder, RunningStats
+from my_agent.brokers import BrokerIndex, broker_id
+
+BROKERS = [
+    ("Rahul Estates", "+91 98450 12345"),
+    ("Rahul Estates", "+91 98860 11111"),  # Same name, different broker
+    ("Tashi Properties", "+91 70260 70800"),
+    ("Pallavi M V", "+91 99162 51225"),
+    (None, "+91 74110 06000"),  # Never signs
+]
+LOCALITIES = ["Hebbal", "Whitefield", "HSR Layout", "Hennur"]
+TYPES = ["apartment", "villa", "plot"]
+
+LISTINGS = [
+    {
+        "id": f"l{i}",
+        "agent_name": BROKERS[i % len(BROKERS)][0],
+        "agent_contact": BROKERS[i % len(BROKERS)][1],
+        "location": LOCALITIES[i % len(LOCALITIES)],
+        "property_type": TYPES[i % len(TYPES)],
+        "price": (i + 1) * 5_000_000,
+        "message_date": f"2025-01-{i % 28 + 1:02d}",
+    }
+    for i in range(40)
+]
+
+
+def _broker(contact):
+    return broker_id("+91" + contact.replace("+91", "").replace(" ", ""))
+
+
+def _full_rebuild(listings):
+    builder = ProfileBuilder()
+    builder.upsert(listings)
+    return builder.profiles()
+
+
+def _comparable(profiles):
+    return {p["broker_id"]: {k: v for k, v in p.items() if k != "id"} for p in profiles}
+
+
+def test_incremental_updates_match_a_full_rebuild() -> None:
+    builder = ProfileBuilder()
+    builder.upsert(LISTINGS[:20])
+    builder.profiles()
+    builder.upsert(LISTINGS[20:])
+    removed = {listing["id"] for listing in LISTINGS[::7]}
+    builder.remove(removed)
+
+    expected = _full_rebuild(
+        [listing for listing in LISTINGS if listing["id"] not in removed]
+    )
+    assert _comparable(builder.profiles()) == _comparable(expected)
+
+
+def test_incremental_resolution_matches_broker_index() -> None:
+    rng = random.Random(0)
+    names = ["Rahul Estates", "Tashi Properties", "Pallavi M V", None]
+    phones = ["98450 12345", "98860 11111", "70260 70800", "99162 51225", "", ""]
+    builder, current = ProfileBuilder(), {}
+    for _ in range(500):
+        listing_id = f"l{rng.randrange(20)}"
+        if rng.random() < 0.2:
+            builder.remove([listing_id])
+            current.pop(listing_id, None)
+        else:
+            contact = " / ".join(rng.sample(phones, rng.choice([1, 1, 2])))
+            listing = {
+                "id": listing_id,
+                "agent_name": rng.choice(names),
+                "agent_contact": contact,
+            }
+            builder.upsert([listing])
+            current[listing_id] = listing
+        index = BrokerIndex(current.values())
+        expected = {
+            bid: broker["listing_count"]
+            for bid, broker in index.brokers.items()
+            if broker["listing_count"] >= MIN_LISTINGS
+        }
+        counts = {
+            p["broker_id"]: p["active_listings_count"] for p in builder.profiles()
+        }
+        assert counts == expected
+
+
+def test_brokers_are_resolved_entities_not_names() -> None:
+    profiles = {p["broker_id"]: p for p in _full_rebuild(LISTINGS)}
+
+    assert len(profiles) == len(BROKERS)
+    rahuls = [p for p in profiles.values() if p["name"] == "Rahul Estates"]
+    assert len(rahuls) == 2 and {p["active_listings_count"] for p in rahuls} == {8}
+    unsigned = profiles[_broker("74110 06000")]
+    assert unsigned["name"] == unsigned["contact"] == "+91 74110 06000"
+    assert unsigned["active_listings_count"] == 8
+
+
+def test_only_changed_brokers_are_rewritten() -> None:
+    builder = ProfileBuilder()
+    builder.upsert(LISTINGS)
+    profiles = builder.apply_to([])
+    untouched = {p["id"]: p for p in profiles}
+
+    listing = next(x for x in LISTINGS if x["agent_name"] == "Tashi Properties")
+    builder.upsert(
+        [{**listing, "agent_name": "Pallavi M V", "agent_contact": "+91 99162 51225"}]
+    )
+    assert builder.changed == {_broker("70260 70800"), _broker("99162 51225")}
+
+    updated = {p["broker_id"]: p for p in builder.apply_to(profiles)}
+    assert updated[_broker("70260 70800")]["active_listings_count"] == 7
+    assert updated[_broker("99162 51225")]["active_listings_count"] == 9
+    rahul = updated[_broker("98450 12345")]
+    assert rahul is untouched[rahul["id"]]
+
+
+def test_a_listing_with_both_numbers_merges_two_brokers() -> None:
+    builder = ProfileBuilder()
+    builder.upsert(LISTINGS)
+    builder.apply_to([])
+
+    builder.upsert(
+        [{**LISTINGS[0], "agent_contact": "+91 98450 12345 / +91 98860 11111"}]
+    )
+    profiles = [p for p in builder.profiles() if p["name"] == "Rahul Estates"]
+
+    assert len(profiles) == 1 and profiles[0]["active_listings_count"] == 16
+
+
+def test_state_round_trip_keeps_ids_and_aggregates(tmp_path) -> None:
+    existing = [
+        {
+            "id": "agent_7",
+            "name": "Rahul Estates",
+            "contact": "98860 11111",
+            "response_time": "1 hour",
+        }
+    ]
+    builder = ProfileBuilder(existing)
+    builder.upsert(LISTINGS)
+    builder.save(tmp_path / "state.json")
+
+    restored = ProfileBuilder.load(tmp_path / "state.json")
+    assert restored.profiles() == builder.profiles()
+    rahul = next(
+        p for p in restored.profiles() if p["broker_id"] == _broker("98860 11111")
+    )
+    assert (rahul["id"], rahul["response_time"]) == ("agent_7", "1 hour")
+
+    merge = {**LISTINGS[0], "agent_contact": "+91 98450 12345 / +91 98860 11111"}
+    for b in (builder, restored):
+        b.upsert([merge])
+    assert restored.profiles() == builder.profiles()
+
+
+def test_running_stats_merge_and_remove() -> None:
+    a, b = RunningStats(), RunningStats()
+    for value in (1, 2, 3):
+        a.add(value)
+    b.add(10)
+    a.merge(b)
+    a.remove(2)
+    assert (a.count, a.mean) == (3, 14 / 3)
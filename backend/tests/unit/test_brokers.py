@@ -0,0 +1,125 @@
+"""
+Tests for broker entity resolution.
+"""
+
+from my_agent import tools
+from my_agent.brokers import BrokerIndex, normalize_phone, split_phones
+
+
+def _listing(listing_id, contact=None, name=None, company=None, **fields):
+    return {
+        "id": listing_id,
+        "agent_contact": contact,
+        "agent_name": name,
+        "company_name": company,
+        "location": "Hennur",
+        **fields,
+    }
+
+
+def test_phone_numbers_are_split_and_normalized_to_e164() -> None:
+    assert split_phones("7026070800/ 9916251225") == ["+917026070800", "+919916251225"]
+    assert split_phones("+91 74110 06000") == ["+917411006000"]
+    assert split_phones("98450 12345 98860 11111") == ["+919845012345", "+919886011111"]
+    assert (
+        normalize_phone("09845012345")
+        == normalize_phone("+91-98450-12345")
+        == "+919845012345"
+    )
+    assert split_phones("Flat 302, 2nd floor") == []
+
+
+def test_listings_cluster_through_shared_numbers() -> None:
+    index = BrokerIndex(
+        [
+            _listing("a", "7026070800/ 9916251225", "Tashi", "Tashi Properties"),
+            _listing("b", "+91 99162 51225"),  # Unsigned, second number of a
+            _listing(
+                "c", "080 2345 6789", "TASHI.", "Tashi Properties."
+            ),  # Same person at the same firm
+            _listing("d", None, "Tashi"),  # No number; the name belongs to one broker
+            _listing("e", "98860 11111", "Rahul Kumar"),
+            _listing(
+                "f", "98450 12345", "Rahul Kumar"
+            ),  # A common name alone doesn't link
+            _listing("g", None, "Rahul Kumar"),
+        ]
+    )
+    tashi = index.resolve("Tashi")
+    assert {index.broker_of(i) for i in "abcd"} == {tashi}
+    assert index.listing_ids(tashi) == ["a", "b", "c", "d"]
+    assert index.lookup("99162-51225")["name"] == "Tashi"
+    assert len({index.broker_of(i) for i in "efg"}) == 3
+    assert index.resolve("Rahul Kumar") is None
+    assert len(index.matches("Rahul Kumar")) == 3
+
+
+def test_broker_ids_are_stable_across_rebuilds() -> None:
+    listings = [
+        _listing("a", "7026070800", "Tashi", "Tashi Properties"),
+        _listing("b", "9916251225", "Tashi", "Tashi Properties"),
+    ]
+    first = BrokerIndex(listings).resolve("Tashi")
+    assert BrokerIndex(list(reversed(listings))).resolve("7026070800") == first
+
+
+def test_broker_tools_resolve_phone_and_skip_reposts(monkeypatch) -> None:
+    monkeypatch.setattr(
+        tools,
+        "MOCK_LISTINGS",
+        [
+            _listing("a", "7026070800", "Tashi Properties", canonical_id="a"),
+            _listing(
+                "b",
+                "7026070800",
+                "Tashi Properties",
+                canonical_id="a",
+                is_duplicate=True,
+            ),
+            _listing("c", "7026070800", "Tashi Properties", canonical_id="c"),
+        ],
+    )
+    result = tools.get_broker_listings("+91 70260 70800")
+    assert result["count"] == 2
+    assert [listing["id"] for listing in result["results"]] == ["a", "c"]
+    # The index covers the listings searches return, as on Supabase
+    assert tools.get_agent_details("7026070800")["listing_count"] == 2
+    assert tools.get_broker_listings("nobody")["error"]
+
+
+def test_ambiguous_broker_name_lists_candidates(monkeypatch) -> None:
+    monkeypatch.setattr(
+        tools,
+        "MOCK_LISTINGS",
+        [
+            _listing("a", "7026070800", "Rahul Kumar"),
+            _listing("b", "9916251225", "Rahul Kumar"),
+        ],
+    )
+    result = tools.get_broker_listings("rahul kumar")
+    assert result["error"]
+    assert sorted(b["phones"][0] for b in result["brokers"]) == [
+        "+917026070800",
+        "+919916251225",
+    ]
+
+
+def test_supabase_index_is_built_off_the_request_path(monkeypatch) -> None:
+    monkeypatch.setattr(tools, "USE_SUPABASE", True)
+    monkeypatch.setattr(tools, "supabase", object())
+    monkeypatch.setattr(tools, "_broker_index_cache", {"key": None, "index": None})
+    reads = []
+
+    def iter_listings(columns, searchable=False):
+        reads.append(searchable)
+        return [_listing("a", "7026070800", "Tashi")]
+
+    monkeypatch.setattr(tools, "iter_listings", iter_listings)
+    monkeypatch.setattr(
+        tools, "get_listings_by_ids", lambda ids: [_listing(i) for i in ids]
+    )
+
+    assert "loading" in tools.get_broker_listings("7026070800")["error"]
+    tools.refresh_broker_index()
+    assert tools.get_broker_listings("7026070800")["count"] == 1
+    assert reads == [True]  # The rows searches read, not the base table
@@ -0,0 +1,74 @@
+"""
+Tests for the SSE framing of agent turns.
+"""
+
+import json
+
+import pytest
+from google.adk.events import Event
+from google.genai import types
+
+import main
+from my_agent.admission import AdmissionController
+from my_agent.fast_path import FastPathAnswer
+
+
+class _Ticket:
+    def release(self):
+        pass
+
+
+class _Runner:
+    def __init__(self, events):
+        self.events = events
+
+    async def run_async(self, **kwargs):
+        for event in self.events:
+            yield event
+
+
+def _call_event(partial):
+    call = types.FunctionCall(name="search_listings", args={"filters": []})
+    return Event(
+        author=main.root_agent.name,
+        partial=partial,
+        content=types.Content(role="model", parts=[types.Part(function_call=call)]),
+    )
+
+
+@pytest.mark.asyncio
+async def test_streamed_function_call_is_reported_once(monkeypatch) -> None:
+    monkeypatch.setattr(
+        main, "runner", _Runner([_call_event(True), _call_event(False)])
+    )
+
+    frames = [
+        frame
+        async for frame in main._stream_chat(
+            "3BHK in Hebbal", "u", "s", _Ticket(), cacheable=False
+        )
+    ]
+
+    events = [frame.split("\n")[0].removeprefix("event: ") for frame in frames]
+    assert events == ["tool_call", "done"]
+    assert json.loads(frames[0].split("data: ", 1)[1])["name"] == "search_listings"
+
+
+@pytest.mark.asyncio
+async def test_fast_path_answers_are_admitted_first(monkeypatch) -> None:
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+    monkeypatch.setattr(main, "admission", controller)
+    monkeypatch.setattr(main, "FAST_PATH_ENABLED", True)
+    monkeypatch.setattr(
+        main, "try_answer", lambda message: FastPathAnswer("count", "12", [])
+    )
+    running = await controller.acquire("someone_else")
+
+    response = await main.chat_stream(main.ChatRequest(message="How many in Hebbal?"))
+    assert response.status_code == 429
+
+    running.release()
+    response = await main.chat_stream(main.ChatRequest(message="How many in Hebbal?"))
+    assert response.status_code == 200
+    await response.background()
+    assert controller._active == 0
@@ -0,0 +1,47 @@
+"""
+Tests for token-budgeted tool response compaction.
+"""
+
+from my_agent.compaction import compact_response, estimate_tokens
+
+
+def _listing(i: int) -> dict:
+    return {
+        "id": f"listing-{i}",
+        "raw_message": "Long WhatsApp broadcast text " * 40,
+        "llm_json": '{"split_index": null}',
+        "location": "Whitefield",
+        "property_type": "apartment",
+        "price": 10000000 + i,
+        "project_name": None,
+    }
+
+
+def test_listing_list_becomes_table_within_budget() -> None:
+    listings = [_listing(i) for i in range(50)]
+
+    table = compact_response(listings, budget_tokens=300)
+
+    assert estimate_tokens(table) <= 300
+    assert table["same_for_all"] == {
+        "location": "Whitefield",
+        "property_type": "apartment",
+    }
+    assert table["columns"] == ["id", "price"]
+    assert table["total_rows"] == 50
+    assert table["omitted_rows"] == 50 - len(table["rows"])
+    assert estimate_tokens(table) < estimate_tokens(listings) / 10
+
+
+def test_single_listing_keeps_truncated_message() -> None:
+    compact = compact_response(_listing(1))
+
+    assert "llm_json" not in compact
+    assert "project_name" not in compact
+    assert len(compact["raw_message"]) < len(_listing(1)["raw_message"])
+
+
+def test_small_analytics_response_is_unchanged() -> None:
+    response = {"count": 2, "price_stats": {"min_cr": 1.0, "max_cr": 2.0}}
+
+    assert compact_response(response) == response
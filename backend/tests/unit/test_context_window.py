@@ -0,0 +1,92 @@
+"""
+Tests for context window management of the conversation history.
+"""
+
+from google.genai import types
+
+from my_agent import context_window
+from my_agent.compaction import to_table
+from my_agent.context_window import fit_contents, manage_context
+
+LISTINGS = [
+    {
+        "id": f"L{i}",
+        "location": "Whitefield",
+        "price": 9000000 + i,
+        "description": "x" * 70,
+    }
+    for i in range(40)
+]
+
+
+def _user(text: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def _turn(question: str) -> list[types.Content]:
+    call = types.Part(
+        function_call=types.FunctionCall(id="c1", name="search_listings", args={})
+    )
+    result = types.Part(
+        function_response=types.FunctionResponse(
+            id="c1",
+            name="search_listings",
+            response=to_table(LISTINGS),
+        )
+    )
+    return [
+        _user(question),
+        types.Content(role="model", parts=[call]),
+        types.Content(role="user", parts=[result]),
+        types.Content(role="model", parts=[types.Part(text="Found 40 listings.")]),
+    ]
+
+
+def test_stale_tool_results_become_id_summaries() -> None:
+    contents = _turn("2BHK in Whitefield") + _turn("now under 1 crore")[:3]
+
+    fitted = fit_contents(contents, budget_tokens=100_000)
+
+    stale = fitted[2].parts[0].function_response
+    current = fitted[6].parts[0].function_response
+    assert stale.response["listings"] == 40
+    assert stale.response["ids"][:2] == ["L0", "L1"]
+    assert "rows" not in stale.response
+    assert stale.id == "c1"
+    # The current turn's results are untouched
+    assert current.response["rows"]
+    # Inputs are not modified in place
+    assert "rows" in contents[2].parts[0].function_response.response
+
+
+def test_oldest_turns_dropped_to_fit_budget() -> None:
+    contents = []
+    for i in range(30):
+        contents += _turn(f"question {i}")
+    contents.append(_user("latest question"))
+
+    fitted = fit_contents(contents, budget_tokens=2000)
+
+    assert fitted[-1].parts[0].text == "latest question"
+    assert fitted[0].parts[0].text.startswith("question ")
+    assert len(fitted) < len(contents)
+
+
+def test_callback_keeps_cost_flat_as_turns_grow(monkeypatch) -> None:
+    monkeypatch.setattr(context_window, "CONTEXT_TOKEN_BUDGET", 2000)
+
+    class Request:
+        def __init__(self, contents):
+            self.contents = contents
+
+    sizes = []
+    for turns in (20, 40, 80):
+        contents = []
+        for i in range(turns):
+            contents += _turn(f"question {i}")
+        request = Request([*contents, _user("next")])
+        manage_context(None, request)
+        sizes.append(len(str(request.contents)))
+
+    # Once the budget is reached, more turns no longer mean a bigger request
+    assert max(sizes) <= min(sizes) * 1.1
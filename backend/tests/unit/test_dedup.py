@@ -0,0 +1,147 @@
+"""
+Tests for near-duplicate listing detection.
+"""
+
+from my_agent import database, tools
+from my_agent.dedup import (
+    DedupIndex,
+    annotate_duplicates,
+    backfill,
+    canonical_listings,
+    find_duplicates,
+    shingles,
+)
+
+ORIGINAL = (
+    "3BHK apartment for sale in Prestige Lakeside Habitat, Whitefield. "
+    "1720 sqft, east facing, 2 car parks, semi furnished. "
+    "Price 1.85 Cr negotiable. Call Ravi 98450 12345"
+)
+REPOST = (
+    "*3 BHK Apartment for Sale* in Prestige Lakeside Habitat Whitefield 🏡 "
+    "1720 sqft, east facing, 2 car parks, semi furnished. "
+    "Price 1.85 Cr negotiable!! Contact Suresh +91 99000 54321"
+)
+TEMPLATE = (
+    "{bhk}BHK apartment for sale in Prestige Lakeside Habitat, Whitefield. "
+    "{area} sqft, east facing, 2 car parks, semi furnished. "
+    "Price {price} Cr negotiable. Call Ravi 98450 12345"
+)
+OTHER = (
+    "2BHK flat for rent in Sobha Dream Acres, Panathur. 1150 sqft, "
+    "fully furnished, rent 38k per month. Call 98860 11111"
+)
+
+
+def _listing(listing_id, text, date, **fields):
+    return {
+        "id": listing_id,
+        "raw_message": text,
+        "message_date": date,
+        "message_type": "supply_sale",
+        "property_type": "apartment",
+        **fields,
+    }
+
+
+def test_repost_shares_shingles_despite_formatting_and_phone() -> None:
+    a, b = shingles(ORIGINAL), shingles(REPOST)
+    assert len(a & b) / len(a | b) >= 0.6
+    assert "3 bhk" in a and "3 bhk" in b
+    assert not any("98450" in s for s in a)
+
+
+def test_reposts_cluster_under_earliest_listing() -> None:
+    listings = [
+        _listing("b", REPOST, "2025-09-02"),
+        _listing("a", ORIGINAL, "2025-09-01"),
+        _listing("c", OTHER, "2025-09-01", message_type="supply_rent"),
+    ]
+    assert find_duplicates(listings) == {"a": "a", "b": "a", "c": "c"}
+
+    annotate_duplicates(listings)
+    assert [x["id"] for x in canonical_listings(listings)] == ["a", "c"]
+    original = next(x for x in listings if x["id"] == "a")
+    assert original["duplicate_count"] == 1
+
+
+def test_similar_text_for_different_property_type_is_kept() -> None:
+    index = DedupIndex()
+    index.add(_listing("a", ORIGINAL, "2025-09-01"))
+    assert index.add(_listing("b", REPOST, "2025-09-02", property_type="villa")) == []
+    assert index.add(_listing("c", REPOST, "2025-09-02")) == ["a"]
+
+
+def test_units_posted_with_one_template_are_kept_apart() -> None:
+    units = [("a", 3, 1720, 1.85), ("b", 3, 2100, 2.4), ("c", 4, 2600, 3.1)]
+    listings = [
+        _listing(
+            listing_id,
+            TEMPLATE.format(bhk=bhk, area=area, price=price),
+            "2025-09-01",
+            bedroom_count=bhk,
+            area_sqft=area,
+            price=int(price * 10_000_000),
+        )
+        for listing_id, bhk, area, price in units
+    ]
+    assert find_duplicates(listings) == {"a": "a", "b": "b", "c": "c"}
+
+    repost = _listing(
+        "d", REPOST, "2025-09-02", bedroom_count="3", area_sqft="1720", price=18_500_000
+    )
+    assert find_duplicates([*listings, repost])["d"] == "a"
+
+
+def test_backfill_clears_listings_that_left_their_cluster(monkeypatch) -> None:
+    stored = [
+        _listing("a", ORIGINAL, "2025-09-01", canonical_id="a", is_duplicate=False),
+        _listing("b", REPOST, "2025-09-02", canonical_id="a", is_duplicate=True),
+        # Flagged by an older backfill, but a different property
+        _listing(
+            "c",
+            OTHER,
+            "2025-09-01",
+            message_type="supply_rent",
+            canonical_id="a",
+            is_duplicate=True,
+        ),
+        _listing(
+            "d",
+            OTHER.replace("2BHK", "3BHK"),
+            "2025-09-03",
+            canonical_id=None,
+            is_duplicate=False,
+        ),
+    ]
+    cleared, marked = [], []
+    monkeypatch.setattr(
+        database, "iter_listings", lambda columns, page_size: iter(stored)
+    )
+    monkeypatch.setattr(database, "clear_duplicates", cleared.extend)
+    monkeypatch.setattr(
+        database,
+        "mark_duplicates",
+        lambda canonical_id, ids: marked.append((canonical_id, ids)),
+    )
+
+    assert backfill() == (4, 1)
+    assert cleared == ["c"]
+    assert marked == [("a", ["b"])]
+
+
+def test_mock_search_skips_reposts(monkeypatch) -> None:
+    listings = annotate_duplicates(
+        [
+            _listing("a", ORIGINAL, "2025-09-01", location="Whitefield"),
+            _listing("b", REPOST, "2025-09-02", location="Whitefield"),
+        ]
+    )
+    monkeypatch.setattr(tools, "MOCK_LISTINGS", listings)
+
+    results = tools.search_listings(
+        [{"field": "locality", "op": "eq", "value": "Whitefield"}]
+    )
+    assert [x["id"] for x in results] == ["a"]
+    assert tools.get_locality_stats("Whitefield")["inventory_count"] == 1
+    assert tools.get_listing_details("b")["canonical_id"] == "a"
@@ -0,0 +1,101 @@
+"""
+Tests for the deterministic fast-path router.
+"""
+
+import pytest
+
+from my_agent import database, tools
+from my_agent.fast_path import try_answer
+from my_agent.tools import search_listings_batch
+
+
+def test_count_query_matches_search() -> None:
+    answer = try_answer("How many villas in Hebbal?")
+
+    assert answer is not None
+    assert answer.intent == "count"
+    assert answer.filters == [
+        {"field": "property_type", "op": "eq", "value": "villa"},
+        {"field": "locality", "op": "eq", "value": "Hebbal"},
+    ]
+    count = search_listings_batch([answer.filters], count_only=True)[0]["count"]
+    assert answer.text.startswith("```json")
+    assert f" {count} villa listing" in answer.text
+
+
+def test_nearby_query_resolves_partial_landmark() -> None:
+    answer = try_answer("areas near manyata")
+
+    assert answer is not None
+    assert answer.filters == [
+        {"field": "near_landmark", "op": "near", "value": "Manyata Tech Park"}
+    ]
+    assert "Hebbal" in answer.text
+
+
+def test_avg_price_covers_every_match(monkeypatch) -> None:
+    listings = [
+        {
+            "id": f"l{i}",
+            "location": "Hebbal",
+            "bedroom_count": 3,
+            "price": (i + 1) * 10000000,
+        }
+        for i in range(tools.MAX_RESULTS + 10)
+    ]
+    monkeypatch.setattr(tools, "MOCK_LISTINGS", listings)
+
+    answer = try_answer("avg price 3bhk hebbal")
+
+    assert answer is not None
+    assert f"across {len(listings)} listings" in answer.text
+    assert "₹30.5 Cr" in answer.text
+    assert "range ₹1.0\u201360.0 Cr" in answer.text
+
+
+class _Query:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args):
+            self.calls.append((name, *args))
+            return self
+
+        return call
+
+
+def test_supabase_avg_price_reads_every_page(monkeypatch) -> None:
+    rows = [
+        {"id": f"l{i:04d}", "price": 10000000 if i < 1000 else 30000000}
+        for i in range(1500)
+    ]
+    query = _Query()
+
+    def query_listings(builder):
+        start, end = next(c[1:] for c in reversed(builder.calls) if c[0] == "range")
+        return rows[start : end + 1]
+
+    monkeypatch.setattr(tools, "USE_SUPABASE", True)
+    monkeypatch.setattr(
+        tools, "supabase", type("_Supabase", (), {"table": lambda self, name: query})()
+    )
+    monkeypatch.setattr(database, "query_listings", query_listings)
+
+    answer = try_answer("avg price 3bhk hebbal")
+
+    assert answer is not None
+    assert "across 1500 listings" in answer.text
+    assert "₹1.67 Cr" in answer.text
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "what is a good investment for 5 crores?",
+        "how many villas in my budget",
+        "localities near the moon",
+    ],
+)
+def test_unparsed_questions_fall_back_to_agent(message: str) -> None:
+    assert try_answer(message) is None
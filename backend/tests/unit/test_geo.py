@@ -0,0 +1,116 @@
+"""
+Tests for radius search over localities.
+"""
+
+from my_agent import tools
+from my_agent.filters import (
+    ListingFilter,
+    apply_filter,
+    apply_filters_to_supabase_query,
+    filter_key,
+)
+from my_agent.geo import (
+    GridIndex,
+    distance_km,
+    localities_within,
+    nearby_localities,
+    resolve_place,
+)
+from my_agent.locality_data import LOCALITY_COORDINATES
+
+
+def test_grid_matches_brute_force() -> None:
+    index = GridIndex(LOCALITY_COORDINATES)
+    for center in [(13.045, 77.62), (12.9698, 77.75), (12.8452, 77.6602)]:
+        for km in (1, 4, 12):
+            expected = {
+                n
+                for n, p in LOCALITY_COORDINATES.items()
+                if distance_km(center, p) <= km
+            }
+            assert {n for n, _ in index.within(center, km)} == expected
+
+
+def test_places_resolve_by_alias_and_partial_name() -> None:
+    assert resolve_place("manyata") == "Manyata Tech Park"
+    assert resolve_place("KIA") == "Airport"
+    assert resolve_place("hsr") == "HSR Layout"
+    assert resolve_place("the moon") is None
+
+    within = localities_within("ITPL", 3)
+    assert within[0] == "Whitefield" and "Koramangala" not in within
+    # Curated neighbours come first, then the rest of the radius
+    assert nearby_localities("Airport")[:3] == ("Devanahalli", "Yelahanka", "Hebbal")
+    assert "Hennur" in nearby_localities("Manyata Tech Park")
+
+
+def test_within_km_filter_matches_locations() -> None:
+    near_itpl = ListingFilter(field="near_landmark", op="within_km", value="ITPL", km=3)
+    assert apply_filter({"location": "whitefield"}, near_itpl)
+    assert not apply_filter({"location": "Koramangala"}, near_itpl)
+    assert not apply_filter({"location": None}, near_itpl)
+
+    near_manyata = ListingFilter(
+        field="near_landmark", op="near", value="Manyata Tech Park"
+    )
+    assert apply_filter({"location": "Hebbal"}, near_manyata)
+
+    wide = {"field": "locality", "op": "within_km", "value": "HSR Layout", "km": 10}
+    assert filter_key(wide) != filter_key({**wide, "km": 2})
+
+
+class _Query:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args):
+            self.calls.append((name, *args))
+            return self
+
+        return call
+
+
+def test_geo_filter_becomes_location_in_query() -> None:
+    query = apply_filters_to_supabase_query(
+        _Query(),
+        [{"field": "near_landmark", "op": "within_km", "value": "ITPL", "km": 3}],
+        default_recent=False,
+    )
+    assert query.calls == [("in_", "location", list(localities_within("ITPL", 3)))]
+
+
+def test_every_landmark_filter_is_a_location_query_and_unknown_places_match_nothing() -> (
+    None
+):
+    for op in ("near", "eq", "in"):
+        query = apply_filters_to_supabase_query(
+            _Query(),
+            [{"field": "near_landmark", "op": op, "value": "Airport"}],
+            default_recent=False,
+        )
+        assert query.calls == [("in_", "location", list(nearby_localities("Airport")))]
+
+    query = apply_filters_to_supabase_query(
+        _Query(),
+        [{"field": "locality", "op": "within_km", "value": "the moon", "km": 3}],
+        default_recent=False,
+    )
+    assert query.calls == [("in_", "location", [])]
+    the_moon = ListingFilter(field="locality", op="within_km", value="the moon", km=3)
+    assert not apply_filter({"location": "Hebbal"}, the_moon)
+
+
+def test_mock_search_near_landmark(monkeypatch) -> None:
+    monkeypatch.setattr(
+        tools,
+        "MOCK_LISTINGS",
+        [
+            {"id": "a", "location": "Hebbal"},
+            {"id": "b", "location": "Whitefield"},
+        ],
+    )
+    results = tools.search_listings(
+        [{"field": "near_landmark", "op": "near", "value": "Manyata Tech Park"}]
+    )
+    assert [x["id"] for x in results] == ["a"]
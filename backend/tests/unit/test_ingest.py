@@ -0,0 +1,186 @@
+"""
+Tests for the ingestion pipeline, with a scripted extractor in place of Gemini.
+"""
+
+import asyncio
+
+import pytest
+
+from my_agent.ingest import Checkpoint, IngestPipeline, listing_id, split_message
+
+MULTI = """Dear Associates,
+
+Properties to offer
+
+📍3BHK flat in Whitefield - 1650 sqft - ₹1.2 Cr
+
+📍Plot in Kogilu 30x40 west facing - ₹6500/sqft
+
+Direct enquiries
+Pallavi 8550079380"""
+
+SINGLE = """Society Name: SJR Primecorp Vogue
+
+Flat Type: 3bhk
+
+Rent 85k plus maintenance
+
+1900 sq ft"""
+
+
+def _messages(n: int) -> list[dict]:
+    return [
+        {
+            "id": f"m{i}",
+            "raw_message": f"2BHK for rent in HSR, 1100 sqft, 40k #{i}",
+            "message_date": None,
+            "agent_name": None,
+            "agent_contact": None,
+        }
+        for i in range(n)
+    ]
+
+
+class ScriptedExtractor:
+    """Returns one supply_rent listing per chunk; fails the first `failures` calls."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, chunks: list[str]) -> list[dict]:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("429 Resource exhausted")
+            return [
+                {
+                    "index": i,
+                    "message_type": "supply_rent",
+                    "bedroom_count": 2,
+                    "price": 40000,
+                }
+                for i in range(len(chunks))
+            ]
+        finally:
+            self.in_flight -= 1
+
+
+def test_split_message_keeps_header_and_footer() -> None:
+    chunks = split_message(MULTI)
+
+    assert len(chunks) == 2
+    assert "Whitefield" in chunks[0] and "Kogilu" not in chunks[0]
+    assert "Kogilu" in chunks[1]
+    assert all("Pallavi" in c and "Dear Associates" in c for c in chunks)
+    # One listing spread over several paragraphs is not split
+    assert split_message(SINGLE) == [SINGLE]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_bounds_concurrency_and_writes_all_rows() -> None:
+    written = []
+    extractor = ScriptedExtractor()
+    pipeline = IngestPipeline(
+        written.extend,
+        extract=extractor,
+        batch_size=5,
+        concurrency=2,
+        rules_threshold=None,
+    )
+
+    stats = await pipeline.run(_messages(40))
+
+    assert stats["messages"] == 40 and stats["rows"] == 40
+    assert extractor.max_in_flight <= 2
+    assert {r["id"] for r in written} == {listing_id(f"m{i}", None) for i in range(40)}
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_retry_then_resume_from_checkpoint(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr("my_agent.ingest.RETRY_BASE_SECONDS", 0)
+    ckpt = tmp_path / "ingest.ckpt"
+
+    # Transient failures are retried within the run
+    first = IngestPipeline(
+        [].extend,
+        extract=ScriptedExtractor(failures=2),
+        checkpoint=Checkpoint(ckpt),
+        batch_size=5,
+        upsert_batch_size=5,
+        rules_threshold=None,
+    )
+    stats = await first.run(_messages(10))
+    assert stats["messages"] == 10 and stats["failed"] == 0
+
+    # A rerun skips everything already checkpointed
+    second = IngestPipeline(
+        [].extend,
+        extract=ScriptedExtractor(),
+        checkpoint=Checkpoint(ckpt),
+        rules_threshold=None,
+    )
+    stats = await second.run(_messages(12))
+    assert stats["skipped"] == 10 and stats["messages"] == 2
+
+
+@pytest.mark.asyncio
+async def test_invalid_extractions_are_rejected() -> None:
+    async def extract(chunks):
+        return [
+            {"index": 0, "message_type": "supply_rent", "bedroom_count": -3},
+            {"index": 1, "message_type": "other"},
+        ]
+
+    written = []
+    stats = await IngestPipeline(
+        written.extend, extract=extract, rules_threshold=None
+    ).run(_messages(2))
+
+    assert stats["rejected"] == 1
+    assert written == []
+
+
+@pytest.mark.asyncio
+async def test_easy_messages_skip_the_llm() -> None:
+    easy = {
+        "id": "easy",
+        "raw_message": "Villa for sale in Whitefield 4BHK 3200 sqft ₹ 4.5 Cr",
+        "message_date": None,
+        "agent_name": None,
+        "agent_contact": None,
+    }
+    extractor = ScriptedExtractor()
+    written = []
+
+    stats = await IngestPipeline(written.extend, extract=extractor).run(
+        [easy, *_messages(3)]
+    )
+
+    assert stats["rules_chunks"] == 1 and stats["llm_chunks"] == 3
+    rule_row = next(r for r in written if r["source_raw_message_id"] == "easy")
+    assert rule_row["price"] == 45_000_000
+    assert '"extractor": "rules"' in rule_row["llm_json"]
+
+
+@pytest.mark.asyncio
+async def test_rule_parses_that_fail_validation_go_to_the_llm(monkeypatch) -> None:
+    monkeypatch.setattr(
+        "my_agent.rule_extractor.extract",
+        lambda text: ({"message_type": "supply_rent", "bedroom_count": -1}, 1.0),
+    )
+    extractor = ScriptedExtractor()
+    written = []
+
+    stats = await IngestPipeline(written.extend, extract=extractor).run(_messages(2))
+
+    assert stats["rules_chunks"] == 0 and stats["llm_chunks"] == 2
+    assert len(written) == 2 and all(r["bedroom_count"] == 2 for r in written)
@@ -0,0 +1,107 @@
+"""
+Tests for the bulk listing loader.
+"""
+
+import json
+import pathlib
+import threading
+import time
+
+import pytest
+
+from my_agent import loader
+from my_agent.ingest import listing_id
+from my_agent.loader import load, normalize_row, read_rows
+
+EXPORT_PATH = pathlib.Path(__file__).parents[2] / "whatsapp_listing_data_rows.csv"
+
+
+def _record(source_id, split_index=None, **fields):
+    return {
+        "source_raw_message_id": source_id,
+        "raw_message": f"3BHK in Whitefield #{source_id}",
+        "message_type": "supply_sale",
+        "area_sqft": "1500",
+        "price": "",
+        "price_text": "1.2 Cr",
+        "special_features": '["gym"]',
+        "llm_json": json.dumps({"split_index": split_index}),
+        **fields,
+    }
+
+
+class TableSink:
+    """Upserts rows into a dict keyed by id, like the listings table."""
+
+    def __init__(self, failures=0):
+        self.table = {}
+        self.failures = failures
+        self.lock = threading.Lock()
+
+    def __call__(self, rows):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("timeout")
+            ids = [r["id"] for r in rows]
+            assert len(ids) == len(set(ids)), "one upsert cannot touch a row twice"
+            self.table.update({r["id"]: r for r in rows})
+
+
+def test_row_is_keyed_by_source_message_and_normalized() -> None:
+    row = normalize_row(_record("m1", split_index=2))
+    assert row["id"] == listing_id("m1", 2)
+    assert (row["area_sqft"], row["price"]) == (1500, None)
+    assert row["special_features"] == '["gym"]'
+    assert normalize_row(_record("")) is None
+
+
+def test_reloading_is_idempotent() -> None:
+    sink = TableSink()
+    records = [_record(f"m{i}") for i in range(25)]
+    first = load(records, sink, batch_size=10, writers=3)
+    load(records, sink, batch_size=10, writers=3)
+
+    assert first["rows"] == 25 and first["batches"] == 3
+    assert len(sink.table) == 25
+    assert all(r["price"] == 12_000_000 for r in sink.table.values())
+
+
+def test_repeated_keys_in_a_batch_are_collapsed() -> None:
+    sink = TableSink()
+    stats = load(
+        [_record("m1", price_text="1 Cr"), _record("m1", price_text="2 Cr")], sink
+    )
+    assert stats["collapsed"] == 1
+    assert sink.table[listing_id("m1", None)]["price"] == 20_000_000
+
+
+def test_a_key_repeated_across_batches_keeps_its_last_row() -> None:
+    class SlowFirstWriteSink(TableSink):
+        def __call__(self, rows):
+            if rows[0]["price"] == 10_000_000:
+                time.sleep(0.1)
+            super().__call__(rows)
+
+    sink = SlowFirstWriteSink()
+    records = [_record("m1", price_text="1 Cr"), _record("m1", price_text="2 Cr")]
+    stats = load(records, sink, batch_size=1, writers=2)
+
+    assert (stats["batches"], stats["rows"]) == (2, 2)
+    assert sink.table[listing_id("m1", None)]["price"] == 20_000_000
+
+
+def test_failed_batches_are_retried(monkeypatch) -> None:
+    monkeypatch.setattr(loader, "RETRY_BASE_SECONDS", 0)
+    sink = TableSink(failures=2)
+    assert load([_record("m1")], sink)["rows"] == 1
+    assert len(sink.table) == 1
+
+    with pytest.raises(ConnectionError):
+        load([_record("m2")], TableSink(failures=loader.MAX_RETRIES + 1))
+
+
+def test_dry_run_reads_exports_without_writing() -> None:
+    stats = load(read_rows(EXPORT_PATH))
+    assert stats["rows"] == stats["read"] > 0
+    assert stats["rows_per_sec"] > 0
@@ -0,0 +1,40 @@
+"""
+Tests for running synchronous tools concurrently on the tool thread pool.
+"""
+
+import asyncio
+import inspect
+import time
+
+import pytest
+
+from my_agent.parallel import run_in_pool
+
+
+def slow_lookup(locality: str, delay: float = 0.2) -> dict:
+    """Pretend database round trip."""
+    time.sleep(delay)
+    return {"locality": locality}
+
+
+@pytest.mark.asyncio
+async def test_independent_calls_overlap_and_keep_order() -> None:
+    tool = run_in_pool(slow_lookup)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(tool(name) for name in ["Hebbal", "Whitefield", "HSR Layout"])
+    )
+    elapsed = time.perf_counter() - start
+
+    assert [r["locality"] for r in results] == ["Hebbal", "Whitefield", "HSR Layout"]
+    assert elapsed < 0.5
+
+
+def test_wrapper_keeps_tool_metadata() -> None:
+    tool = run_in_pool(slow_lookup)
+
+    assert inspect.iscoroutinefunction(tool)
+    assert tool.__name__ == "slow_lookup"
+    assert tool.__doc__ == slow_lookup.__doc__
+    assert list(inspect.signature(tool).parameters) == ["locality", "delay"]
@@ -0,0 +1,94 @@
+"""
+Tests for price text parsing and column normalization.
+"""
+
+from my_agent import database
+from my_agent.analytics_tools import get_summary_stats
+from my_agent.prices import find_prices, normalize_price_columns, normalize_rows
+from my_agent.tools import search_listings
+
+
+def test_unit_and_basis_parsing() -> None:
+    assert [(q.amount, q.basis) for q in find_prices("Rs.3.5 cr per acre")] == [
+        (35_000_000, "per_acre")
+    ]
+    assert find_prices("45 L")[0].amount == 4_500_000
+    assert find_prices("1.2 Cr negotiable")[0].amount == 12_000_000
+    assert (find_prices("80k/month")[0].amount, find_prices("80k/month")[0].basis) == (
+        80_000,
+        "per_month",
+    )
+    # Letters straight after the number must not truncate it
+    assert find_prices("Rs 1,70,00,000Approx.")[0].amount == 17_000_000
+
+
+def test_per_acre_quote_is_multiplied_by_area() -> None:
+    # The Mysore Road plot: 10 acres at 3.5 Cr per acre, stored as 3.5 Cr
+    row = {
+        "price_text": "Rs.3.5 cr per acre",
+        "area_sqft": "435600",
+        "message_type": "supply_sale",
+        "price": "35000000",
+    }
+    normalize_rows([row])
+    assert row["price"] == 350_000_000
+    assert row["price_per_sqft"] == 803
+    assert row["monthly_rent"] is None
+
+
+def test_columns_keep_exact_stored_price_and_split_rent() -> None:
+    columns = normalize_price_columns(
+        price_text=["Rs 9.36 Cr", "85k plus maintenance", "₹6500/sqft", None],
+        area_sqft=[3177, 1900, None, 1200],
+        message_type=["supply_sale", "supply_rent", "supply_sale", "supply_sale"],
+        price=["93612828", None, None, 9_000_000],
+    )
+    assert columns["price"] == [93_612_828, 85_000, None, 9_000_000]
+    assert columns["monthly_rent"] == [None, 85_000, None, None]
+    assert columns["price_per_sqft"] == [29_466, None, 6_500, 7_500]
+
+
+def test_mock_listings_are_numeric_for_filters_and_analytics() -> None:
+    large = search_listings([{"field": "area_sqft", "op": "gt", "value": 3000}])
+    assert large and all(isinstance(x["area_sqft"], int) for x in large)
+    assert get_summary_stats([])["price_stats"]["avg_price_per_sqft"] > 0
+
+
+class _Supabase:
+    """Records update requests against a table of existing IDs."""
+
+    def __init__(self, existing):
+        self.existing = set(existing)
+        self.updates = []
+
+    def table(self, name):
+        return self
+
+    def update(self, values):
+        self.updates.append((values, None))
+        return self
+
+    def in_(self, column, ids):
+        self.updates[-1] = (self.updates[-1][0], ids)
+        self.data = [{"id": i} for i in ids if i in self.existing]
+        return self
+
+    def upsert(self, rows, on_conflict):
+        raise AssertionError("column updates must not insert rows")
+
+    def execute(self):
+        return self
+
+
+def test_column_updates_never_recreate_deleted_rows(monkeypatch) -> None:
+    rows = [{"id": f"l{i}", "price": i % 2, "area_sqft": 1000} for i in range(5)]
+    client = _Supabase(existing=["l0", "l1", "l2", "l4"])  # l3 was deleted
+    monkeypatch.setattr(database, "supabase", client)
+
+    assert database.update_listing_columns(rows, ["price"], chunk_size=2) == 4
+
+    assert client.updates == [
+        ({"price": 0}, ["l0", "l2"]),
+        ({"price": 0}, ["l4"]),
+        ({"price": 1}, ["l1", "l3"]),
+    ]
@@ -0,0 +1,69 @@
+"""
+Tests for per-step model routing.
+"""
+
+import pytest
+from google.genai import types
+
+from my_agent.routing import RoutingPolicy, parse_tool_models
+
+POLICY = RoutingPolicy(
+    "tiered",
+    planning_model="small",
+    synthesis_model="large",
+    tool_models={"get_nearby_localities": "small"},
+)
+
+
+def _response(*names: str) -> types.Content:
+    return types.Content(
+        role="user",
+        parts=[
+            types.Part(function_response=types.FunctionResponse(name=n, response={}))
+            for n in names
+        ],
+    )
+
+
+def _message(text: str) -> list:
+    return [types.Content(role="user", parts=[types.Part(text=text)])]
+
+
+def test_user_message_routes_to_planning_model() -> None:
+    assert POLICY.choose(_message("3BHK in Whitefield")) == ("planning", "small")
+    assert POLICY.choose(_message("Who is the broker for plots near Manyata?")) == (
+        "planning",
+        "small",
+    )
+    assert POLICY.choose(_message("Is Indiranagar a good area to invest in?")) == (
+        "planning",
+        "small",
+    )
+
+
+def test_message_answered_without_tools_routes_to_large_model() -> None:
+    assert POLICY.choose(_message("Hi, what can you do?")) == ("answer", "large")
+    assert POLICY.choose(_message("Is it a good time to invest in Bangalore?")) == (
+        "answer",
+        "large",
+    )
+
+
+def test_tool_results_route_per_tool() -> None:
+    assert POLICY.choose([_response("search_listings")]) == ("synthesis", "large")
+    assert POLICY.choose([_response("get_nearby_localities")]) == ("synthesis", "small")
+    # Mixed results go to the synthesis model
+    assert POLICY.choose([_response("get_nearby_localities", "search_listings")]) == (
+        "synthesis",
+        "large",
+    )
+
+
+def test_parse_tool_models() -> None:
+    models = parse_tool_models(
+        "get_nearby_localities=small, get_summary_stats=gemini-2.5-pro"
+    )
+    assert models["get_summary_stats"] == "gemini-2.5-pro"
+    assert models["get_nearby_localities"].endswith("lite")
+    with pytest.raises(ValueError):
+        parse_tool_models("search_listings")
@@ -0,0 +1,53 @@
+"""
+Tests for rule-based extraction and its confidence scores.
+"""
+
+from my_agent.rule_extractor import RULES_CONFIDENCE_THRESHOLD, extract
+
+
+def test_simple_rent_message_is_fully_parsed() -> None:
+    fields, confidence = extract("2BHK for rent in HSR Layout, 1100 sqft, 40k")
+
+    assert confidence >= RULES_CONFIDENCE_THRESHOLD
+    assert fields["message_type"] == "supply_rent"
+    assert fields["property_type"] == "apartment"
+    assert (fields["bedroom_count"], fields["area_sqft"], fields["price"]) == (
+        2,
+        1100,
+        40_000,
+    )
+    assert fields["location"] == "HSR Layout"
+
+
+def test_per_unit_prices_use_the_area() -> None:
+    fields, _ = extract("Khata site for Sale - Kogilu - 30x40 - west - ₹6500/sqft")
+    assert fields["property_type"] == "plot"
+    assert fields["area_sqft"] == 1200
+    assert fields["price"] == 7_800_000
+
+    fields, _ = extract("10 acres land for sale on Mysore Road, Rs.3.5 cr per acre")
+    assert fields["area_sqft"] == 435_600
+    assert fields["price"] == 350_000_000
+
+
+def test_demand_messages() -> None:
+    fields, confidence = extract(
+        "Required 3BHK semi furnished flat on rent in Koramangala, budget 80k"
+    )
+
+    assert fields["message_type"] == "demand_rent"
+    assert fields["furnishing_status"] == "semi_furnished"
+    assert confidence >= RULES_CONFIDENCE_THRESHOLD
+
+
+def test_unclear_messages_go_to_the_llm() -> None:
+    # No sale/rent wording
+    assert extract("Rs.3.5 cr per acre")[1] == 0.0
+    # Per-sqft price without an area, and no locality
+    _, confidence = extract("Plot for sale ₹6500/sqft")
+    assert confidence < RULES_CONFIDENCE_THRESHOLD
+    # Conflicting prices
+    _, confidence = extract(
+        "3BHK flat for sale in Whitefield 1500 sqft 1.2 Cr, also 2BHK 85 L"
+    )
+    assert confidence < RULES_CONFIDENCE_THRESHOLD
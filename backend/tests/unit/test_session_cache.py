@@ -0,0 +1,61 @@
+"""
+Tests for session-scoped memoization of search results.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from my_agent import tools
+from my_agent.session_cache import INDEX_KEY, store
+from my_agent.tools import search_listings
+
+APARTMENTS = [{"field": "property_type", "op": "eq", "value": "apartment"}]
+LARGE_APARTMENTS = [*APARTMENTS, {"field": "bhk", "op": "gte", "value": 4}]
+
+
+def test_narrowed_search_is_served_from_session_state(monkeypatch) -> None:
+    tool_context = SimpleNamespace(state={})
+    expected = search_listings(LARGE_APARTMENTS)
+
+    search_listings(APARTMENTS, tool_context=tool_context)
+    assert len(tool_context.state[INDEX_KEY]) == 1
+
+    # With the data source emptied, only the session cache can answer
+    monkeypatch.setattr(tools, "MOCK_LISTINGS", [])
+    narrowed = search_listings(LARGE_APARTMENTS, tool_context=tool_context)
+    assert [x["id"] for x in narrowed] == [x["id"] for x in expected]
+
+    repeated = search_listings(list(reversed(APARTMENTS)), tool_context=tool_context)
+    assert repeated
+
+
+def test_unrelated_search_misses_cache(monkeypatch) -> None:
+    tool_context = SimpleNamespace(state={})
+    search_listings(APARTMENTS, tool_context=tool_context)
+
+    monkeypatch.setattr(tools, "MOCK_LISTINGS", [])
+    villas = [{"field": "property_type", "op": "eq", "value": "villa"}]
+    assert search_listings(villas, tool_context=tool_context) == []
+
+
+class _SlowState(dict):
+    """Session state whose writes yield to other threads."""
+
+    def __setitem__(self, key, value):
+        time.sleep(0.001)
+        super().__setitem__(key, value)
+
+
+def test_concurrent_stores_keep_every_entry() -> None:
+    tool_context = SimpleNamespace(state=_SlowState())
+    filter_sets = [[{"field": "bhk", "op": "eq", "value": bhk}] for bhk in range(1, 5)]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(
+            pool.map(
+                lambda filters: store(tool_context, filters, [{"id": "a"}]), filter_sets
+            )
+        )
+
+    assert len(tool_context.state[INDEX_KEY]) == len(filter_sets)
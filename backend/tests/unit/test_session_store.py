@@ -0,0 +1,163 @@
+"""
+Tests for the SQLite session store: persistence, batching and compaction.
+"""
+
+import asyncio
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from my_agent.session_store import CompactingSessionService, is_summary
+
+APP = "my_agent"
+USER = "test_user"
+
+
+def _text_event(author: str, text: str, invocation_id: str = "inv") -> Event:
+    role = "user" if author == "user" else "model"
+    return Event(
+        invocation_id=invocation_id,
+        author=author,
+        content=types.Content(role=role, parts=[types.Part(text=text)]),
+    )
+
+
+def _tool_events(invocation_id: str) -> list[Event]:
+    call = types.Part(function_call=types.FunctionCall(name="search_listings", args={}))
+    result = types.Part(
+        function_response=types.FunctionResponse(
+            name="search_listings",
+            response={"count": 3},
+        )
+    )
+    return [
+        Event(
+            invocation_id=invocation_id,
+            author="agent",
+            content=types.Content(role="model", parts=[call]),
+        ),
+        Event(
+            invocation_id=invocation_id,
+            author="agent",
+            content=types.Content(role="user", parts=[result]),
+        ),
+    ]
+
+
+async def _add_turn(service, session, n: int) -> None:
+    inv = f"inv-{n}"
+    await service.append_event(session, _text_event("user", f"question {n}", inv))
+    for event in _tool_events(inv):
+        await service.append_event(session, event)
+    await service.append_event(session, _text_event("agent", f"answer {n}", inv))
+
+
+@pytest.mark.asyncio
+async def test_sessions_and_state_survive_restart(tmp_path) -> None:
+    db = tmp_path / "sessions.db"
+    service = CompactingSessionService(db_path=db, batch_size=100)
+    session = await service.create_session(
+        app_name=APP,
+        user_id=USER,
+        state={"user:name": "Asha"},
+    )
+    await service.append_event(
+        session,
+        Event(
+            invocation_id="inv",
+            author="agent",
+            actions=EventActions(
+                state_delta={"last_locality": "Whitefield", "temp:x": 1}
+            ),
+        ),
+    )
+    await service.append_event(session, _text_event("user", "hello"))
+    service.close()
+
+    reopened = CompactingSessionService(db_path=db)
+    loaded = await reopened.get_session(
+        app_name=APP, user_id=USER, session_id=session.id
+    )
+
+    assert [e.content.parts[0].text for e in loaded.events if e.content] == ["hello"]
+    assert loaded.state["last_locality"] == "Whitefield"
+    assert loaded.state["user:name"] == "Asha"
+    assert "temp:x" not in loaded.state
+
+
+@pytest.mark.asyncio
+async def test_writes_are_batched_until_flush(tmp_path) -> None:
+    db = tmp_path / "sessions.db"
+    service = CompactingSessionService(db_path=db, batch_size=10, flush_interval=3600)
+    session = await service.create_session(app_name=APP, user_id=USER)
+    for i in range(3):
+        await service.append_event(session, _text_event("user", f"m{i}"))
+
+    other = CompactingSessionService(db_path=db)
+    before = await other.get_session(app_name=APP, user_id=USER, session_id=session.id)
+    await service.flush()
+    after = await other.get_session(app_name=APP, user_id=USER, session_id=session.id)
+
+    assert before.events == []
+    assert len(after.events) == 3
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_are_flushed_in_the_background(tmp_path) -> None:
+    db = tmp_path / "sessions.db"
+    service = CompactingSessionService(db_path=db, batch_size=10, flush_interval=0.5)
+    await service.start()
+    session = await service.create_session(app_name=APP, user_id=USER)
+    await service.append_event(session, _text_event("user", "hello"))
+
+    other = CompactingSessionService(db_path=db)
+    before = await other.get_session(app_name=APP, user_id=USER, session_id=session.id)
+    await asyncio.sleep(1.0)
+    after = await other.get_session(app_name=APP, user_id=USER, session_id=session.id)
+    await service.stop()
+
+    assert before.events == []
+    assert len(after.events) == 1
+
+
+@pytest.mark.asyncio
+async def test_long_sessions_are_compacted_into_a_summary(tmp_path) -> None:
+    service = CompactingSessionService(
+        db_path=tmp_path / "sessions.db",
+        batch_size=1,
+        max_events=12,
+        keep_recent=6,
+    )
+    session = await service.create_session(app_name=APP, user_id=USER)
+    for n in range(10):
+        await _add_turn(service, session, n)
+
+    loaded = await service.get_session(
+        app_name=APP, user_id=USER, session_id=session.id
+    )
+    summary = loaded.events[0]
+
+    assert len(loaded.events) <= 12
+    assert is_summary(summary)
+    assert "question 0" in summary.content.parts[0].text
+    assert "answer 0" in summary.content.parts[0].text
+    # History after the summary starts on a user turn, never mid tool call
+    assert loaded.events[1].author == "user"
+    assert loaded.events[-1].content.parts[0].text == "answer 9"
+
+
+@pytest.mark.asyncio
+async def test_delete_session_drops_buffered_events(tmp_path) -> None:
+    service = CompactingSessionService(db_path=tmp_path / "sessions.db", batch_size=100)
+    session = await service.create_session(app_name=APP, user_id=USER)
+    await service.append_event(session, _text_event("user", "hello"))
+
+    await service.delete_session(app_name=APP, user_id=USER, session_id=session.id)
+    await service.flush()
+
+    assert (
+        await service.get_session(app_name=APP, user_id=USER, session_id=session.id)
+        is None
+    )
+    assert (await service.list_sessions(app_name=APP, user_id=USER)).sessions == []
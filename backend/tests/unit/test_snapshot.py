@@ -0,0 +1,178 @@
+"""
+Tests for the memory-mapped listing snapshot.
+"""
+
+import json
+import os
+
+import pyarrow as pa
+import pytest
+
+from my_agent import tools
+from my_agent.filters import ListingFilter
+from my_agent.mock_data import (
+    apply_mock_filters,
+    apply_mock_filters_batch,
+    prepare_listings,
+)
+from my_agent.snapshot import ListingSnapshot, is_fresh, write_snapshot
+
+ORIGINAL = "3BHK apartment for sale in Prestige Lakeside Habitat, Whitefield. 1720 sqft, Price 1.85 Cr. Call Ravi 98450 12345"
+REPOST = "*3 BHK Apartment for Sale* in Prestige Lakeside Habitat Whitefield 1720 sqft, Price 1.85 Cr!! Contact +91 99000 54321"
+
+
+def _records():
+    common = {
+        "message_type": "supply_sale",
+        "property_type": "apartment",
+        "location": "Whitefield",
+        "area_sqft": "1720",
+        "price_text": "1.85 Cr",
+        "special_features": '["gym"]',
+    }
+    return [
+        {"id": "b", "raw_message": REPOST, "message_date": "2025-09-02", **common},
+        {"id": "a", "raw_message": ORIGINAL, "message_date": "2025-09-01", **common},
+        {
+            "id": "c",
+            "raw_message": "Plot for sale in Hebbal, 2400 sqft, 2.1 Cr",
+            "message_date": "2025-09-03",
+            "message_type": "supply_sale",
+            "property_type": "plot",
+            "location": "Hebbal",
+            "area_sqft": 2400,
+        },
+    ]
+
+
+def test_snapshot_round_trips_with_canonical_rows_first(tmp_path) -> None:
+    listings = prepare_listings(_records())
+    write_snapshot(listings, tmp_path / "listings.arrow")
+    before = pa.total_allocated_bytes()
+    snapshot = ListingSnapshot.open(tmp_path / "listings.arrow")
+    # Columns are read from the mapped file, not copied onto the heap
+    assert pa.total_allocated_bytes() == before
+
+    assert [listing["id"] for listing in snapshot] == ["a", "c", "b"]
+    assert [listing["id"] for listing in snapshot.canonical()] == ["a", "c"]
+    by_id = {listing["id"]: listing for listing in listings}
+    assert snapshot[-1] == {k: by_id["b"].get(k) for k in snapshot[-1]}
+    assert snapshot[0]["area_sqft"] == 1720 and snapshot[0]["price"] == 18500000
+    assert snapshot[0]["special_features"] == ["gym"]
+    assert snapshot[2]["canonical_id"] == "a"
+    assert snapshot.get("b") == snapshot[2]
+    assert snapshot.get("missing") is None
+    # A slice sorts its own ids on first lookup
+    assert snapshot.canonical().get("c")["id"] == "c"
+    assert [listing["id"] for listing in snapshot.get_many(["b", "a"])] == ["a", "b"]
+
+
+FILTERS = [
+    {"field": "price_cr", "op": "lte", "value": 2},
+    {"field": "price_cr", "op": "eq", "value": 1.5},
+    {"field": "bhk", "op": "eq", "value": 3},
+    {"field": "bhk", "op": "in", "value": [2, 3]},
+    {"field": "area_sqft", "op": "gte", "value": 2000.5},
+    {"field": "locality", "op": "eq", "value": "white"},
+    {"field": "locality", "op": "in", "value": ["hebbal", "Panathur"]},
+    {"field": "near_landmark", "op": "near", "value": "Manyata Tech Park"},
+    {"field": "near_landmark", "op": "eq", "value": "Manyata Tech Park"},
+    {"field": "locality", "op": "within_km", "value": "Whitefield", "km": 3},
+    {"field": "property_type", "op": "in", "value": ["plot", "villa"]},
+    {"field": "message_type", "op": "near", "value": "sale"},
+    {"field": "message_date", "op": "gte", "value": "2025-09-02"},
+    {"field": "status", "op": "eq", "value": "ready_to_move"},
+    {"field": "investment_grade", "op": "eq", "value": False},
+]
+
+
+def _corpus():
+    records = _records()
+    for i in range(30):
+        records.append(
+            {
+                "id": f"x{i}",
+                "raw_message": f"Listing {i} " * (i + 1),
+                "message_date": f"2025-09-{i % 28 + 1:02d}",
+                "message_type": ["supply_sale", "supply_rent"][i % 2],
+                "property_type": ["apartment", "villa", "plot"][i % 3],
+                "location": ["Hebbal", "Whitefield", None, "Brookefield"][i % 4],
+                "area_sqft": [None, 1200, 2400][i % 3],
+                "bedroom_count": [None, 2, 3, 4][i % 4],
+                "price": [None, 15_000_000, 60_000_000][i % 3],
+                "special_features": ["ready_to_move"] if i % 5 == 0 else [],
+            }
+        )
+    return prepare_listings(records)
+
+
+@pytest.mark.parametrize(
+    "filter_dict", FILTERS, ids=lambda f: f"{f['field']}-{f['op']}"
+)
+def test_snapshot_filters_match_the_in_memory_search(tmp_path, filter_dict) -> None:
+    listings = _corpus()
+    if filter_dict["field"] == "investment_grade":
+        # The in-memory search cannot derive it without a price
+        listings = [listing for listing in listings if listing["price"] is not None]
+    write_snapshot(listings, tmp_path / "listings.arrow")
+    snapshot = ListingSnapshot.open(tmp_path / "listings.arrow")
+    filters = [ListingFilter(**filter_dict)]
+
+    expected = apply_mock_filters(list(snapshot), filters)
+    assert list(apply_mock_filters(snapshot, filters)) == expected
+
+
+def test_snapshot_batch_matches_the_in_memory_batch(tmp_path) -> None:
+    write_snapshot(_corpus(), tmp_path / "listings.arrow")
+    snapshot = ListingSnapshot.open(tmp_path / "listings.arrow")
+    filter_sets = [
+        [ListingFilter(**f) for f in FILTERS[i : i + 2]]
+        for i in range(0, len(FILTERS) - 1, 2)
+    ] + [[]]
+
+    expected = apply_mock_filters_batch(list(snapshot), filter_sets)
+    assert [
+        list(results) for results in apply_mock_filters_batch(snapshot, filter_sets)
+    ] == expected
+
+
+def test_snapshot_goes_stale_when_source_changes(tmp_path) -> None:
+    source = tmp_path / "mock_listings.json"
+    source.write_text(json.dumps(_records()))
+    path = tmp_path / "listings.arrow"
+    write_snapshot(prepare_listings(_records()), path, source=source)
+    assert is_fresh(path, source)
+
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert not is_fresh(path, source)
+    assert not is_fresh(tmp_path / "missing.arrow", source)
+
+
+def test_snapshot_of_another_corpus_is_never_fresh(tmp_path) -> None:
+    source = tmp_path / "mock_listings.json"
+    source.write_text(json.dumps(_records()))
+    corpus = tmp_path / "corpus.json"
+    corpus.write_text(json.dumps(_records()))
+
+    write_snapshot(prepare_listings(_records()), tmp_path / "unrecorded.arrow")
+    write_snapshot(
+        prepare_listings(_records()), tmp_path / "corpus.arrow", source=corpus
+    )
+
+    assert not is_fresh(tmp_path / "unrecorded.arrow", source)
+    assert not is_fresh(tmp_path / "corpus.arrow", source)
+
+
+def test_mock_search_over_snapshot(tmp_path, monkeypatch) -> None:
+    write_snapshot(prepare_listings(_records()), tmp_path / "listings.arrow")
+    monkeypatch.setattr(
+        tools, "MOCK_LISTINGS", ListingSnapshot.open(tmp_path / "listings.arrow")
+    )
+
+    results = tools.search_listings(
+        [{"field": "locality", "op": "eq", "value": "Whitefield"}]
+    )
+    assert results == [tools.get_listing_details("a")]
+    assert tools.get_locality_stats("Whitefield")["inventory_count"] == 1
+    assert tools.get_listing_details("b")["canonical_id"] == "a"
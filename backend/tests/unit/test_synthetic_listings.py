@@ -0,0 +1,51 @@
+"""
+Tests for the seeded synthetic listing generator.
+"""
+
+import json
+from collections import Counter
+
+import pytest
+
+from tests.perf.synthetic_listings import (
+    LOCALITIES,
+    generate,
+    write_jsonl,
+    write_parquet,
+)
+
+
+def test_same_seed_same_rows() -> None:
+    assert list(generate(300, seed=5)) == list(generate(300, seed=5))
+    assert list(generate(50, seed=5)) != list(generate(50, seed=6))
+
+
+def test_rows_are_skewed_with_nulls_and_reposts() -> None:
+    rows = list(generate(5000, seed=1))
+    locations = Counter(r["location"] for r in rows)
+    assert locations[LOCALITIES[0][0]] > 5 * locations[LOCALITIES[-1][0]]
+    assert 0.2 < sum(r["agent_name"] is None for r in rows) / len(rows) < 0.5
+
+    # A repost keeps the property's details under a new ID and broker
+    properties = Counter(
+        (r["location"], r["property_type"], r["area_sqft"], r["price_text"])
+        for r in rows
+    )
+    assert 0.04 * len(rows) < sum(n - 1 for n in properties.values()) < 0.15 * len(rows)
+    assert len({r["id"] for r in rows}) == len(rows)
+    dates = [r["message_date"] for r in rows]
+    assert dates == sorted(dates)
+
+
+def test_writers_stream_chunks(tmp_path) -> None:
+    path = tmp_path / "listings.jsonl"
+    write_jsonl(path, generate(250, seed=2), chunk_size=100)
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert rows == list(generate(250, seed=2))
+
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "listings.parquet"
+    write_parquet(path, generate(250, seed=2), chunk_size=100)
+    table = pq.read_table(path)
+    assert table.num_rows == 250
+    assert pq.ParquetFile(path).num_row_groups == 3
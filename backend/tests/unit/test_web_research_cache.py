@@ -0,0 +1,89 @@
+"""
+Tests for the web research cache, using a stubbed search backend.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from my_agent.web_research import ResearchCache, normalize_query
+
+
+class StubSearch:
+    """Counts upstream calls and answers after a short delay."""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self, query: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"results for {query}"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_share_one_call(tmp_path) -> None:
+    cache = ResearchCache(path=tmp_path / "cache.json", ttl=60)
+    search = StubSearch()
+
+    results = await asyncio.gather(
+        cache.get_or_fetch("Prestige Group reviews", search),
+        cache.get_or_fetch("prestige group reviews?", search),
+        cache.get_or_fetch("reviews  Prestige Group", search),
+    )
+
+    assert search.calls == 1
+    assert len(set(results)) == 1
+
+
+@pytest.mark.asyncio
+async def test_results_persist_across_restarts(tmp_path) -> None:
+    path = tmp_path / "cache.json"
+    search = StubSearch(delay=0)
+    await ResearchCache(path=path, ttl=60).get_or_fetch("Whitefield trends", search)
+
+    restarted = ResearchCache(path=path, ttl=60)
+    assert restarted.get("whitefield trends") == "results for Whitefield trends"
+    await restarted.get_or_fetch("Whitefield trends", search)
+    assert search.calls == 1
+
+    expired = ResearchCache(path=path, ttl=0)
+    assert expired.get("Whitefield trends") is None
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_not_cached() -> None:
+    cache = ResearchCache(path=None, ttl=60)
+
+    async def failing(query: str) -> str:
+        raise RuntimeError("search backend down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch("Hebbal news", failing)
+    assert cache.get("Hebbal news") is None
+
+
+def test_normalize_query_ignores_case_punctuation_and_order() -> None:
+    assert normalize_query("Prestige Group, reviews!") == normalize_query(
+        "reviews prestige group"
+    )
+
+
+@pytest.mark.asyncio
+async def test_writes_drop_expired_and_oldest_entries(tmp_path) -> None:
+    path = tmp_path / "cache.json"
+    search = StubSearch(delay=0)
+    cache = ResearchCache(path=path, ttl=60, max_entries=2)
+    for query in ("Hebbal news", "Whitefield trends", "Sobha reviews"):
+        await cache.get_or_fetch(query, search)
+
+    # The oldest entry is evicted from memory and from the file
+    assert cache.get("Hebbal news") is None
+    assert len(json.loads(path.read_text())) == 2
+
+    cache._entries[normalize_query("Whitefield trends")]["cached_at"] -= 3600
+    await cache.get_or_fetch("Prestige launches", search)
+    saved = {entry["query"] for entry in json.loads(path.read_text()).values()}
+    assert saved == {"Sobha reviews", "Prestige launches"}